@@ -4,15 +4,21 @@ AI Agent-based Product Enrichment System for eBay Listings
 Uses OpenAI Agents SDK to create specialized agents for gathering missing listing details
 """
 
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, asdict
+import re
+from typing import Any, Callable, Dict, List, Optional
+from dataclasses import dataclass, asdict, fields
 import pandas as pd
 from agents import Agent, Runner, function_tool
 from openai import OpenAI
 
+from config import ENRICHMENT_CONFIG
+from enrichment_cache import get_enrichment_cache, product_keys
+from rate_limiter import get_rate_limiter
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -86,6 +92,24 @@ class EnrichedProduct:
             self.sources = []
 
 
+# Fields describing the product itself rather than one unit's SKU, condition or
+# price; these are cached per model and reused across pallets. The description
+# is cached as a template with the condition left as _CONDITION_SLOT.
+_PRODUCT_FIELDS = (
+    'title', 'category_id', 'category_name', 'retail_price',
+    'upc', 'ean', 'isbn', 'mpn', 'item_specifics', 'weight_lbs', 'dimensions',
+    'images', 'compatibility', 'warranty_info'
+)
+_CONDITION_SLOT = '{condition}'
+
+
+def _description_template(description: str, condition: str) -> str:
+    """Description with each mention of the unit's condition replaced by _CONDITION_SLOT"""
+    if not condition.strip():
+        return description
+    return re.sub(rf'\b{re.escape(condition.strip())}\b', _CONDITION_SLOT, description, flags=re.IGNORECASE)
+
+
 # ============================================================================
 # TOOL FUNCTIONS - Available to all agents
 # ============================================================================
@@ -126,6 +150,7 @@ Focus on factual, verifiable information only.
     try:
         # Note: This is a simplified example. Actual implementation would use
         # OpenAI's web search capabilities through the Responses API
+        get_rate_limiter('openai').acquire()
         response = client.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
@@ -179,6 +204,7 @@ Common eBay categories:
 """
 
     try:
+        get_rate_limiter('openai').acquire()
         response = client.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
@@ -313,6 +339,7 @@ Return ONLY the HTML description, nothing else.
 """
 
     try:
+        get_rate_limiter('openai').acquire()
         response = client.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}]
@@ -400,6 +427,7 @@ Use eBay-standard terminology and formats.
 """
 
     try:
+        get_rate_limiter('openai').acquire()
         response = client.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
@@ -454,6 +482,7 @@ Base estimates on typical product dimensions and industry standards.
 """
 
     try:
+        get_rate_limiter('openai').acquire()
         response = client.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
@@ -600,31 +629,188 @@ class AgentBasedEnricher:
         sku: str,
         brand: str,
         model: str,
-        condition: str
+        condition: str,
+        upc: Optional[str] = None,
+        refresh: bool = False
     ) -> EnrichedProduct:
         """
         Enrich a single product using the AI agent workflow.
 
+        A model enriched before is served from the enrichment cache with only
+        its condition filled into the cached description. Otherwise the offline
+        product catalog is consulted first; what it knows (title, identifiers,
+        MSRP, category) is handed to the agents and kept in the result.
+
         Args:
             sku: Product SKU
             brand: Product brand
             model: Product model
             condition: Item condition
+            upc: UPC/EAN barcode (optional, improves the catalog match)
+            refresh: Ignore the enrichment cache and re-run the agents
 
         Returns:
             EnrichedProduct with all gathered information
         """
+        cached = None if refresh else self._from_cache(sku, brand, model, condition, upc)
+        if cached:
+            return cached
         logger.info(f"Starting enrichment for {sku}: {brand} {model}")
 
-        # Create enrichment request
-        request = f"""
+        known = self._catalog_lookup(upc, brand, model)
+        try:
+            # Run the agent workflow
+            result = Runner.run_sync(
+                starting_agent=self.coordinator,
+                input=self._build_request(sku, brand, model, condition, known),
+                max_turns=ENRICHMENT_CONFIG['max_turns']  # Allow multiple agent interactions
+            )
+        except Exception as e:
+            logger.error(f"Enrichment failed for {sku}: {e}")
+            return self._fallback_product(sku, brand, model, condition, known)
+
+        return self._finish_product(sku, brand, model, condition, result.final_output, known, upc)
+
+    async def enrich_product_async(
+        self,
+        sku: str,
+        brand: str,
+        model: str,
+        condition: str,
+        upc: Optional[str] = None,
+        timeout: Optional[float] = None,
+        refresh: bool = False
+    ) -> EnrichedProduct:
+        """
+        Async version of enrich_product() for running many products at once.
+
+        Args:
+            sku: Product SKU
+            brand: Product brand
+            model: Product model
+            condition: Item condition
+            upc: UPC/EAN barcode (optional)
+            timeout: Seconds before the agent run is abandoned and the minimal
+                product is returned (default ENRICHMENT_CONFIG['item_timeout_seconds'])
+            refresh: Ignore the enrichment cache and re-run the agents
+
+        Returns:
+            EnrichedProduct with all gathered information
+        """
+        if timeout is None:
+            timeout = ENRICHMENT_CONFIG['item_timeout_seconds']
+        if not refresh:
+            # A cache hit may be re-priced, which blocks
+            cached = await asyncio.to_thread(self._from_cache, sku, brand, model, condition, upc)
+            if cached:
+                return cached
+        logger.info(f"Starting enrichment for {sku}: {brand} {model}")
+
+        known = self._catalog_lookup(upc, brand, model)
+        try:
+            result = await asyncio.wait_for(
+                Runner.run(
+                    starting_agent=self.coordinator,
+                    input=self._build_request(sku, brand, model, condition, known),
+                    max_turns=ENRICHMENT_CONFIG['max_turns']
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Enrichment timed out for {sku} after {timeout:.0f}s")
+            return self._fallback_product(sku, brand, model, condition, known)
+        except Exception as e:
+            logger.error(f"Enrichment failed for {sku}: {e}")
+            return self._fallback_product(sku, brand, model, condition, known)
+
+        # Pricing, when enabled, queries the pricing engine, which blocks
+        return await asyncio.to_thread(
+            self._finish_product, sku, brand, model, condition, result.final_output, known, upc
+        )
+
+    async def enrich_many_async(
+        self,
+        rows: List[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        on_result: Optional[Callable[[int, EnrichedProduct], None]] = None,
+        refresh: bool = False
+    ) -> List[EnrichedProduct]:
+        """
+        Enrich several products concurrently.
+
+        Rows of the same model wait for the first one's agent run and are then
+        served from the enrichment cache instead of running the agents again.
+
+        Args:
+            rows: enrich_product() keyword arguments (sku, brand, model, condition, upc)
+            concurrency: Agent runs in flight at once (default ENRICHMENT_CONFIG['concurrency'])
+            timeout: Per-product timeout in seconds
+            on_result: Called with (position in rows, product) as each product finishes
+            refresh: Re-run the agents once per model instead of using the cache
+
+        Returns:
+            EnrichedProducts in the same order as rows
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or ENRICHMENT_CONFIG['concurrency']))
+        # Set once the first row of each model has finished its agent run
+        first_runs: Dict[str, asyncio.Event] = {}
+
+        async def enrich(position: int, row: Dict[str, Any]) -> EnrichedProduct:
+            keys = product_keys(row.get('brand'), row.get('model'), row.get('upc'))
+            key = keys[-1] if keys else f"row:{position}"
+            first = key not in first_runs
+            if first:
+                first_runs[key] = asyncio.Event()
+            else:
+                await first_runs[key].wait()
+            try:
+                async with semaphore:
+                    product = await self.enrich_product_async(timeout=timeout, refresh=refresh and first, **row)
+            finally:
+                if first:
+                    first_runs[key].set()
+            if on_result:
+                on_result(position, product)
+            return product
+
+        return await asyncio.gather(*(enrich(i, row) for i, row in enumerate(rows)))
+
+    def enrich_many(
+        self,
+        rows: List[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        on_result: Optional[Callable[[int, EnrichedProduct], None]] = None,
+        refresh: bool = False
+    ) -> List[EnrichedProduct]:
+        """Blocking wrapper around enrich_many_async() for synchronous callers"""
+        return asyncio.run(self.enrich_many_async(rows, concurrency, timeout, on_result, refresh))
+
+    @staticmethod
+    def _build_request(
+        sku: str,
+        brand: str,
+        model: str,
+        condition: str,
+        known: Optional[Dict[str, Any]]
+    ) -> str:
+        """Coordinator prompt for one product, including any catalog facts"""
+        known_details = ""
+        if known:
+            facts = {key: known[key] for key in ('title', 'upc', 'mpn', 'category', 'msrp') if known.get(key)}
+            known_details = "\nKnown from our catalog (verified, reuse as-is):\n" + "\n".join(
+                f"{key.upper()}: {value}" for key, value in facts.items()
+            ) + "\n"
+
+        return f"""
 Please enrich this product listing with all missing details:
 
 SKU: {sku}
 Brand: {brand}
 Model: {model}
 Condition: {condition}
-
+{known_details}
 I need you to:
 1. Research the product and gather specifications
 2. Determine the best eBay category
@@ -636,35 +822,149 @@ I need you to:
 Coordinate with your specialized agents and compile complete results.
 """
 
+    def _finish_product(
+        self,
+        sku: str,
+        brand: str,
+        model: str,
+        condition: str,
+        output: str,
+        known: Optional[Dict[str, Any]],
+        upc: Optional[str] = None
+    ) -> EnrichedProduct:
+        """Priced EnrichedProduct from a finished agent run, remembered in the enrichment cache"""
+        # Note: In practice, you'd extract structured data from result.final_output
+        product = self._parse_agent_output(sku, brand, model, condition, output)
+        product.upc = upc or ""
+        enriched = self._has_agent_fields(product)
+        product = self._apply_catalog(product, known)
+        logger.info(f"Enrichment complete for {sku}")
+
+        if not enriched:
+            logger.warning(f"Agent run for {sku} produced no product details, not caching")
+            return self._apply_pricing(product)
         try:
-            # Run the agent workflow
-            result = Runner.run_sync(
-                starting_agent=self.coordinator,
-                input=request,
-                max_turns=20  # Allow multiple agent interactions
-            )
+            # Keyed on the UPC we were given, never one borrowed from a fuzzy catalog match
+            fields = {name: value for name, value in asdict(product).items() if name in _PRODUCT_FIELDS}
+            fields['description_template'] = _description_template(product.description, condition)
+            get_enrichment_cache().put(fields, brand=brand, model=model, upc=upc)
+        except Exception as e:
+            logger.warning(f"Could not cache enrichment for {brand} {model}: {e}")
+        return self._apply_pricing(product)
+
+    @staticmethod
+    def _has_agent_fields(product: EnrichedProduct) -> bool:
+        """Whether parsed agent output holds anything beyond the placeholder defaults"""
+        placeholder = EnrichedProduct(
+            sku=product.sku, brand=product.brand, model=product.model, condition=product.condition,
+            title=f"{product.brand} {product.model}", upc=product.upc
+        )
+        return any(getattr(product, name) != getattr(placeholder, name)
+                   for name in ('description',) + _PRODUCT_FIELDS)
 
-            # Parse the result and create EnrichedProduct
-            # Note: In practice, you'd extract structured data from result.final_output
-            product = self._parse_agent_output(
-                sku, brand, model, condition,
-                result.final_output
-            )
+    def _from_cache(
+        self,
+        sku: str,
+        brand: str,
+        model: str,
+        condition: str,
+        upc: Optional[str] = None
+    ) -> Optional[EnrichedProduct]:
+        """Cached product-level enrichment for this model, described (and priced, if enabled) for this condition"""
+        try:
+            fields = get_enrichment_cache().get(brand=brand, model=model, upc=upc)
+        except Exception as e:
+            logger.warning(f"Enrichment cache lookup failed: {e}")
+            return None
+        if fields is None or 'description_template' not in fields:
+            return None
+
+        logger.info(f"Enrichment cache hit for {sku}: {brand} {model}")
+        product = EnrichedProduct(sku=sku, brand=brand, model=model, condition=condition, **{
+            name: value for name, value in fields.items() if name in _PRODUCT_FIELDS
+        })
+        if upc:
+            product.upc = upc
+        product.description = fields['description_template'].replace(_CONDITION_SLOT, condition)
+        product.sources.append('enrichment_cache')
+        return self._apply_pricing(product)
+
+    @staticmethod
+    def _apply_pricing(product: EnrichedProduct) -> EnrichedProduct:
+        """Fill the condition-specific pricing fields from the pricing engine, if enabled"""
+        if not ENRICHMENT_CONFIG['price_products']:
+            return product
+        from ebay_pricing.pricing_engine import get_pricing_recommendation
 
-            logger.info(f"Enrichment complete for {sku}")
+        try:
+            pricing = get_pricing_recommendation(
+                product.brand, product.model, product.condition, product.retail_price or None
+            )
+        except Exception as e:
+            logger.warning(f"Pricing failed for {product.sku}: {e}")
             return product
 
+        market = pricing.market_data
+        product.suggested_price = product.buy_it_now_price = pricing.buy_it_now_price
+        product.min_offer_price = pricing.min_offer_price or 0.0
+        product.auto_accept_offer = pricing.auto_accept_offer or 0.0
+        product.auto_decline_offer = pricing.auto_decline_offer or 0.0
+        product.pricing_confidence = pricing.confidence
+        product.pricing_reasoning = pricing.reasoning
+        if market:
+            product.market_price = product.avg_sold_price_30d = market.avg_sold_price
+            product.median_sold_price_30d = market.median_sold_price
+            product.sold_count_30d = market.sold_count
+            product.avg_active_price = market.avg_active_price
+            product.active_listing_count = market.active_listing_count
+        return product
+
+    def _fallback_product(
+        self,
+        sku: str,
+        brand: str,
+        model: str,
+        condition: str,
+        known: Optional[Dict[str, Any]]
+    ) -> EnrichedProduct:
+        """Minimal product data when the agent run fails or times out"""
+        return self._apply_catalog(EnrichedProduct(
+            sku=sku,
+            brand=brand,
+            model=model,
+            condition=condition,
+            title=f"{brand} {model}",
+            confidence_score=0.0
+        ), known)
+
+    @staticmethod
+    def _catalog_lookup(upc: Optional[str], brand: str, model: str) -> Optional[Dict[str, Any]]:
+        """Known product from the offline catalog, if any"""
+        try:
+            from ebay_pricing.catalog import get_catalog
+            known = get_catalog().lookup(upc=upc, brand=brand, model=model)
         except Exception as e:
-            logger.error(f"Enrichment failed for {sku}: {e}")
-            # Return minimal product data
-            return EnrichedProduct(
-                sku=sku,
-                brand=brand,
-                model=model,
-                condition=condition,
-                title=f"{brand} {model}",
-                confidence_score=0.0
-            )
+            logger.warning(f"Catalog lookup failed: {e}")
+            return None
+        if known:
+            logger.info(f"Catalog match for {brand} {model}: {known.get('title') or known.get('mpn')}")
+        return known
+
+    @staticmethod
+    def _apply_catalog(product: EnrichedProduct, known: Optional[Dict[str, Any]]) -> EnrichedProduct:
+        """Fill fields the catalog knows and the enrichment left empty"""
+        if not known:
+            return product
+        if known.get('title') and product.title == f"{product.brand} {product.model}":
+            product.title = known['title'][:80]
+        product.upc = product.upc or known.get('upc') or ""
+        product.mpn = product.mpn or known.get('mpn') or ""
+        product.category_name = product.category_name or known.get('category') or ""
+        product.retail_price = product.retail_price or known.get('msrp') or 0.0
+        if not product.images and known.get('images'):
+            product.images = list(known['images'])
+        product.sources.append('catalog')
+        return product
 
     def _parse_agent_output(
         self,
@@ -700,8 +1000,13 @@ Coordinate with your specialized agents and compile complete results.
         sku_col: str = "sku",
         brand_col: str = "brand",
         model_col: str = "model",
-        condition_col: str = "condition"
-    ) -> pd.DataFrame:
+        condition_col: str = "condition",
+        chunksize: Optional[int] = None,
+        upc_col: str = "upc",
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        refresh: bool = False
+    ) -> Optional[pd.DataFrame]:
         """
         Enrich all products in a CSV file.
 
@@ -712,37 +1017,109 @@ Coordinate with your specialized agents and compile complete results.
             brand_col: Name of brand column
             model_col: Name of model column
             condition_col: Name of condition column
+            chunksize: Stream the input in chunks of this many rows, appending
+                each enriched chunk to the output as it completes
+            upc_col: Name of UPC column (used for catalog matching if present)
+            concurrency: Products enriched at once (default ENRICHMENT_CONFIG['concurrency']);
+                rows are still written in input order, each as soon as it and
+                every row before it are done
+            item_timeout: Seconds per product before falling back to minimal data
+            refresh: Re-run the agents for models already in the enrichment cache
 
         Returns:
-            DataFrame with enriched products
+            DataFrame with enriched products, or None when streaming
         """
         logger.info(f"Loading CSV: {input_csv}")
-        df = pd.read_csv(input_csv)
+        # UPCs stay text so leading zeros survive
+        if chunksize:
+            chunks = pd.read_csv(input_csv, dtype={upc_col: str}, chunksize=chunksize)
+        else:
+            chunks = [pd.read_csv(input_csv, dtype={upc_col: str})]
+
+        all_products = []
+        writer = OrderedCsvWriter(output_csv)
+        processed = 0
+
+        for df in chunks:
+            rows = []
+
+            for idx, row in df.iterrows():
+                sku = str(row.get(sku_col, f"ROW_{idx}"))
+                brand = str(row.get(brand_col, ""))
+                model = str(row.get(model_col, ""))
+                condition = str(row.get(condition_col, "good"))
+                upc = row.get(upc_col)
+                upc = None if pd.isna(upc) else str(upc).strip() or None
+
+                if not brand and not model:
+                    logger.warning(f"Skipping row {idx}: missing brand and model")
+                    continue
+
+                rows.append({'sku': sku, 'brand': brand, 'model': model, 'condition': condition, 'upc': upc})
+
+            # Enrich the chunk concurrently, writing finished rows in order
+            offset = writer.next_position
+            enriched_products = self.enrich_many(
+                rows, concurrency, item_timeout,
+                on_result=lambda position, product: writer.add(offset + position, asdict(product)),
+                refresh=refresh
+            )
 
-        enriched_products = []
+            processed += len(df)
+            logger.info(f"Progress: {processed} rows processed")
 
-        for idx, row in df.iterrows():
-            sku = str(row.get(sku_col, f"ROW_{idx}"))
-            brand = str(row.get(brand_col, ""))
-            model = str(row.get(model_col, ""))
-            condition = str(row.get(condition_col, "good"))
+            if not chunksize:
+                all_products.extend(asdict(product) for product in enriched_products)
 
-            if not brand and not model:
-                logger.warning(f"Skipping row {idx}: missing brand and model")
-                continue
+        logger.info(f"Enriched CSV saved: {output_csv}")
+        _add_to_catalog(output_csv)
+        return None if chunksize else pd.DataFrame(all_products)
 
-            # Enrich the product
-            enriched = self.enrich_product(sku, brand, model, condition)
-            enriched_products.append(asdict(enriched))
 
-            logger.info(f"Progress: {idx + 1}/{len(df)}")
+class OrderedCsvWriter:
+    """
+    Appends enriched rows to a CSV in input order while results finish out of order.
 
-        # Create output DataFrame
-        result_df = pd.DataFrame(enriched_products)
-        result_df.to_csv(output_csv, index=False)
+    Each finished row is held until every row before it is done, then the
+    ready run is appended, so an interrupted run leaves a complete prefix.
+    """
 
-        logger.info(f"Enriched CSV saved: {output_csv}")
-        return result_df
+    def __init__(self, path: str, write_header: bool = True, columns: Optional[List[str]] = None):
+        """
+        Args:
+            path: Output CSV
+            write_header: Truncate the file and write the header now, so a run
+                that writes no rows still replaces the previous output
+            columns: CSV columns (default: the EnrichedProduct fields)
+        """
+        self.path = path
+        self.columns = columns or [field.name for field in fields(EnrichedProduct)]
+        self.next_position = 0
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        if write_header:
+            pd.DataFrame(columns=self.columns).to_csv(path, index=False)
+
+    def add(self, position: int, record: Dict[str, Any]):
+        """Queue the row at position and flush every row that is now in order"""
+        self._pending[position] = record
+        ready = []
+        while self.next_position in self._pending:
+            ready.append(self._pending.pop(self.next_position))
+            self.next_position += 1
+
+        if ready:
+            pd.DataFrame(ready, columns=self.columns).to_csv(self.path, mode='a', header=False, index=False)
+
+
+def _add_to_catalog(csv_path: str):
+    """Feed an enriched CSV into the offline product catalog"""
+    if not os.path.exists(csv_path):
+        return
+    try:
+        from ebay_pricing.catalog import get_catalog
+        get_catalog().import_csv(csv_path)
+    except Exception as e:
+        logger.warning(f"Could not add {csv_path} to the product catalog: {e}")
 
 
 def main():
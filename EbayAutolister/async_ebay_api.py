@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Asyncio engine for the eBay Inventory API
+
+Runs inventory batches and offer create/publish calls concurrently with a
+bounded number of requests in flight, sharing one OAuth token and one
+httpx connection pool.
+"""
+
+import asyncio
+import base64
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import httpx
+
+from config import Config
+from ebay_autolister import (
+    IDEMPOTENT_POST_ENDPOINTS,
+    InventoryBatch,
+    InventoryItem,
+    InventoryManager,
+    ListingManager,
+    empty_results,
+    get_payload_builder,
+    merge_results,
+    select_items
+)
+from job_journal import JobJournal
+from sync_index import SyncIndex
+from http_session import backoff_delay, retry_after_delay, should_retry_status
+from rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEbayAPI:
+    """Async eBay Inventory API client with bounded concurrency"""
+
+    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True,
+                 user_token: str = None, max_concurrency: int = 8, sync_index: SyncIndex = None):
+        """
+        Initialize the async client.
+
+        Args:
+            client_id: eBay API client ID
+            client_secret: eBay API client secret
+            sandbox: Use eBay sandbox environment
+            user_token: Optional pre-existing user token
+            max_concurrency: Maximum requests in flight at once
+            sync_index: Optional SyncIndex; unchanged SKUs are not re-sent
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.sandbox = sandbox
+        self.user_token = user_token
+        self.access_token = user_token if user_token else None
+        self.token_expires = time.time() + 7200 if user_token else 0
+
+        base_url = "https://api.sandbox.ebay.com" if sandbox else "https://api.ebay.com"
+        self.inventory_url = f"{base_url}/sell/inventory/v1"
+        self.oauth_url = f"{base_url}/identity/v1/oauth2/token"
+
+        config = Config()
+        self.max_retries = config.max_retries
+        self.backoff_factor = config.retry_backoff_factor
+        self.max_backoff = 30.0
+        self.max_concurrency = max_concurrency
+        self.sync_index = sync_index
+        self._limits = httpx.Limits(max_connections=max_concurrency,
+                                    max_keepalive_connections=max_concurrency)
+        self._timeout = httpx.Timeout(config.http_timeout)
+
+        self.rate_limiter = get_rate_limiter('inventory')
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._token_lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> 'AsyncEbayAPI':
+        self._get_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the underlying connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+        return self._client
+
+    async def authenticate(self, stale_token: str = None) -> bool:
+        """
+        Get OAuth access token; concurrent callers share a single refresh.
+
+        Args:
+            stale_token: Token the server just rejected; forces a refresh unless
+                another task has already replaced it
+        """
+        if self.user_token:
+            self.access_token = self.user_token
+            return True
+
+        if stale_token is None and self.access_token and time.time() < self.token_expires:
+            return True
+
+        async with self._token_lock:
+            # Another task may have refreshed while we waited for the lock
+            if stale_token is not None and self.access_token != stale_token:
+                return True
+            if stale_token is None and self.access_token and time.time() < self.token_expires:
+                return True
+
+            auth = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+            headers = {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Authorization': f'Basic {auth}'
+            }
+            data = {
+                'grant_type': 'client_credentials',
+                'scope': 'https://api.ebay.com/oauth/api_scope/sell.inventory'
+            }
+
+            try:
+                response = await self._get_client().post(self.oauth_url, headers=headers, data=data)
+                response.raise_for_status()
+
+                token_data = response.json()
+                self.access_token = token_data['access_token']
+                self.token_expires = time.time() + token_data['expires_in'] - 300  # 5min buffer
+
+                logger.info("Successfully authenticated with eBay API (async)")
+                return True
+
+            except Exception as e:
+                logger.error(f"Authentication failed: {e}")
+                return False
+
+    async def _make_request(self, method: str, endpoint: str, data: Union[Dict, bytes] = None) -> Dict:
+        """Make authenticated API request with concurrency limit, rate limiting and retry
+
+        POST/PUT bodies may be passed pre-serialized as JSON bytes.
+        """
+        if not await self.authenticate():
+            raise Exception("Failed to authenticate")
+
+        url = f"{self.inventory_url}/{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        refreshed = False
+        # Replaying a non-idempotent POST could create duplicate offers or listings,
+        # so those only retry on 429 and on failures to connect
+        idempotent = method != 'POST' or endpoint in IDEMPOTENT_POST_ENDPOINTS
+
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                await self.rate_limiter.acquire_async()
+
+                token = self.access_token
+                headers = {
+                    'Authorization': f'Bearer {token}',
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                }
+                if method == 'GET':
+                    kwargs = {'params': data}
+                elif isinstance(data, bytes):
+                    kwargs = {'content': data}
+                else:
+                    kwargs = {'json': data}
+                if method == 'DELETE':
+                    kwargs = {}
+
+                try:
+                    response = await self._get_client().request(method, url, headers=headers, **kwargs)
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries or not (
+                            idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))):
+                        raise
+                    delay = backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+                    logger.warning(f"{method} {url} failed ({e}), retrying in {delay:.2f}s")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+
+                # Token expired mid-run: refresh once and replay
+                if response.status_code == 401 and not self.user_token and not refreshed:
+                    refreshed = True
+                    if await self.authenticate(stale_token=token):
+                        continue
+
+                if should_retry_status(response.status_code, idempotent) and attempt < self.max_retries:
+                    delay = retry_after_delay(response.headers.get('Retry-After'), self.max_backoff)
+                    if delay is None:
+                        delay = backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+                    logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+
+                break
+
+        try:
+            response.raise_for_status()
+            return response.json() if response.text else {}
+        except httpx.HTTPStatusError as e:
+            logger.error(f"API request failed: {e}")
+            logger.error(f"Response: {response.text}")
+            raise
+
+    async def bulk_create_inventory_items(self, items: Union[List[InventoryItem], InventoryBatch],
+                                          batch_size: int = 25, hashes: Dict[str, str] = None) -> Dict:
+        """Create inventory items with several 25-item batches in flight
+
+        Unchanged SKUs are skipped as in InventoryManager.bulk_create_inventory_items.
+        """
+        items, hashes, results = InventoryManager.plan_push(items, self.sync_index, hashes)
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+        async def run_batch(batch_num: int, batch) -> Dict:
+            batch_results = {"successful": [], "failed": []}
+            skus, body = InventoryManager.build_bulk_request(batch)
+            try:
+                response = await self._make_request('POST', 'bulk_create_or_replace_inventory_item', body)
+                InventoryManager.collect_bulk_results(skus, response, batch_results)
+                logger.info(f"Processed batch {batch_num}: {len(batch)} items")
+            except Exception as e:
+                logger.error(f"Batch creation failed: {e}")
+                for sku in skus:
+                    batch_results["failed"].append({"sku": sku, "error": str(e)})
+            return batch_results
+
+        batch_results = await asyncio.gather(
+            *(run_batch(num, batch) for num, batch in enumerate(batches, 1))
+        )
+
+        # Merge in input order so results match the serial implementation
+        for batch_result in batch_results:
+            results["successful"].extend(batch_result["successful"])
+            results["failed"].extend(batch_result["failed"])
+
+        if self.sync_index is not None:
+            self.sync_index.record(results["successful"], hashes)
+
+        return results
+
+    async def create_offer(self, sku: str, category_id: str, price: float,
+                           marketplace_id: str = "EBAY_US") -> Optional[str]:
+        """Create an offer for an inventory item"""
+        try:
+            offer_data = ListingManager.build_offer_payload(sku, category_id, price, marketplace_id)
+            response = await self._make_request('POST', 'offer', offer_data)
+            offer_id = response.get('offerId')
+            logger.info(f"Created offer {offer_id} for SKU {sku}")
+            return offer_id
+        except Exception as e:
+            logger.error(f"Failed to create offer for {sku}: {e}")
+            return None
+
+    async def publish_offer(self, offer_id: str) -> Optional[str]:
+        """Publish an offer to create active listing
+
+        Returns:
+            The listing id ('' if the response carried none), or None on failure
+        """
+        try:
+            response = await self._make_request('POST', f'offer/{offer_id}/publish')
+            logger.info(f"Published offer {offer_id}")
+            return response.get('listingId', '')
+        except Exception as e:
+            logger.error(f"Failed to publish offer {offer_id}: {e}")
+            return None
+
+    async def bulk_create_offers(self, offers: List[Dict], batch_size: int = 25,
+                                 max_retries: int = 2) -> Dict:
+        """Create offers via bulk_create_offer with several 25-offer batches in flight
+
+        Same arguments and result shape as ListingManager.bulk_create_offers.
+        """
+        requests_by_key = {
+            offer["sku"]: ListingManager.build_offer_payload(
+                offer["sku"], offer["category_id"], offer["price"],
+                offer.get("marketplace_id", "EBAY_US")
+            )
+            for offer in offers
+        }
+
+        succeeded, failed = await self._run_bulk(
+            'bulk_create_offer', requests_by_key, 'sku', 'offerId', batch_size, max_retries
+        )
+        logger.info(f"Bulk created {len(succeeded)} offers, {len(failed)} failed")
+
+        return {
+            "successful": succeeded,
+            "failed": [{"sku": sku, "error": error} for sku, error in failed.items()]
+        }
+
+    async def bulk_publish_offers(self, offer_ids: List[str], batch_size: int = 25,
+                                  max_retries: int = 2) -> Dict:
+        """Publish offers via bulk_publish_offer with several 25-offer batches in flight
+
+        Same arguments and result shape as ListingManager.bulk_publish_offers.
+        """
+        requests_by_key = {offer_id: {"offerId": offer_id} for offer_id in offer_ids}
+
+        succeeded, failed = await self._run_bulk(
+            'bulk_publish_offer', requests_by_key, 'offerId', 'listingId', batch_size, max_retries
+        )
+        logger.info(f"Bulk published {len(succeeded)} offers, {len(failed)} failed")
+
+        return {
+            "successful": succeeded,
+            "failed": [{"offer_id": offer_id, "error": error} for offer_id, error in failed.items()]
+        }
+
+    async def _run_bulk(self, endpoint: str, requests_by_key: Dict[str, Dict], key_field: str,
+                        result_field: str, batch_size: int, max_retries: int):
+        """Async counterpart of ListingManager._run_bulk; the batches of a pass run concurrently"""
+        succeeded = {}
+        failed = {}
+        pending = list(requests_by_key)
+
+        async def run_batch(batch_keys: List[str]) -> List[str]:
+            batch_data = {"requests": [requests_by_key[key] for key in batch_keys]}
+            try:
+                response = await self._make_request('POST', endpoint, batch_data)
+            except Exception as e:
+                # Not replayed: the offers may exist even though the call failed
+                logger.error(f"{endpoint} batch failed: {e}")
+                for key in batch_keys:
+                    failed[key] = str(e)
+                return []
+            return ListingManager.collect_bulk_entries(
+                batch_keys, response, key_field, result_field, succeeded, failed
+            )
+
+        for attempt in range(max_retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(backoff_delay(attempt - 1, 1.0, 30.0))
+                logger.info(f"Retrying {len(pending)} items on {endpoint} (attempt {attempt + 1})")
+
+            retryable = await asyncio.gather(
+                *(run_batch(pending[i:i + batch_size]) for i in range(0, len(pending), batch_size))
+            )
+            pending = [key for keys in retryable for key in keys]
+            if not pending:
+                break
+
+        return succeeded, failed
+
+    async def create_and_publish_listings(self, items: Iterable[InventoryItem],
+                                          open_offers: Dict[str, str] = None,
+                                          on_offers: Callable[[Dict[str, str], List[Dict]], None] = None) -> Dict:
+        """
+        Create and publish offers for items through the bulk offer endpoints,
+        25 offers per call with several calls in flight
+
+        Args:
+            items: Items whose inventory already exists
+            open_offers: SKU -> offer id for offers that exist but were never published
+            on_offers: Called with ({SKU: offer id}, offer failures) as soon as offers
+                are created, before they are published (used to journal them)
+
+        Returns:
+            Counts plus "offers" (SKU -> offer id), "listings" (SKU -> listing id) and
+            "listing_errors" ({"sku", "error"} dicts)
+        """
+        items = list(items)
+        open_offers = {item.sku: open_offers[item.sku] for item in items if item.sku in (open_offers or {})}
+
+        offer_results = await self.bulk_create_offers([
+            {"sku": item.sku, "category_id": item.category_id, "price": item.price}
+            for item in items if item.sku not in open_offers
+        ])
+        offers = offer_results["successful"]
+        if on_offers and (offers or offer_results["failed"]):
+            on_offers(offers, offer_results["failed"])
+
+        offer_skus = {**open_offers, **offers}
+        publish_results = await self.bulk_publish_offers(list(offer_skus.values()))
+
+        sku_by_offer = {offer_id: sku for sku, offer_id in offer_skus.items()}
+        listings = {sku_by_offer[offer_id]: listing_id or ''
+                    for offer_id, listing_id in publish_results["successful"].items()}
+        errors = offer_results["failed"] + [
+            {"sku": sku_by_offer[f["offer_id"]], "error": f["error"]} for f in publish_results["failed"]
+        ]
+
+        return {
+            "listings_created": len(listings),
+            "listings_failed": len(errors),
+            "offers": offers,
+            "listings": listings,
+            "listing_errors": errors
+        }
+
+
+async def process_items_async(api: AsyncEbayAPI, items: Union[List[InventoryItem], InventoryBatch],
+                              create_listings: bool = False, batch_size: int = 25,
+                              journal: JobJournal = None) -> Dict:
+    """
+    Async counterpart of EbayAutolister._process_items for one list of items.
+
+    The caller is responsible for opening and closing the client.
+    """
+    hashes, plan, pending = None, None, items
+    if journal is not None or api.sync_index is not None:
+        hashes = get_payload_builder().payload_hashes(items)
+    if journal is not None:
+        plan = journal.plan(hashes)
+        pending = select_items(items, plan.pending)
+
+    logger.info(f"Creating {len(pending)} inventory items ({api.max_concurrency} concurrent requests)...")
+    if len(pending):
+        inventory_results = await api.bulk_create_inventory_items(pending, batch_size=batch_size, hashes=hashes)
+    else:
+        inventory_results = {"successful": [], "failed": []}
+    unchanged = inventory_results.get("unchanged", [])
+
+    if journal is not None:
+        journal.record_inventory(inventory_results["successful"], inventory_results["failed"], hashes)
+
+    results = {
+        "inventory_created": len(inventory_results["successful"]),
+        "inventory_failed": len(inventory_results["failed"]),
+        "failed_items": inventory_results["failed"]
+    }
+    if api.sync_index is not None:
+        results["inventory_unchanged"] = len(unchanged)
+    if plan is not None:
+        results["inventory_skipped"] = len(plan.created)
+
+    if create_listings:
+        # Unchanged SKUs keep the offers from their last push and are not re-offered
+        listable = set(inventory_results["successful"])
+        open_offers = {}
+        if plan is not None:
+            listable = (listable | plan.created) - plan.published
+            open_offers = plan.open_offers
+
+        # Offers are journaled as they are created, so a crash mid-publish
+        # resumes by publishing them instead of creating duplicates
+        listing_results = await api.create_and_publish_listings(
+            [item for item in items if item.sku in listable], open_offers,
+            on_offers=journal.record_offers if journal is not None else None
+        )
+
+        if journal is not None:
+            journal.record_listings(listing_results["listings"], listing_results["listing_errors"])
+
+        results["listings_created"] = listing_results["listings_created"]
+        results["listings_failed"] = listing_results["listings_failed"]
+        if unchanged:
+            results["listings_unchanged"] = len(unchanged)
+        if plan is not None:
+            results["listings_skipped"] = len(plan.published)
+
+    return results
+
+
+async def process_batches_async(api: AsyncEbayAPI, batches: Iterable[InventoryBatch],
+                                create_listings: bool = False, batch_size: int = 25,
+                                journal: JobJournal = None) -> Dict:
+    """
+    Upload a stream of InventoryBatch chunks, parsing the next chunk while the
+    current one is in flight.
+
+    Returns the same results dictionary shape as EbayAutolister.process_csv_file.
+    """
+    totals = empty_results()
+    iterator = iter(batches)
+
+    async with api:
+        next_batch = asyncio.create_task(asyncio.to_thread(next, iterator, None))
+
+        while True:
+            batch = await next_batch
+            if batch is None:
+                break
+
+            next_batch = asyncio.create_task(asyncio.to_thread(next, iterator, None))
+
+            totals["invalid_rows"].extend(batch.errors)
+            if len(batch):
+                merge_results(totals, await process_items_async(api, batch, create_listings, batch_size, journal))
+
+    return totals
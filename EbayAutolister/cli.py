@@ -9,6 +9,7 @@ import json
 import logging
 from typing import Optional
 from ebay_autolister import EbayAutolister, ConditionMapper
+from sync_index import SyncIndex
 from config import Config, create_sample_env
 from enricher import enrich_csv, EnrichmentError
 
@@ -65,8 +66,16 @@ def setup(ctx):
 @click.argument('csv_file', type=click.Path(exists=True))
 @click.option('--create-listings', is_flag=True, help='Create listings after inventory items')
 @click.option('--dry-run', is_flag=True, help='Preview actions without making API calls')
+@click.option('--concurrency', default=1, type=click.IntRange(min=1),
+              help='API requests in flight at once (above 1 uses the async engine)')
+@click.option('--chunksize', default=None, type=click.IntRange(min=1),
+              help='Stream the CSV in chunks of this many rows (flat memory on large manifests)')
+@click.option('--run-id', default=None, help='Job journal run id (default: a new timestamped id)')
+@click.option('--resume', is_flag=True,
+              help='Resume a journaled run (latest run for this CSV unless --run-id), skipping completed SKUs')
+@click.option('--force', is_flag=True, help='Push and list every SKU, even those unchanged since their last push')
 @click.pass_context
-def process(ctx, csv_file, create_listings, dry_run):
+def process(ctx, csv_file, create_listings, dry_run, concurrency, chunksize, run_id, resume, force):
     """Process CSV file and create inventory items"""
     config = ctx.obj['config']
     
@@ -74,7 +83,8 @@ def process(ctx, csv_file, create_listings, dry_run):
         click.echo(f"🔍 Dry run mode - would process: {csv_file}")
         # Load and validate CSV
         from ebay_autolister import CSVProcessor
-        items = CSVProcessor.load_items_from_csv(csv_file)
+        batch = CSVProcessor.load_batch_from_csv(csv_file)
+        items = batch.to_items()
         
         click.echo(f"📊 Found {len(items)} items to process:")
         for item in items[:5]:  # Show first 5
@@ -83,32 +93,67 @@ def process(ctx, csv_file, create_listings, dry_run):
         if len(items) > 5:
             click.echo(f"  ... and {len(items) - 5} more items")
         
+        if batch.errors:
+            click.echo(f"⚠️  {len(batch.errors)} invalid rows would be skipped:")
+            for error in batch.errors[:5]:
+                click.echo(f"  • Line {error['row']} ({error['sku'] or 'no SKU'}): {error['error']}")
+        
         click.echo(f"🔄 Would create inventory items: {'Yes' if items else 'No'}")
         click.echo(f"📋 Would create listings: {'Yes' if create_listings else 'No'}")
         return
     
+    from job_journal import JobJournal
+    if resume:
+        run_id = run_id or JobJournal.latest_run(csv_file)
+        if not run_id:
+            click.echo(f"❌ No journaled run found for {csv_file}")
+            return
+    else:
+        run_id = run_id or JobJournal.new_run_id()
+    journal = JobJournal(run_id)
+    
     click.echo(f"📂 Processing CSV file: {csv_file}")
+    click.echo(f"🧾 Run id: {run_id}{' (resuming)' if resume else ''}")
     
     # Initialize autolister
     autolister = EbayAutolister(
         config.ebay_client_id,
         config.ebay_client_secret,
-        config.ebay_sandbox
+        config.ebay_sandbox,
+        sync_index=SyncIndex.for_config(config, skip_unchanged=not force)
     )
     
     # Process the file
     with click.progressbar(length=100, label='Processing') as bar:
-        results = autolister.process_csv_file(csv_file, create_listings)
+        results = autolister.process_csv_file(
+            csv_file, create_listings, concurrency=concurrency, chunksize=chunksize, journal=journal
+        )
         bar.update(100)
     
     # Display results
     click.echo("\n📈 Processing Results:")
     click.echo(f"✅ Inventory items created: {results.get('inventory_created', 0)}")
     click.echo(f"❌ Inventory items failed: {results.get('inventory_failed', 0)}")
+    if results.get('inventory_unchanged'):
+        click.echo(f"⏸️  Inventory items unchanged (not sent): {results['inventory_unchanged']}")
+    if results.get('inventory_skipped'):
+        click.echo(f"⏭️  Inventory items already done: {results['inventory_skipped']}")
     
     if create_listings:
         click.echo(f"📋 Listings created: {results.get('listings_created', 0)}")
         click.echo(f"❌ Listings failed: {results.get('listings_failed', 0)}")
+        if results.get('listings_unchanged'):
+            click.echo(f"⏸️  Listings unchanged (not re-offered): {results['listings_unchanged']}")
+        if results.get('listings_skipped'):
+            click.echo(f"⏭️  Listings already published: {results['listings_skipped']}")
+    
+    if results.get('inventory_failed') or results.get('listings_failed'):
+        click.echo(f"\n🔁 Retry failures with: --resume --run-id {run_id}")
+    
+    if results.get('invalid_rows'):
+        click.echo(f"\n⚠️  Invalid CSV rows skipped: {len(results['invalid_rows'])}")
+        for error in results['invalid_rows'][:5]:
+            click.echo(f"  • Line {error['row']} ({error['sku'] or 'no SKU'}): {error['error']}")
     
     # Show failed items
     if results.get('failed_items'):
@@ -116,6 +161,93 @@ def process(ctx, csv_file, create_listings, dry_run):
         for failed in results['failed_items'][:5]:  # Show first 5 failures
             click.echo(f"  • {failed['sku']}: {failed['error']}")
 
+@cli.command()
+@click.argument('csv_file', type=click.Path(exists=True))
+@click.option('--dry-run', is_flag=True, help='Only report the diff, do not push')
+@click.pass_context
+def sync(ctx, csv_file, dry_run):
+    """Push only inventory items that are new or changed since their last push"""
+    config = ctx.obj['config']
+    
+    from ebay_autolister import CSVProcessor, get_payload_builder
+    batch = CSVProcessor.load_batch_from_csv(csv_file)
+    index = SyncIndex.for_config(config)
+    diff = index.diff(get_payload_builder().payload_hashes(batch))
+    
+    click.echo(f"🔄 Sync diff for {csv_file}:")
+    click.echo(f"  ➕ Added: {len(diff.added)}")
+    click.echo(f"  ✏️  Changed: {len(diff.changed)}")
+    click.echo(f"  ⏸️  Unchanged: {len(diff.unchanged)}")
+    if batch.errors:
+        click.echo(f"  ⚠️  Invalid rows: {len(batch.errors)}")
+    
+    if dry_run or not diff.to_push:
+        return
+    
+    autolister = EbayAutolister(
+        config.ebay_client_id,
+        config.ebay_client_secret,
+        config.ebay_sandbox,
+        sync_index=index
+    )
+    results = autolister.inventory.bulk_create_inventory_items(batch)
+    
+    click.echo(f"\n✅ Pushed: {len(results['successful'])}")
+    click.echo(f"❌ Failed: {len(results['failed'])}")
+    for failed in results['failed'][:5]:
+        click.echo(f"  • {failed['sku']}: {failed['error']}")
+
+@cli.command('refresh-hot')
+@click.option('--limit', default=50, type=click.IntRange(min=1), help='Maximum cache entries to refresh')
+@click.option('--within-hours', default=6.0, type=float,
+              help='Refresh entries expiring within this many hours')
+def refresh_hot(limit, within_hours):
+    """Pre-warm the most-requested pricing cache entries before they expire (run from cron)"""
+    from ebay_pricing.pricing_engine import refresh_hot_keys
+    
+    results = refresh_hot_keys(limit=limit, within_hours=within_hours)
+    
+    click.echo(f"🔥 Refreshed {len(results['refreshed'])} hot cache entries")
+    if results['failed']:
+        click.echo(f"❌ No data for {len(results['failed'])} entries:")
+        for brand, model, condition in results['failed'][:5]:
+            click.echo(f"  • {brand} {model} ({condition})")
+
+@cli.command('catalog-import')
+@click.argument('paths', nargs=-1, type=click.Path(exists=True))
+def catalog_import(paths):
+    """Build the offline product catalog from manifests, enriched CSVs and past UPC lookups
+
+    PATHS are .xlsx/.csv files or directories (default: ../MasterManifests).
+    """
+    from ebay_pricing.catalog import get_catalog
+    
+    catalog = get_catalog()
+    if not paths:
+        default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'MasterManifests')
+        paths = [default_dir] if os.path.isdir(default_dir) else []
+    
+    for path, count in catalog.import_paths(paths).items():
+        click.echo(f"  • {os.path.basename(path)}: {count} products")
+    click.echo(f"  • UPC lookup cache: {catalog.import_upc_cache()} products")
+    
+    stats = catalog.get_stats()
+    click.echo(f"📚 Catalog: {stats['products']} products ({stats['with_upc']} with UPC)")
+
+@cli.command('catalog-find')
+@click.option('--upc', default=None, help='UPC/EAN to look up')
+@click.option('--brand', default=None, help='Brand')
+@click.option('--model', default=None, help='Model or MPN')
+def catalog_find(upc, brand, model):
+    """Look up a product in the offline catalog"""
+    from ebay_pricing.catalog import get_catalog
+    
+    product = get_catalog().lookup(upc=upc, brand=brand, model=model)
+    if not product:
+        click.echo("❌ Not in catalog")
+        raise SystemExit(1)
+    click.echo(json.dumps(product, indent=2, default=str))
+
 @cli.command()
 @click.argument('sku')
 @click.pass_context
@@ -304,7 +436,9 @@ def _parse_column(col_value: str):
 @click.option('--id-col', default='sku', help='Column (name or index) for the item identifier/sku')
 @click.option('--brand-col', default='brand', help='Column (name or index) for brand')
 @click.option('--model-col', default='mpn', help='Column (name or index) for model')
-def enrich(input_csv, output_csv, images_dir, id_col, brand_col, model_col):
+@click.option('--chunksize', default=None, type=click.IntRange(min=1),
+              help='Stream the CSV in chunks of this many rows, writing each chunk as it completes')
+def enrich(input_csv, output_csv, images_dir, id_col, brand_col, model_col, chunksize):
     """Enrich a CSV using OpenAI web search (title, pricing, images)."""
     output_path = output_csv or f"{os.path.splitext(input_csv)[0]}_enriched.csv"
 
@@ -321,11 +455,18 @@ def enrich(input_csv, output_csv, images_dir, id_col, brand_col, model_col):
             id_col=_parse_column(id_col),
             brand_col=_parse_column(brand_col),
             model_col=_parse_column(model_col),
+            chunksize=chunksize,
         )
     except EnrichmentError as exc:
         click.echo(f"❌ Enrichment failed: {exc}")
         raise SystemExit(1)
 
+    try:
+        from ebay_pricing.catalog import get_catalog
+        get_catalog().import_csv(output_path)
+    except Exception as exc:
+        logging.warning("Could not add %s to the product catalog: %s", output_path, exc)
+
     click.echo("✅ Enrichment complete")
     click.echo(f"📄 Enriched CSV: {output_path}")
     click.echo(f"🖼️  Images saved to: {images_dir}")
@@ -23,6 +23,9 @@ class Config:
         self.rate_limit_interval = float(os.getenv('RATE_LIMIT_INTERVAL', '0.1'))
         self.batch_size = int(os.getenv('BATCH_SIZE', '25'))
         self.max_retries = int(os.getenv('MAX_RETRIES', '3'))
+        self.retry_backoff_factor = float(os.getenv('RETRY_BACKOFF_FACTOR', '0.5'))
+        self.http_pool_size = int(os.getenv('HTTP_POOL_SIZE', '10'))
+        self.http_timeout = float(os.getenv('HTTP_TIMEOUT', '30'))
         
         # Logging Configuration
         self.log_level = os.getenv('LOG_LEVEL', 'INFO')
@@ -78,6 +81,9 @@ class Config:
             'rate_limit_interval': self.rate_limit_interval,
             'batch_size': self.batch_size,
             'max_retries': self.max_retries,
+            'retry_backoff_factor': self.retry_backoff_factor,
+            'http_pool_size': self.http_pool_size,
+            'http_timeout': self.http_timeout,
             'log_level': self.log_level,
             'log_file': self.log_file,
             'default_marketplace': self.default_marketplace,
@@ -227,13 +233,79 @@ PRICING_CONFIG = {
         'USED_ACCEPTABLE': 0.20,     # -20%
         'FOR_PARTS_OR_NOT_WORKING': 0.50  # -50%
     },
-    'cache_duration_hours': 24,
+    'cache_duration_hours': 24,     # Soft TTL: older entries are served stale while refreshing
+    'cache_stale_hours': 72,        # Hard TTL beyond the soft one: never served after this
+    'refresh_workers': 2,           # Background refresh threads
+    'fetch_lease_seconds': 120,     # Cross-process single-flight lease on a market data fetch
+    'source_workers': 8,            # Threads shared by the concurrent per-source fetches
+    'source_timeouts': {            # Seconds before a source is dropped from a fetch
+        'ai_research': 60,
+        'browse_api': 20
+    },
+    'memory_cache_entries': 2048,  # In-process LRU tier in front of the SQLite cache
+    'memory_cache_ttl_seconds': 900,
     'sold_items_lookback_days': 30,
     'min_sold_samples': 3,  # Minimum sold items to calculate reliable avg
     'outlier_threshold': 2.5,  # Standard deviations for outlier removal
     'fallback_msrp_multiplier': 0.50  # Use 50% MSRP when no market data
 }
 
+# Token-bucket quotas per API family: rate (requests/second), burst size and
+# calls per calendar day (0 in .env disables the daily cap)
+RATE_LIMITS = {
+    'inventory': {
+        'rate': 1 / float(os.getenv('RATE_LIMIT_INTERVAL', '0.1')),
+        'burst': int(os.getenv('INVENTORY_RATE_BURST', '10')),
+        'daily_limit': int(os.getenv('INVENTORY_DAILY_LIMIT', '0')) or None
+    },
+    'browse': {
+        'rate': float(os.getenv('BROWSE_RATE_PER_SECOND', '10')),
+        'burst': int(os.getenv('BROWSE_RATE_BURST', '10')),
+        'daily_limit': int(os.getenv('BROWSE_DAILY_LIMIT', '5000')) or None
+    },
+    'trading': {
+        'rate': float(os.getenv('TRADING_RATE_PER_SECOND', '2')),
+        'burst': int(os.getenv('TRADING_RATE_BURST', '2')),
+        'daily_limit': int(os.getenv('TRADING_DAILY_LIMIT', '5000')) or None
+    },
+    'tavily': {
+        'rate': float(os.getenv('TAVILY_RATE_PER_SECOND', '1')),
+        'burst': int(os.getenv('TAVILY_RATE_BURST', '5')),
+        'daily_limit': int(os.getenv('TAVILY_DAILY_LIMIT', '0')) or None
+    },
+    'openai': {
+        'rate': 1 / float(os.getenv('OPENAI_RATE_LIMIT_SECONDS', '1.2')),
+        'burst': int(os.getenv('OPENAI_RATE_BURST', '5')),
+        'daily_limit': int(os.getenv('OPENAI_DAILY_LIMIT', '0')) or None
+    }
+}
+
+# UPC lookup cache and provider quotas (0 in .env disables a daily cap)
+UPC_CONFIG = {
+    'cache_days': int(os.getenv('UPC_CACHE_DAYS', '90')),                     # Found products
+    'negative_cache_hours': int(os.getenv('UPC_NEGATIVE_CACHE_HOURS', '72')),  # UPCs no provider knows
+    'hedged': os.getenv('UPC_HEDGED_LOOKUP', 'true').lower() == 'true',
+    'hedge_delay_seconds': float(os.getenv('UPC_HEDGE_DELAY', '1.0')),  # Stagger before the next provider starts
+    'hedge_min_quota_fraction': 0.5,  # Hedge to a quota-limited provider only while this much of its quota is left
+    'lookup_workers': 8,
+    'upcitemdb_batch_size': 10,  # UPCs per UPCitemdb POST lookup
+    'daily_quotas': {
+        'upcitemdb': int(os.getenv('UPCITEMDB_DAILY_LIMIT', '100')) or None,
+        'barcodelookup': int(os.getenv('BARCODELOOKUP_DAILY_LIMIT', '500')) or None,
+        'openfoodfacts': int(os.getenv('OPENFOODFACTS_DAILY_LIMIT', '0')) or None
+    }
+}
+
+# AI agent enrichment (each product is a 30-90s multi-agent run)
+ENRICHMENT_CONFIG = {
+    'concurrency': int(os.getenv('ENRICH_CONCURRENCY', '4')),             # Products enriched at once
+    'item_timeout_seconds': float(os.getenv('ENRICH_ITEM_TIMEOUT', '300')),  # Per product, then fall back
+    'max_turns': 20,
+    'cache_days': int(os.getenv('ENRICH_CACHE_DAYS', '180')),  # Product-level results reused across pallets
+    # Price each enriched product from eBay market data; costs API calls per product
+    'price_products': os.getenv('ENRICH_PRICE_PRODUCTS', 'false').lower() == 'true'
+}
+
 # Best Offer Configuration
 BEST_OFFER_CONFIG = {
     'enabled': True,
@@ -259,6 +331,14 @@ EBAY_SANDBOX=true
 RATE_LIMIT_INTERVAL=0.1
 BATCH_SIZE=25
 MAX_RETRIES=3
+RETRY_BACKOFF_FACTOR=0.5
+HTTP_POOL_SIZE=10
+HTTP_TIMEOUT=30
+
+# Rate limiting backend: memory (per process) or sqlite (shared by all workers)
+RATE_LIMIT_BACKEND=memory
+BROWSE_DAILY_LIMIT=5000
+TRADING_DAILY_LIMIT=5000
 
 # Logging
 LOG_LEVEL=INFO
@@ -4,17 +4,31 @@ eBay Autolister - Advanced Inventory Management & Listing Automation
 Integrates with eBay Inventory API for bulk listing creation and management
 """
 
+import hashlib
 import json
 import csv
+import math
 import requests
 import time
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
 import logging
+import re
 from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from config import CONDITION_MAPPINGS, GRADE_MAPPINGS
+from job_journal import JobJournal
+from sync_index import SyncIndex
+from http_session import HTTPTransport, RETRY_STATUS_CODES, backoff_delay, get_transport
+from rate_limiter import get_rate_limiter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 @dataclass
 class InventoryItem:
@@ -38,10 +52,42 @@ class InventoryItem:
             self.dimensions = {"length": 10.0, "width": 10.0, "height": 10.0}
         if self.images is None:
             self.images = []
+        for name, value in [("weight", self.weight), *self.dimensions.items()]:
+            if not math.isfinite(float(value)):
+                raise ValueError(f"Invalid {name} for {self.sku}: {value}")
 
 class ConditionMapper:
     """Utility class for mapping conditions and grades to eBay standards"""
     
+    DESCRIPTIONS = {
+        'NEW': 'Brand new, unopened item in original packaging',
+        'LIKE_NEW': 'Opened but in like-new condition',
+        'NEW_OTHER': 'New item, may be missing original packaging',
+        'NEW_WITH_DEFECTS': 'New item with minor defects',
+        'CERTIFIED_REFURBISHED': 'Certified refurbished by manufacturer',
+        'SELLER_REFURBISHED': 'Refurbished by seller to working condition',
+        'USED_EXCELLENT': 'Used item in excellent condition',
+        'USED_VERY_GOOD': 'Used item in very good condition',
+        'USED_GOOD': 'Used item in good condition',
+        'USED_ACCEPTABLE': 'Used item in acceptable condition',
+        'FOR_PARTS_OR_NOT_WORKING': 'Item for parts or not working'
+    }
+    
+    # Keyword groups tried in order when no mapping key matches
+    FALLBACK_TERMS = [
+        (('new', 'mint', 'sealed'), 'NEW'),
+        (('excellent', 'near mint'), 'USED_EXCELLENT'),
+        (('very good', 'light'), 'USED_VERY_GOOD'),
+        (('good', 'normal'), 'USED_GOOD'),
+        (('acceptable', 'fair', 'heavy'), 'USED_ACCEPTABLE'),
+        (('parts', 'broken', 'repair'), 'FOR_PARTS_OR_NOT_WORKING')
+    ]
+    
+    @staticmethod
+    def normalize(condition: str) -> str:
+        """Lowercase, treat underscores as spaces and collapse whitespace"""
+        return ' '.join(str(condition).lower().replace('_', ' ').split())
+    
     @staticmethod
     def map_condition(condition: str, grade: str = "") -> str:
         """
@@ -54,75 +100,236 @@ class ConditionMapper:
         Returns:
             Valid eBay condition enum value
         """
-        # First try to map by grade if provided
-        if grade:
-            grade_clean = str(grade).strip().upper()
-            if grade_clean in GRADE_MAPPINGS:
-                return GRADE_MAPPINGS[grade_clean]
-        
-        # Map by condition
-        condition_clean = condition.lower().strip()
+        return _map_condition_cached(str(condition), str(grade) if grade else "")
+    
+    @staticmethod
+    def map_conditions(conditions, grades=None) -> pd.Series:
+        """
+        Map a column of conditions (and optional grades) in one pass
         
-        # Direct mapping
-        if condition_clean in CONDITION_MAPPINGS:
-            return CONDITION_MAPPINGS[condition_clean]
+        Each distinct (condition, grade) pair is resolved once.
         
-        # Fuzzy matching for common variations
-        for key, value in CONDITION_MAPPINGS.items():
-            if key in condition_clean or condition_clean in key:
-                return value
+        Returns:
+            Series of eBay condition enums aligned to the input index
+        """
+        conditions = pd.Series(conditions).fillna('').astype(str)
+        if grades is None:
+            grades = pd.Series('', index=conditions.index)
+        else:
+            grades = pd.Series(grades, index=conditions.index).fillna('').astype(str)
         
-        # Default fallback based on common terms
-        if any(term in condition_clean for term in ['new', 'mint', 'sealed']):
-            return 'NEW'
-        elif any(term in condition_clean for term in ['excellent', 'near mint']):
-            return 'USED_EXCELLENT'
-        elif any(term in condition_clean for term in ['very good', 'light']):
-            return 'USED_VERY_GOOD'
-        elif any(term in condition_clean for term in ['good', 'normal']):
-            return 'USED_GOOD'
-        elif any(term in condition_clean for term in ['acceptable', 'fair', 'heavy']):
-            return 'USED_ACCEPTABLE'
-        elif any(term in condition_clean for term in ['parts', 'broken', 'repair']):
-            return 'FOR_PARTS_OR_NOT_WORKING'
-        
-        # Ultimate fallback
-        logging.warning(f"Could not map condition '{condition}' with grade '{grade}', defaulting to USED_GOOD")
-        return 'USED_GOOD'
+        pairs = list(zip(conditions, grades))
+        mapped = {pair: ConditionMapper.map_condition(*pair) for pair in set(pairs)}
+        return pd.Series([mapped[pair] for pair in pairs], index=conditions.index)
     
     @staticmethod
     def get_condition_description(condition: str, grade: str = "") -> str:
         """Get a human-readable description for the condition"""
         ebay_condition = ConditionMapper.map_condition(condition, grade)
+        base_description = ConditionMapper.DESCRIPTIONS.get(ebay_condition, 'Used item')
         
-        descriptions = {
-            'NEW': 'Brand new, unopened item in original packaging',
-            'LIKE_NEW': 'Opened but in like-new condition',
-            'NEW_OTHER': 'New item, may be missing original packaging',
-            'NEW_WITH_DEFECTS': 'New item with minor defects',
-            'CERTIFIED_REFURBISHED': 'Certified refurbished by manufacturer',
-            'SELLER_REFURBISHED': 'Refurbished by seller to working condition',
-            'USED_EXCELLENT': 'Used item in excellent condition',
-            'USED_VERY_GOOD': 'Used item in very good condition',
-            'USED_GOOD': 'Used item in good condition',
-            'USED_ACCEPTABLE': 'Used item in acceptable condition',
-            'FOR_PARTS_OR_NOT_WORKING': 'Item for parts or not working'
+        if grade:
+            return f"{base_description} (Grade: {grade})"
+        
+        return base_description
+
+
+# Normalized mapping keys, and one pattern that reports the longest key starting
+# at every position (alternatives are tried longest first inside a lookahead)
+_CONDITION_KEYS = {}
+for _key, _value in CONDITION_MAPPINGS.items():
+    _CONDITION_KEYS.setdefault(ConditionMapper.normalize(_key), _value)
+_CONDITION_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(key) for key in sorted(_CONDITION_KEYS, key=len, reverse=True)) + '))'
+)
+_GRADE_KEYS = {key.upper(): value for key, value in GRADE_MAPPINGS.items()}
+
+
+@lru_cache(maxsize=4096)
+def _map_condition_cached(condition: str, grade: str) -> str:
+    """Resolve one (condition, grade) pair; memoized per distinct input"""
+    # First try to map by grade if provided
+    if grade:
+        grade_clean = grade.strip().upper()
+        if grade_clean in _GRADE_KEYS:
+            return _GRADE_KEYS[grade_clean]
+    
+    condition_clean = ConditionMapper.normalize(condition)
+    
+    # Direct mapping
+    if condition_clean in _CONDITION_KEYS:
+        return _CONDITION_KEYS[condition_clean]
+    
+    if condition_clean:
+        # Longest mapping key contained in the input; ties go to the leftmost
+        best = None
+        for match in _CONDITION_PATTERN.finditer(condition_clean):
+            if best is None or len(match.group(1)) > len(best):
+                best = match.group(1)
+        if best:
+            return _CONDITION_KEYS[best]
+        
+        # Abbreviated input contained in a mapping key ("refurb"), first key in mapping order
+        for key, value in _CONDITION_KEYS.items():
+            if condition_clean in key:
+                return value
+        
+        # Default fallback based on common terms
+        for terms, value in ConditionMapper.FALLBACK_TERMS:
+            if any(term in condition_clean for term in terms):
+                return value
+    
+    # Ultimate fallback
+    logging.warning(f"Could not map condition '{condition}' with grade '{grade}', defaulting to USED_GOOD")
+    return 'USED_GOOD'
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class InventoryPayloadBuilder:
+    """Serializes inventory items straight to Inventory API request bytes
+    
+    The fixed availability/package structure is a shared byte template, and the
+    condition fields are serialized once per distinct (condition, grade) pair.
+    """
+    
+    ITEM_TEMPLATE = (
+        b'%s,"availability":{"shipToLocationAvailability":{"quantity":%d}},'
+        b'"product":%s,'
+        b'"packageWeightAndSize":{"dimensions":{"height":%s,"length":%s,"width":%s,"unit":"INCH"},'
+        b'"weight":{"value":%s,"unit":"POUND"}}}'
+    )
+    MAX_IMAGES = 12
+    
+    def __init__(self):
+        self._condition_fragments: Dict[Tuple[str, str], bytes] = {}
+    
+    def condition_fragment(self, condition: str, grade: str) -> bytes:
+        """Serialized condition/conditionDescription fields for a (condition, grade) pair"""
+        key = (condition, grade)
+        fragment = self._condition_fragments.get(key)
+        if fragment is None:
+            fragment = b'"condition":%s,"conditionDescription":%s' % (
+                dumps(ConditionMapper.map_condition(condition, grade)),
+                dumps(ConditionMapper.get_condition_description(condition, grade))
+            )
+            self._condition_fragments[key] = fragment
+        return fragment
+    
+    def build_item(self, item: InventoryItem) -> bytes:
+        """Request body for a single PUT inventory_item/{sku}"""
+        return b'{' + self._item_body(
+            item.sku, item.title, item.description, item.condition, item.grade, item.quantity,
+            item.brand, item.mpn, item.upc, item.images, item.dimensions["length"],
+            item.dimensions["width"], item.dimensions["height"], item.weight
+        )
+    
+    def build_bulk(self, batch: Union[List[InventoryItem], 'InventoryBatch']) -> Tuple[List[str], bytes]:
+        """
+        Request body for bulk_create_or_replace_inventory_item
+        
+        Args:
+            batch: InventoryItems, or an InventoryBatch read column by column
+            
+        Returns:
+            Tuple of (SKUs in request order, JSON body bytes)
+        """
+        entries = self.build_entries(batch)
+        skus = [sku for sku, _ in entries]
+        return skus, b'{"requests":[' + b','.join(entry for _, entry in entries) + b']}'
+    
+    def build_entries(self, batch: Union[List[InventoryItem], 'InventoryBatch']) -> List[Tuple[str, bytes]]:
+        """Serialized bulk request entries as (sku, entry bytes) in input order"""
+        if isinstance(batch, InventoryBatch):
+            frame = batch.frame
+            rows = zip(
+                frame['sku'], frame['title'], frame['description'], frame['condition'], frame['grade'],
+                frame['quantity'], frame['brand'], frame['mpn'], frame['upc'], frame['images'],
+                frame['length'], frame['width'], frame['height'], frame['weight']
+            )
+        else:
+            rows = (
+                (item.sku, item.title, item.description, item.condition, item.grade, item.quantity,
+                 item.brand, item.mpn, item.upc, item.images, item.dimensions["length"],
+                 item.dimensions["width"], item.dimensions["height"], item.weight)
+                for item in batch
+            )
+        
+        return [(row[0], b'{"sku":' + dumps(row[0]) + b',' + self._item_body(*row)) for row in rows]
+    
+    def payload_hashes(self, batch: Union[List[InventoryItem], 'InventoryBatch']) -> Dict[str, str]:
+        """SHA-1 of each item's serialized payload, keyed by SKU"""
+        return {sku: hashlib.sha1(entry).hexdigest() for sku, entry in self.build_entries(batch)}
+    
+    def _item_body(self, sku, title, description, condition, grade, quantity, brand, mpn, upc,
+                   images, length, width, height, weight) -> bytes:
+        """Everything after the opening brace of one inventory item object"""
+        product = {
+            "title": title,
+            "description": description,
+            "brand": brand,
+            "mpn": mpn if mpn else sku,
+            "imageUrls": list(images[:self.MAX_IMAGES]),
+            "aspects": {}
         }
         
-        base_description = descriptions.get(ebay_condition, 'Used item')
+        # Add UPC if provided
+        if upc:
+            product["upc"] = [upc]
+        
+        # Add brand to aspects if provided
+        if brand:
+            product["aspects"]["Brand"] = [brand]
         
+        # Add grade to aspects if provided
         if grade:
-            return f"{base_description} (Grade: {grade})"
+            product["aspects"]["Grade"] = [grade]
         
-        return base_description
+        return self.ITEM_TEMPLATE % (
+            self.condition_fragment(condition, grade), int(quantity), dumps(product),
+            _number(height), _number(length), _number(width), _number(weight)
+        )
+
+
+def _number(value) -> bytes:
+    """JSON number bytes for a float-like value (numpy scalars included)"""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"Non-finite number cannot be serialized to JSON: {value}")
+    return repr(value).encode('ascii')
+
+
+# Global payload builder instance
+_payload_builder = None
+
+
+def get_payload_builder() -> InventoryPayloadBuilder:
+    """Get or create the shared payload builder (and its fragment cache)"""
+    global _payload_builder
+    if _payload_builder is None:
+        _payload_builder = InventoryPayloadBuilder()
+    return _payload_builder
+
+
+# POST endpoints whose replay has no extra effect; other POSTs (offers, publish)
+# are only retried when the server cannot have acted on them
+IDEMPOTENT_POST_ENDPOINTS = frozenset({'bulk_create_or_replace_inventory_item'})
+
 
 class EbayAPI:
     """eBay API client with OAuth authentication and rate limiting"""
     
-    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None):
+    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None,
+                 transport: HTTPTransport = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.sandbox = sandbox
+        self.transport = transport or get_transport()
         self.user_token = user_token  # Optional pre-existing user token
         self.access_token = user_token if user_token else None
         self.token_expires = time.time() + 7200 if user_token else 0  # User tokens typically valid for 2 hours
@@ -132,9 +339,8 @@ class EbayAPI:
         self.inventory_url = f"{base_url}/sell/inventory/v1"
         self.oauth_url = "https://api.sandbox.ebay.com/identity/v1/oauth2/token" if sandbox else "https://api.ebay.com/identity/v1/oauth2/token"
 
-        # Rate limiting
-        self.last_request = 0
-        self.min_interval = 0.1  # 100ms between requests
+        # Rate limiting (shared Inventory API token bucket)
+        self.rate_limiter = get_rate_limiter('inventory')
 
         # Setup logging
         logging.basicConfig(level=logging.INFO)
@@ -163,7 +369,8 @@ class EbayAPI:
                 'scope': 'https://api.ebay.com/oauth/api_scope/sell.inventory'
             }
 
-            response = requests.post(self.oauth_url, headers=headers, data=data)
+            # Token requests have no side effects, so they are retried like GETs
+            response = self.transport.post(self.oauth_url, headers=headers, data=data, idempotent=True)
             response.raise_for_status()
 
             token_data = response.json()
@@ -187,13 +394,13 @@ class EbayAPI:
     
     def _rate_limit(self):
         """Enforce rate limiting between API calls"""
-        elapsed = time.time() - self.last_request
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self.last_request = time.time()
+        self.rate_limiter.acquire()
     
-    def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
-        """Make authenticated API request with rate limiting"""
+    def _make_request(self, method: str, endpoint: str, data: Union[Dict, bytes] = None) -> Dict:
+        """Make authenticated API request with rate limiting
+        
+        POST/PUT bodies may be passed pre-serialized as JSON bytes.
+        """
         if not self.authenticate():
             raise Exception("Failed to authenticate")
         
@@ -206,15 +413,17 @@ class EbayAPI:
         }
         
         url = f"{self.inventory_url}/{endpoint}"
+        body = {'data': data} if isinstance(data, bytes) else {'json': data}
         
         if method.upper() == 'GET':
-            response = requests.get(url, headers=headers, params=data)
+            response = self.transport.get(url, headers=headers, params=data)
         elif method.upper() == 'POST':
-            response = requests.post(url, headers=headers, json=data)
+            response = self.transport.post(url, headers=headers,
+                                           idempotent=endpoint in IDEMPOTENT_POST_ENDPOINTS, **body)
         elif method.upper() == 'PUT':
-            response = requests.put(url, headers=headers, json=data)
+            response = self.transport.put(url, headers=headers, **body)
         elif method.upper() == 'DELETE':
-            response = requests.delete(url, headers=headers)
+            response = self.transport.delete(url, headers=headers)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
         
@@ -229,59 +438,17 @@ class EbayAPI:
 class InventoryManager:
     """Manages eBay inventory items and bulk operations"""
     
-    def __init__(self, api: EbayAPI):
+    def __init__(self, api: EbayAPI, sync_index: SyncIndex = None):
         self.api = api
+        self.sync_index = sync_index
+        self.payload_builder = get_payload_builder()
         self.logger = logging.getLogger(__name__)
     
     def create_inventory_item(self, item: InventoryItem) -> bool:
         """Create a single inventory item"""
         try:
-            # Map condition using the condition mapper
-            ebay_condition = ConditionMapper.map_condition(item.condition, item.grade)
-            
-            inventory_data = {
-                "availability": {
-                    "shipToLocationAvailability": {
-                        "quantity": item.quantity
-                    }
-                },
-                "condition": ebay_condition,
-                "conditionDescription": ConditionMapper.get_condition_description(item.condition, item.grade),
-                "product": {
-                    "title": item.title,
-                    "description": item.description,
-                    "aspects": {},
-                    "brand": item.brand,
-                    "mpn": item.mpn if item.mpn else item.sku,
-                    "imageUrls": item.images[:12]  # Max 12 images
-                },
-                "packageWeightAndSize": {
-                    "dimensions": {
-                        "height": item.dimensions["height"],
-                        "length": item.dimensions["length"],
-                        "width": item.dimensions["width"],
-                        "unit": "INCH"
-                    },
-                    "weight": {
-                        "value": item.weight,
-                        "unit": "POUND"
-                    }
-                }
-            }
-            
-            # Add UPC if provided
-            if item.upc:
-                inventory_data["product"]["upc"] = [item.upc]
-            
-            # Add brand to aspects if provided
-            if item.brand:
-                inventory_data["product"]["aspects"]["Brand"] = [item.brand]
-            
-            # Add grade to aspects if provided
-            if item.grade:
-                inventory_data["product"]["aspects"]["Grade"] = [item.grade]
-            
-            response = self.api._make_request('PUT', f"inventory_item/{item.sku}", inventory_data)
+            body = self.payload_builder.build_item(item)
+            self.api._make_request('PUT', f"inventory_item/{item.sku}", body)
             self.logger.info(f"Created inventory item: {item.sku}")
             return True
             
@@ -289,87 +456,89 @@ class InventoryManager:
             self.logger.error(f"Failed to create inventory item {item.sku}: {e}")
             return False
     
-    def bulk_create_inventory_items(self, items: List[InventoryItem], batch_size: int = 25) -> Dict:
-        """Create multiple inventory items in batches"""
-        results = {"successful": [], "failed": []}
+    def bulk_create_inventory_items(self, items: Union[List[InventoryItem], 'InventoryBatch'],
+                                    batch_size: int = 25, hashes: Dict[str, str] = None) -> Dict:
+        """
+        Create multiple inventory items in batches
+        
+        With a sync index, SKUs whose payload matches the last successful push are
+        not sent and are reported under "unchanged".
+        
+        Args:
+            items: InventoryItems or an InventoryBatch
+            batch_size: Items per bulk request (API limit is 25)
+            hashes: Precomputed payload hashes (SKU -> hash), if the caller has them
+        """
+        items, hashes, results = self.plan_push(items, self.sync_index, hashes)
         
         # Process in batches of 25 (API limit)
         for i in range(0, len(items), batch_size):
             batch = items[i:i + batch_size]
-            batch_data = {"requests": []}
-            
-            for item in batch:
-                # Map condition using the condition mapper
-                ebay_condition = ConditionMapper.map_condition(item.condition, item.grade)
-                
-                inventory_data = {
-                    "sku": item.sku,
-                    "product": {
-                        "title": item.title,
-                        "description": item.description,
-                        "brand": item.brand,
-                        "mpn": item.mpn if item.mpn else item.sku,
-                        "imageUrls": item.images[:12],
-                        "aspects": {}
-                    },
-                    "condition": ebay_condition,
-                    "conditionDescription": ConditionMapper.get_condition_description(item.condition, item.grade),
-                    "availability": {
-                        "shipToLocationAvailability": {
-                            "quantity": item.quantity
-                        }
-                    },
-                    "packageWeightAndSize": {
-                        "dimensions": {
-                            "height": item.dimensions["height"],
-                            "length": item.dimensions["length"],
-                            "width": item.dimensions["width"],
-                            "unit": "INCH"
-                        },
-                        "weight": {
-                            "value": item.weight,
-                            "unit": "POUND"
-                        }
-                    }
-                }
-                
-                # Add UPC if provided
-                if item.upc:
-                    inventory_data["product"]["upc"] = [item.upc]
-                
-                # Add brand to aspects if provided
-                if item.brand:
-                    inventory_data["product"]["aspects"]["Brand"] = [item.brand]
-                
-                # Add grade to aspects if provided
-                if item.grade:
-                    inventory_data["product"]["aspects"]["Grade"] = [item.grade]
-                
-                batch_data["requests"].append(inventory_data)
+            skus, body = self.build_bulk_request(batch)
             
             try:
-                response = self.api._make_request('POST', 'bulk_create_or_replace_inventory_item', batch_data)
-                
-                # Process response
-                for idx, resp in enumerate(response.get('responses', [])):
-                    item_sku = batch[idx].sku
-                    if resp.get('statusCode') == 200:
-                        results["successful"].append(item_sku)
-                    else:
-                        results["failed"].append({
-                            "sku": item_sku,
-                            "error": resp.get('errors', ['Unknown error'])
-                        })
+                response = self.api._make_request('POST', 'bulk_create_or_replace_inventory_item', body)
+                self.collect_bulk_results(skus, response, results)
                 
                 self.logger.info(f"Processed batch {i//batch_size + 1}: {len(batch)} items")
                 
             except Exception as e:
                 self.logger.error(f"Batch creation failed: {e}")
-                for item in batch:
-                    results["failed"].append({"sku": item.sku, "error": str(e)})
+                for sku in skus:
+                    results["failed"].append({"sku": sku, "error": str(e)})
+        
+        if self.sync_index is not None:
+            self.sync_index.record(results["successful"], hashes)
         
         return results
     
+    @staticmethod
+    def plan_push(items: Union[List[InventoryItem], 'InventoryBatch'], sync_index: Optional[SyncIndex],
+                  hashes: Dict[str, str] = None):
+        """
+        Drop items unchanged since their last push
+        
+        Returns:
+            Tuple of (items to send, payload hashes, results dict seeded with "unchanged")
+        """
+        results = {"successful": [], "failed": []}
+        if sync_index is None:
+            return items, hashes, results
+        
+        if hashes is None:
+            hashes = get_payload_builder().payload_hashes(items)
+        
+        if sync_index.skip_unchanged:
+            diff = sync_index.diff(hashes)
+            results["unchanged"] = diff.unchanged
+            if diff.unchanged:
+                items = select_items(items, diff.to_push)
+        
+        return items, hashes, results
+    
+    @staticmethod
+    def build_bulk_request(batch: Union[List[InventoryItem], 'InventoryBatch']) -> Tuple[List[str], bytes]:
+        """
+        Build a serialized bulk_create_or_replace_inventory_item request body
+        
+        Returns:
+            Tuple of (SKUs in request order, JSON body bytes)
+        """
+        return get_payload_builder().build_bulk(batch)
+    
+    @staticmethod
+    def collect_bulk_results(skus: List[str], response: Dict, results: Dict) -> None:
+        """Map bulk response entries back to SKUs in the results dict"""
+        for idx, resp in enumerate(response.get('responses', [])):
+            item_sku = skus[idx]
+            if resp.get('statusCode') == 200:
+                results["successful"].append(item_sku)
+            else:
+                results["failed"].append({
+                    "sku": item_sku,
+                    "error": resp.get('errors', ['Unknown error'])
+                })
+    
     def get_inventory_item(self, sku: str) -> Dict:
         """Retrieve inventory item by SKU"""
         try:
@@ -389,24 +558,7 @@ class ListingManager:
                     marketplace_id: str = "EBAY_US") -> str:
         """Create an offer for an inventory item"""
         try:
-            offer_data = {
-                "sku": sku,
-                "marketplaceId": marketplace_id,
-                "format": "FIXED_PRICE",
-                "availableQuantity": 1,  # Will be pulled from inventory
-                "categoryId": category_id,
-                "pricingSummary": {
-                    "price": {
-                        "value": str(price),
-                        "currency": "USD"
-                    }
-                },
-                "listingPolicies": {
-                    "fulfillmentPolicyId": "DEFAULT",  # Replace with actual policy
-                    "paymentPolicyId": "DEFAULT",      # Replace with actual policy
-                    "returnPolicyId": "DEFAULT"        # Replace with actual policy
-                }
-            }
+            offer_data = self.build_offer_payload(sku, category_id, price, marketplace_id)
             
             response = self.api._make_request('POST', 'offer', offer_data)
             offer_id = response.get('offerId')
@@ -417,6 +569,29 @@ class ListingManager:
             self.logger.error(f"Failed to create offer for {sku}: {e}")
             return None
     
+    @staticmethod
+    def build_offer_payload(sku: str, category_id: str, price: float,
+                            marketplace_id: str = "EBAY_US") -> Dict:
+        """Build the request body for creating an offer"""
+        return {
+            "sku": sku,
+            "marketplaceId": marketplace_id,
+            "format": "FIXED_PRICE",
+            "availableQuantity": 1,  # Will be pulled from inventory
+            "categoryId": category_id,
+            "pricingSummary": {
+                "price": {
+                    "value": str(price),
+                    "currency": "USD"
+                }
+            },
+            "listingPolicies": {
+                "fulfillmentPolicyId": "DEFAULT",  # Replace with actual policy
+                "paymentPolicyId": "DEFAULT",      # Replace with actual policy
+                "returnPolicyId": "DEFAULT"        # Replace with actual policy
+            }
+        }
+    
     def publish_offer(self, offer_id: str) -> bool:
         """Publish an offer to create active listing"""
         try:
@@ -426,108 +601,480 @@ class ListingManager:
         except Exception as e:
             self.logger.error(f"Failed to publish offer {offer_id}: {e}")
             return False
+    
+    def bulk_create_offers(self, offers: List[Dict], batch_size: int = 25,
+                           max_retries: int = 2) -> Dict:
+        """
+        Create offers in batches of up to 25 via bulk_create_offer
+        
+        Args:
+            offers: Dicts with sku, category_id, price and optional marketplace_id
+            batch_size: Offers per call (API limit is 25)
+            max_retries: Extra passes for items that failed with a transient error
+            
+        Returns:
+            {"successful": {sku: offer_id}, "failed": [{"sku": ..., "error": ...}]}
+        """
+        requests_by_key = {
+            offer["sku"]: self.build_offer_payload(
+                offer["sku"], offer["category_id"], offer["price"],
+                offer.get("marketplace_id", "EBAY_US")
+            )
+            for offer in offers
+        }
+        
+        succeeded, failed = self._run_bulk(
+            'bulk_create_offer', requests_by_key, 'sku', 'offerId', batch_size, max_retries
+        )
+        self.logger.info(f"Bulk created {len(succeeded)} offers, {len(failed)} failed")
+        
+        return {
+            "successful": succeeded,
+            "failed": [{"sku": sku, "error": error} for sku, error in failed.items()]
+        }
+    
+    def bulk_publish_offers(self, offer_ids: List[str], batch_size: int = 25,
+                            max_retries: int = 2) -> Dict:
+        """
+        Publish offers in batches of up to 25 via bulk_publish_offer
+        
+        Returns:
+            {"successful": {offer_id: listing_id}, "failed": [{"offer_id": ..., "error": ...}]}
+        """
+        requests_by_key = {offer_id: {"offerId": offer_id} for offer_id in offer_ids}
+        
+        succeeded, failed = self._run_bulk(
+            'bulk_publish_offer', requests_by_key, 'offerId', 'listingId', batch_size, max_retries
+        )
+        self.logger.info(f"Bulk published {len(succeeded)} offers, {len(failed)} failed")
+        
+        return {
+            "successful": succeeded,
+            "failed": [{"offer_id": offer_id, "error": error} for offer_id, error in failed.items()]
+        }
+    
+    def _run_bulk(self, endpoint: str, requests_by_key: Dict[str, Dict], key_field: str,
+                  result_field: str, batch_size: int, max_retries: int):
+        """
+        Send keyed requests to a bulk endpoint, retrying transient per-item failures
+        
+        Returns:
+            (succeeded {key: result_field value}, failed {key: error})
+        """
+        succeeded = {}
+        failed = {}
+        pending = list(requests_by_key)
+        
+        for attempt in range(max_retries + 1):
+            if attempt > 0:
+                time.sleep(backoff_delay(attempt - 1, 1.0, 30.0))
+                self.logger.info(f"Retrying {len(pending)} items on {endpoint} (attempt {attempt + 1})")
+            
+            retryable = []
+            
+            for i in range(0, len(pending), batch_size):
+                batch_keys = pending[i:i + batch_size]
+                batch_data = {"requests": [requests_by_key[key] for key in batch_keys]}
+                
+                try:
+                    response = self.api._make_request('POST', endpoint, batch_data)
+                except Exception as e:
+                    # Not replayed: the server may have created the offers before the
+                    # call failed (the transport already retried what was safe)
+                    self.logger.error(f"{endpoint} batch failed: {e}")
+                    for key in batch_keys:
+                        failed[key] = str(e)
+                    continue
+                
+                retryable.extend(self.collect_bulk_entries(
+                    batch_keys, response, key_field, result_field, succeeded, failed
+                ))
+            
+            pending = retryable
+            if not pending:
+                break
+        
+        return succeeded, failed
+    
+    @staticmethod
+    def collect_bulk_entries(batch_keys: List[str], response: Dict, key_field: str, result_field: str,
+                             succeeded: Dict[str, str], failed: Dict[str, object]) -> List[str]:
+        """
+        Match one bulk response's entries to the keys of its batch
+        
+        Returns:
+            Keys that are missing from the response or failed with a transient error
+        """
+        responses = response.get('responses', [])
+        retryable = []
+        
+        # Match entries by key; fall back to position when the key is absent
+        for idx, key in enumerate(batch_keys):
+            entry = next((r for r in responses if r.get(key_field) == key), None)
+            if entry is None and idx < len(responses) and not responses[idx].get(key_field):
+                entry = responses[idx]
+            
+            if entry is None:
+                failed[key] = "Missing from bulk response"
+                retryable.append(key)
+            elif entry.get('statusCode') in (200, 201):
+                succeeded[key] = entry.get(result_field)
+                failed.pop(key, None)
+            else:
+                failed[key] = entry.get('errors', ['Unknown error'])
+                if entry.get('statusCode') in RETRY_STATUS_CODES:
+                    retryable.append(key)
+        
+        return retryable
+
+class InventoryBatch:
+    """Columnar inventory rows parsed from a CSV; InventoryItems are built on demand"""
+    
+    def __init__(self, frame: pd.DataFrame, errors: List[Dict] = None):
+        """
+        Args:
+            frame: Valid rows with parsed columns (see CSVProcessor.parse_frame)
+            errors: Per-row validation errors as {"row", "sku", "error"} dicts
+        """
+        self.frame = frame
+        self.errors = errors or []
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    def __getitem__(self, rows: slice) -> 'InventoryBatch':
+        """Sub-batch of rows (errors stay with the parent batch)"""
+        return InventoryBatch(self.frame.iloc[rows])
+    
+    def select(self, skus: Iterable[str]) -> 'InventoryBatch':
+        """Sub-batch of the rows whose SKU is in skus"""
+        return InventoryBatch(self.frame[self.frame['sku'].isin(set(skus))])
+    
+    def __iter__(self):
+        """Yield InventoryItem objects one at a time"""
+        for row in self.frame.itertuples(index=False):
+            yield InventoryItem(
+                sku=row.sku,
+                title=row.title,
+                description=row.description,
+                condition=row.condition,
+                category_id=row.category_id,
+                price=row.price,
+                quantity=row.quantity,
+                brand=row.brand,
+                mpn=row.mpn,
+                upc=row.upc,
+                grade=row.grade,
+                weight=row.weight,
+                dimensions={"length": row.length, "width": row.width, "height": row.height},
+                images=list(row.images)
+            )
+    
+    def to_items(self) -> List[InventoryItem]:
+        """Materialize every row as an InventoryItem"""
+        return list(self)
+
 
 class CSVProcessor:
     """Processes CSV files for bulk inventory management"""
     
+    REQUIRED_COLUMNS = ['sku', 'title', 'description', 'category_id', 'price']
+    TEXT_COLUMNS = {'condition': 'NEW', 'brand': '', 'mpn': '', 'upc': '', 'grade': ''}
+    DEFAULT_DIMENSIONS = {"length": 10.0, "width": 10.0, "height": 10.0}
+    DIMENSIONS_PATTERN = r'^\s*(\d+(?:\.\d+)?)\s*[xX]\s*(\d+(?:\.\d+)?)\s*[xX]\s*(\d+(?:\.\d+)?)\s*$'
+    
     @staticmethod
     def load_items_from_csv(file_path: str) -> List[InventoryItem]:
         """Load inventory items from CSV file"""
-        items = []
+        return CSVProcessor.load_batch_from_csv(file_path).to_items()
+    
+    @staticmethod
+    def load_batch_from_csv(file_path: str) -> InventoryBatch:
+        """Load and validate a CSV file into a columnar InventoryBatch"""
+        try:
+            # Read everything as text so UPCs and SKUs keep their leading zeros
+            df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        except Exception as e:
+            logging.error(f"Error loading CSV file {file_path}: {e}")
+            return CSVProcessor._error_batch(f"Could not read CSV: {e}")
+        
+        batch = CSVProcessor.parse_frame(df)
+        
+        if batch.errors:
+            logging.warning(f"{len(batch.errors)} invalid rows in {file_path}; first: {batch.errors[0]}")
+        
+        return batch
+    
+    @staticmethod
+    def iter_batches_from_csv(file_path: str, chunksize: int = 500) -> Iterator[InventoryBatch]:
+        """
+        Stream a CSV file as InventoryBatch chunks so memory stays flat
         
+        Args:
+            file_path: Path to the inventory CSV
+            chunksize: Rows parsed per chunk
+        """
         try:
-            df = pd.read_csv(file_path)
-            
-            for _, row in df.iterrows():
-                # Parse dimensions if provided
-                dimensions = {"length": 10.0, "width": 10.0, "height": 10.0}
-                if 'dimensions' in row and pd.notna(row['dimensions']):
-                    dim_parts = str(row['dimensions']).split('x')
-                    if len(dim_parts) == 3:
-                        dimensions = {
-                            "length": float(dim_parts[0]),
-                            "width": float(dim_parts[1]),
-                            "height": float(dim_parts[2])
-                        }
+            reader = pd.read_csv(file_path, dtype=str, keep_default_na=False, chunksize=chunksize)
+        except Exception as e:
+            logging.error(f"Error loading CSV file {file_path}: {e}")
+            yield CSVProcessor._error_batch(f"Could not read CSV: {e}")
+            return
+        
+        first_line = 2
+        with reader:
+            while True:
+                try:
+                    chunk = next(reader)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    logging.error(f"Error reading CSV file {file_path} after line {first_line - 1}: {e}")
+                    yield CSVProcessor._error_batch(f"Could not read CSV after line {first_line - 1}: {e}")
+                    break
                 
-                # Parse image URLs
-                images = []
-                if 'images' in row and pd.notna(row['images']):
-                    images = [url.strip() for url in str(row['images']).split(',')]
+                batch = CSVProcessor.parse_frame(chunk, first_line)
+                first_line += len(chunk)
                 
-                item = InventoryItem(
-                    sku=str(row['sku']),
-                    title=str(row['title']),
-                    description=str(row['description']),
-                    condition=str(row.get('condition', 'NEW')),
-                    category_id=str(row['category_id']),
-                    price=float(row['price']),
-                    quantity=int(row.get('quantity', 1)),
-                    brand=str(row.get('brand', '')),
-                    mpn=str(row.get('mpn', '')),
-                    upc=str(row.get('upc', '')),
-                    grade=str(row.get('grade', '')),
-                    weight=float(row.get('weight', 1.0)),
-                    dimensions=dimensions,
-                    images=images
-                )
-                items.append(item)
+                if batch.errors:
+                    logging.warning(f"{len(batch.errors)} invalid rows in chunk ending at line {first_line - 1}")
                 
-        except Exception as e:
-            logging.error(f"Error loading CSV file {file_path}: {e}")
+                yield batch
+    
+    @staticmethod
+    def _error_batch(message: str) -> InventoryBatch:
+        """Empty batch carrying a file-level error"""
+        return InventoryBatch(CSVProcessor.parse_frame(pd.DataFrame()).frame, [
+            {"row": None, "sku": "", "error": message}
+        ])
+    
+    @staticmethod
+    def parse_frame(df: pd.DataFrame, first_line: int = 2) -> InventoryBatch:
+        """
+        Parse and validate raw CSV columns with vectorized string operations
+        
+        Args:
+            df: Raw CSV data (text columns)
+            first_line: CSV line number of the first row, used in the error report
             
-        return items
+        Returns:
+            InventoryBatch with valid rows and a per-row error report
+        """
+        df = df.astype(str).apply(lambda col: col.str.strip()) if len(df.columns) else df
+        line_numbers = pd.Series(range(first_line, first_line + len(df)), index=df.index)
+        errors = pd.Series('', index=df.index)
+        
+        def flag(mask: pd.Series, message: str):
+            errors.loc[mask & (errors == '')] = message
+        
+        missing_columns = [col for col in CSVProcessor.REQUIRED_COLUMNS if col not in df.columns]
+        if missing_columns:
+            message = f"Missing required column(s): {', '.join(missing_columns)}"
+            for col in missing_columns:
+                df[col] = ''
+            flag(pd.Series(True, index=df.index), message)
+        
+        parsed = pd.DataFrame(index=df.index)
+        for col in ['sku', 'title', 'description', 'category_id']:
+            parsed[col] = df[col]
+            flag(df[col] == '', f"Missing {col}")
+        
+        for col, default in CSVProcessor.TEXT_COLUMNS.items():
+            parsed[col] = df[col].replace('', default) if col in df.columns else default
+        
+        parsed['price'] = pd.to_numeric(df['price'], errors='coerce')
+        flag(~np.isfinite(parsed['price']), "Invalid price")
+        flag(parsed['price'] <= 0, "Invalid price (must be greater than 0)")
+        
+        for col, default in (('quantity', 1), ('weight', 1.0)):
+            if col in df.columns:
+                raw = df[col]
+                values = pd.to_numeric(raw, errors='coerce')
+                finite = np.isfinite(values)
+                flag(~finite & (raw != ''), f"Invalid {col}")
+                parsed[col] = values.where(finite, default)
+            else:
+                parsed[col] = default
+        flag(parsed['quantity'] % 1 != 0, "Invalid quantity (must be a whole number)")
+        flag(parsed['quantity'] < 1, "Invalid quantity (must be at least 1)")
+        parsed['quantity'] = parsed['quantity'].astype(int)
+        parsed['weight'] = parsed['weight'].astype(float)
+        
+        # Dimensions: "LxWxH" in inches, blank means defaults
+        dims = CSVProcessor.DEFAULT_DIMENSIONS
+        if 'dimensions' in df.columns:
+            extracted = df['dimensions'].str.extract(CSVProcessor.DIMENSIONS_PATTERN).astype(float)
+            flag(extracted[0].isna() & (df['dimensions'] != ''), "Invalid dimensions (expected LxWxH)")
+            flag(~np.isfinite(extracted.fillna(0)).all(axis=1), "Invalid dimensions (expected LxWxH)")
+            parsed['length'] = extracted[0].fillna(dims['length'])
+            parsed['width'] = extracted[1].fillna(dims['width'])
+            parsed['height'] = extracted[2].fillna(dims['height'])
+        else:
+            parsed['length'], parsed['width'], parsed['height'] = dims['length'], dims['width'], dims['height']
+        
+        # Images: comma-separated URLs
+        if 'images' in df.columns:
+            images = df['images'].str.split(r'\s*,\s*', regex=True)
+            parsed['images'] = images.where(df['images'] != '', pd.Series([[]] * len(df), index=df.index))
+        else:
+            parsed['images'] = pd.Series([[]] * len(df), index=df.index, dtype=object)
+        
+        invalid = errors != ''
+        error_report = [
+            {"row": int(line), "sku": sku, "error": error}
+            for line, sku, error in zip(line_numbers[invalid], parsed.loc[invalid, 'sku'], errors[invalid])
+        ]
+        
+        return InventoryBatch(parsed.loc[~invalid].reset_index(drop=True), error_report)
+
+def empty_results() -> Dict:
+    """Running totals for process_csv_file"""
+    return {"inventory_created": 0, "inventory_failed": 0, "failed_items": [], "invalid_rows": []}
+
+
+def select_items(items: Union[List[InventoryItem], 'InventoryBatch'], skus: Iterable[str]):
+    """Keep only the given SKUs from a list of items or an InventoryBatch"""
+    if isinstance(items, InventoryBatch):
+        return items.select(skus)
+    skus = set(skus)
+    return [item for item in items if item.sku in skus]
+
+
+def merge_results(totals: Dict, results: Dict) -> Dict:
+    """Accumulate per-batch processing results into running totals"""
+    for key, value in results.items():
+        if isinstance(value, list):
+            totals.setdefault(key, []).extend(value)
+        else:
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
 
 class EbayAutolister:
     """Main application class for eBay automated listing"""
     
-    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None):
+    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None,
+                 sync_index: SyncIndex = None):
         self.api = EbayAPI(client_id, client_secret, sandbox, user_token)
-        self.inventory = InventoryManager(self.api)
+        self.inventory = InventoryManager(self.api, sync_index)
         self.listings = ListingManager(self.api)
         self.logger = logging.getLogger(__name__)
         
-    def process_csv_file(self, csv_path: str, create_listings: bool = False) -> Dict:
-        """Process CSV file and create inventory items and optionally listings"""
-        items = CSVProcessor.load_items_from_csv(csv_path)
+    def process_csv_file(self, csv_path: str, create_listings: bool = False, concurrency: int = 1,
+                         chunksize: Optional[int] = None, journal: JobJournal = None) -> Dict:
+        """
+        Process CSV file and create inventory items and optionally listings
         
-        if not items:
+        Args:
+            csv_path: Path to the inventory CSV
+            create_listings: Create and publish offers for created items
+            concurrency: Requests in flight at once; above 1 uses the asyncio engine
+            chunksize: Stream the file in chunks of this many rows instead of loading it whole
+            journal: Optional JobJournal; work it records as done is skipped (resume)
+        """
+        if journal is not None:
+            journal.start(csv_path, create_listings)
+        
+        if chunksize:
+            batches = CSVProcessor.iter_batches_from_csv(csv_path, chunksize)
+        else:
+            batches = [CSVProcessor.load_batch_from_csv(csv_path)]
+        
+        if concurrency > 1:
+            import asyncio
+            from async_ebay_api import AsyncEbayAPI, process_batches_async
+            
+            async_api = AsyncEbayAPI(
+                self.api.client_id, self.api.client_secret, self.api.sandbox,
+                self.api.user_token, max_concurrency=concurrency, sync_index=self.inventory.sync_index
+            )
+            results = asyncio.run(process_batches_async(async_api, batches, create_listings, journal=journal))
+        else:
+            results = empty_results()
+            for batch in batches:
+                results["invalid_rows"].extend(batch.errors)
+                if len(batch):
+                    merge_results(results, self._process_items(batch, create_listings, journal))
+        
+        if not any(results.get(key) for key in
+                   ("inventory_created", "inventory_failed", "inventory_skipped", "inventory_unchanged")):
             self.logger.error("No items found in CSV file")
-            return {"success": False, "message": "No items found"}
+            return {"success": False, "message": "No items found", "invalid_rows": results["invalid_rows"]}
+        
+        return results
+    
+    def _process_items(self, items: Union[List[InventoryItem], InventoryBatch], create_listings: bool = False,
+                       journal: JobJournal = None) -> Dict:
+        """Create inventory items (and optionally listings) for one batch of items
+        
+        With a journal, SKUs already created with the same payload are skipped
+        and existing offers are reused instead of created again.
+        """
+        hashes, plan, pending = None, None, items
+        if journal is not None or self.inventory.sync_index is not None:
+            hashes = self.inventory.payload_builder.payload_hashes(items)
+        if journal is not None:
+            plan = journal.plan(hashes)
+            pending = select_items(items, plan.pending)
         
         # Create inventory items
-        self.logger.info(f"Creating {len(items)} inventory items...")
-        inventory_results = self.inventory.bulk_create_inventory_items(items)
+        self.logger.info(f"Creating {len(pending)} inventory items...")
+        if len(pending):
+            inventory_results = self.inventory.bulk_create_inventory_items(pending, hashes=hashes)
+        else:
+            inventory_results = {"successful": [], "failed": []}
+        unchanged = inventory_results.get("unchanged", [])
+        
+        if journal is not None:
+            journal.record_inventory(inventory_results["successful"], inventory_results["failed"], hashes)
         
         results = {
             "inventory_created": len(inventory_results["successful"]),
             "inventory_failed": len(inventory_results["failed"]),
             "failed_items": inventory_results["failed"]
         }
+        if self.inventory.sync_index is not None:
+            results["inventory_unchanged"] = len(unchanged)
+        if plan is not None:
+            results["inventory_skipped"] = len(plan.created)
         
         if create_listings:
-            # Create and publish listings for successful inventory items
-            listings_created = 0
-            listings_failed = 0
+            # Create and publish listings for successful inventory items, 25 per call.
+            # Unchanged SKUs keep the offers from their last push and are not re-offered.
+            listable = set(inventory_results["successful"])
+            open_offers = {}
+            if plan is not None:
+                listable = (listable | plan.created) - plan.published
+                open_offers = {sku: offer_id for sku, offer_id in plan.open_offers.items() if sku in listable}
             
-            for item in items:
-                if item.sku in inventory_results["successful"]:
-                    offer_id = self.listings.create_offer(
-                        item.sku, item.category_id, item.price
-                    )
-                    
-                    if offer_id:
-                        if self.listings.publish_offer(offer_id):
-                            listings_created += 1
-                        else:
-                            listings_failed += 1
-                    else:
-                        listings_failed += 1
+            offer_results = self.listings.bulk_create_offers([
+                {"sku": item.sku, "category_id": item.category_id, "price": item.price}
+                for item in items if item.sku in listable and item.sku not in open_offers
+            ])
+            # Journal the offer ids before publishing so a crash mid-publish resumes
+            # by publishing them instead of creating duplicate offers
+            if journal is not None:
+                journal.record_offers(offer_results["successful"], offer_results["failed"])
+            
+            offer_skus = {**open_offers, **offer_results["successful"]}
+            publish_results = self.listings.bulk_publish_offers(list(offer_skus.values()))
+            
+            if journal is not None:
+                sku_by_offer = {offer_id: sku for sku, offer_id in offer_skus.items()}
+                journal.record_listings(
+                    {sku_by_offer[offer_id]: listing_id
+                     for offer_id, listing_id in publish_results["successful"].items()},
+                    [{"sku": sku_by_offer[f["offer_id"]], "error": f["error"]} for f in publish_results["failed"]]
+                )
             
             results.update({
-                "listings_created": listings_created,
-                "listings_failed": listings_failed
+                "listings_created": len(publish_results["successful"]),
+                "listings_failed": len(offer_results["failed"]) + len(publish_results["failed"])
             })
+            if unchanged:
+                results["listings_unchanged"] = len(unchanged)
+            if plan is not None:
+                results["listings_skipped"] = len(plan.published)
         
         return results
     
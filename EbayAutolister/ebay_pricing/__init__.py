@@ -7,7 +7,7 @@ Defines core data structures for market research and pricing recommendations.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -38,6 +38,7 @@ class MarketData:
     price_range_high: float = 0.0
     sold_count: int = 0
     sold_listings: List[SoldListing] = field(default_factory=list)
+    sold_by_condition: Dict[str, Dict[str, float]] = field(default_factory=dict)  # Condition -> stats of its comps
 
     # Active listings data
     active_listing_count: int = 0
@@ -47,7 +48,9 @@ class MarketData:
     # Metadata
     confidence: float = 0.0  # 0.0-1.0 confidence score
     data_age_hours: float = 0.0
+    stale: bool = False  # Served from cache past its soft TTL
     sources: List[str] = field(default_factory=list)
+    source_latency: Dict[str, float] = field(default_factory=dict)  # Seconds per queried source
     created_at: datetime = field(default_factory=datetime.now)
 
     def __repr__(self):
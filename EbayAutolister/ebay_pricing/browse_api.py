@@ -6,16 +6,69 @@ Uses eBay Browse API to query current active listings and analyze competitive pr
 """
 
 import os
+import json
 import time
 import logging
 import statistics
+import threading
 import requests
 import base64
-from typing import Dict, Any, List
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 from config import CONDITION_MAPPINGS
+from http_session import HTTPTransport, get_transport
+from rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Application tokens are reused until this many seconds before they expire
+TOKEN_EXPIRY_MARGIN = 60
+
+
+class TokenStore:
+    """Application OAuth tokens persisted to a JSON file so restarts can reuse them"""
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: Token file (defaults to ebay_app_tokens.json next to the pricing cache)
+        """
+        if path is None:
+            path = Path(__file__).parent.parent / "ebay_app_tokens.json"
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, key: str) -> Optional[Tuple[str, float]]:
+        """(access token, expiry epoch) stored under key if still usable"""
+        entry = self._read().get(key)
+        if not entry or entry.get('expires_at', 0) - TOKEN_EXPIRY_MARGIN <= time.time():
+            return None
+        return entry['access_token'], entry['expires_at']
+
+    def save(self, key: str, access_token: Optional[str], expires_at: float = 0):
+        """Store a token (None removes it); the file is only readable by its owner"""
+        with self._lock:
+            tokens = {k: v for k, v in self._read().items() if v.get('expires_at', 0) > time.time()}
+            if access_token:
+                tokens[key] = {'access_token': access_token, 'expires_at': expires_at}
+            else:
+                tokens.pop(key, None)
+
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            try:
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(tokens, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not persist eBay app token: {e}")
+
 
 class EbayBrowseAPI:
     """Client for eBay Browse API"""
@@ -38,8 +91,10 @@ class EbayBrowseAPI:
         'FOR_PARTS_OR_NOT_WORKING': '7000'
     }
 
-    def __init__(self):
+    def __init__(self, transport: HTTPTransport = None, token_store: TokenStore = None):
         """Initialize eBay Browse API client"""
+        self.transport = transport or get_transport()
+        self.token_store = token_store
         self.client_id = os.getenv('EBAY_CLIENT_ID', '')
         self.client_secret = os.getenv('EBAY_CLIENT_SECRET', '')
         self.sandbox = os.getenv('EBAY_SANDBOX', 'false').lower() == 'true'
@@ -54,8 +109,12 @@ class EbayBrowseAPI:
 
         self.access_token = None
         self.token_expires_at = 0
-        self.min_interval = 0.1  # 100ms between requests (rate limiting)
-        self.last_request_time = 0
+        self._token_lock = threading.Lock()
+        self.rate_limiter = get_rate_limiter('browse')
+
+    @property
+    def _token_key(self) -> str:
+        return f"{self.client_id}@{self.oauth_url}"
 
     def _get_auth_header(self) -> str:
         """Generate base64 encoded auth header"""
@@ -81,13 +140,15 @@ class EbayBrowseAPI:
         }
 
         try:
-            response = requests.post(self.oauth_url, headers=headers, data=data, timeout=10)
+            response = self.transport.post(self.oauth_url, headers=headers, data=data, timeout=10, idempotent=True)
             response.raise_for_status()
 
             result = response.json()
             self.access_token = result.get('access_token')
             expires_in = result.get('expires_in', 7200)
             self.token_expires_at = time.time() + expires_in
+            if self.token_store is not None:
+                self.token_store.save(self._token_key, self.access_token, self.token_expires_at)
 
             logger.info("eBay Browse API authenticated successfully")
             return True
@@ -96,18 +157,40 @@ class EbayBrowseAPI:
             logger.error(f"eBay Browse API authentication failed: {e}")
             return False
 
+    def _token_valid(self) -> bool:
+        return bool(self.access_token) and time.time() < self.token_expires_at - TOKEN_EXPIRY_MARGIN
+
     def _ensure_authenticated(self) -> bool:
-        """Ensure we have a valid access token"""
-        if not self.access_token or time.time() >= self.token_expires_at - 60:
+        """Ensure we have a valid access token (one refresh at a time across threads)"""
+        if self._token_valid():
+            return True
+
+        with self._token_lock:
+            if self._token_valid():
+                return True
+
+            if self.token_store is not None:
+                stored = self.token_store.load(self._token_key)
+                if stored is not None:
+                    self.access_token, self.token_expires_at = stored
+                    logger.info("Reusing persisted eBay Browse API token")
+                    return True
+
             return self.authenticate()
-        return True
+
+    def invalidate_token(self, token: str = None):
+        """Drop the current token (e.g. after a 401) unless another thread already replaced it"""
+        with self._token_lock:
+            if token is not None and token != self.access_token:
+                return
+            self.access_token = None
+            self.token_expires_at = 0
+            if self.token_store is not None:
+                self.token_store.save(self._token_key, None)
 
     def _rate_limit(self):
         """Apply rate limiting between requests"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire()
 
     def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
         """
@@ -126,14 +209,23 @@ class EbayBrowseAPI:
         self._rate_limit()
 
         url = f"{self.base_url}/{endpoint}"
+        token = self.access_token
         headers = {
-            'Authorization': f'Bearer {self.access_token}',
+            'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json',
             'X-EBAY-C-MARKETPLACE-ID': 'EBAY_US'
         }
 
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = self.transport.get(url, headers=headers, params=params, timeout=10)
+            if response.status_code == 401:
+                # Token revoked or expired early (possibly a stale persisted one); retry once
+                logger.warning("eBay Browse API token rejected, re-authenticating")
+                self.invalidate_token(token)
+                if not self._ensure_authenticated():
+                    raise Exception("Failed to authenticate with eBay API")
+                headers['Authorization'] = f'Bearer {self.access_token}'
+                response = self.transport.get(url, headers=headers, params=params, timeout=10)
             response.raise_for_status()
             return response.json()
 
@@ -208,6 +300,29 @@ class EbayBrowseAPI:
             return {}
 
 
+# Process-wide Browse API clients keyed by (client id, sandbox)
+_clients: Dict[Tuple[str, bool], EbayBrowseAPI] = {}
+_clients_lock = threading.Lock()
+
+
+def get_browse_api() -> EbayBrowseAPI:
+    """
+    Get the shared Browse API client for the configured credentials.
+
+    The client keeps its application token in memory and in a TokenStore, and
+    sends requests over the shared pooled transport.
+    """
+    key = (os.getenv('EBAY_CLIENT_ID', ''), os.getenv('EBAY_SANDBOX', 'false').lower() == 'true')
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = EbayBrowseAPI(token_store=TokenStore())
+                _clients[key] = client
+    return client
+
+
 def _get_minimum_price_filter(brand: str, model: str) -> float:
     """
     Determine minimum price filter to exclude accessories and parts.
@@ -268,7 +383,7 @@ def analyze_active_competition(brand: str, model: str, condition: str) -> Dict[s
     Returns:
         Dictionary with pricing statistics
     """
-    api = EbayBrowseAPI()
+    api = get_browse_api()
 
     # Determine minimum price based on brand/product type to exclude accessories
     min_price = _get_minimum_price_filter(brand, model)
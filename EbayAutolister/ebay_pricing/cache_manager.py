@@ -5,36 +5,169 @@ Cache Manager for eBay Pricing
 Provides SQLite-based caching for market data to minimize API costs and improve performance.
 """
 
+import atexit
 import sqlite3
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
 from ebay_pricing import MarketData, SoldListing
+from ebay_pricing.codec import decode_market_data, encode_market_data, is_encoded
 from config import PRICING_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# PRAGMA user_version of the current schema
+# 1 = data_json holds codec blobs, 2 = hit_count/last_hit_at columns
+_SCHEMA_VERSION = 2
+
+# Buffered hit counts are written to SQLite once this many accumulate
+_HIT_FLUSH_THRESHOLD = 100
+
+# SQLite's default limit on bound parameters per statement is 999
+_IN_CHUNK = 500
+
+# SQL kept as constants so each thread's connection reuses its prepared statements
+_SELECT_ENTRY = "SELECT data_json, created_at, expires_at FROM market_cache WHERE cache_key = ?"
+_UPSERT_ENTRY = """
+    INSERT INTO market_cache
+    (cache_key, brand, model, condition, data_json, created_at, expires_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(cache_key) DO UPDATE SET
+        brand = excluded.brand, model = excluded.model, condition = excluded.condition,
+        data_json = excluded.data_json, created_at = excluded.created_at, expires_at = excluded.expires_at
+"""
+_RECORD_HITS = "UPDATE market_cache SET hit_count = hit_count + ?, last_hit_at = ? WHERE cache_key = ?"
+_DELETE_ENTRY = "DELETE FROM market_cache WHERE cache_key = ?"
+
+
+class MemoryCache:
+    """Thread-safe LRU with a per-entry TTL and hit/miss/eviction counters"""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 900):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid in memory
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        """Value for key, or None if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
 
 class CacheManager:
     """Manages SQLite cache for market pricing data"""
 
     def __init__(self, db_path: str = None):
-        """Initialize cache manager with SQLite database"""
+        """Initialize cache manager with SQLite database
+
+        Reads go through an in-process MemoryCache first; writes replace the
+        memory entry so it never serves data older than SQLite. Entries past
+        cache_duration_hours are stale: returned only to callers that allow it,
+        until cache_stale_hours later when they are dropped.
+        """
         if db_path is None:
             # Store in EbayAutolister directory
             base_dir = Path(__file__).parent.parent
             db_path = base_dir / "ebay_pricing_cache.db"
 
         self.db_path = str(db_path)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._pending_hits: Dict[str, int] = {}
+        self._hits_lock = threading.Lock()
+        self.memory = MemoryCache(PRICING_CONFIG.get('memory_cache_entries', 2048),
+                                  PRICING_CONFIG.get('memory_cache_ttl_seconds', 900))
         self._init_database()
         logger.info(f"Cache manager initialized: {self.db_path}")
 
+    def _get_connection(self) -> sqlite3.Connection:
+        """Persistent connection for the calling thread (WAL, synchronous=NORMAL)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=64,
+                                   check_same_thread=False)
+            # WAL lets readers proceed while another thread or process writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Flush buffered hit counts and close every thread's connection"""
+        self.flush_hits()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
     def _init_database(self):
         """Create database and table if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -45,7 +178,9 @@ class CacheManager:
                 condition TEXT NOT NULL,
                 data_json TEXT NOT NULL,
                 created_at TIMESTAMP NOT NULL,
-                expires_at TIMESTAMP NOT NULL
+                expires_at TIMESTAMP NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                last_hit_at TIMESTAMP
             )
         """)
 
@@ -54,10 +189,75 @@ class CacheManager:
             CREATE INDEX IF NOT EXISTS idx_expires_at ON market_cache(expires_at)
         """)
 
+        # One row per key being fetched, so processes don't fetch the same key twice
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS fetch_leases (
+                cache_key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
         conn.commit()
-        conn.close()
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self.migrate_legacy_entries()
+        if version < 2:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(market_cache)")}
+            with conn:
+                if 'hit_count' not in columns:
+                    conn.execute("ALTER TABLE market_cache ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 0")
+                if 'last_hit_at' not in columns:
+                    conn.execute("ALTER TABLE market_cache ADD COLUMN last_hit_at TIMESTAMP")
+        if version < _SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
         logger.debug("Database initialized successfully")
 
+    def migrate_legacy_entries(self, batch_size: int = 500) -> int:
+        """
+        Rewrite JSON-serialized rows in the compact binary format.
+
+        Runs once automatically when an older cache database is opened; legacy
+        rows are still readable if it is interrupted.
+
+        Returns:
+            Number of rows converted
+        """
+        conn = self._get_connection()
+        converted = 0
+        last_key = ''
+
+        while True:
+            rows = conn.execute("""
+                SELECT cache_key, data_json FROM market_cache
+                WHERE cache_key > ? ORDER BY cache_key LIMIT ?
+            """, (last_key, batch_size)).fetchall()
+            if not rows:
+                break
+            last_key = rows[-1][0]
+
+            updates = []
+            for cache_key, data in rows:
+                if is_encoded(data):
+                    continue
+                try:
+                    updates.append((self._serialize_market_data(self._deserialize_market_data(data)), cache_key))
+                except Exception as e:
+                    logger.warning(f"Dropping unreadable cache entry {cache_key}: {e}")
+                    updates.append((None, cache_key))
+
+            with conn:
+                conn.executemany("UPDATE market_cache SET data_json = ? WHERE cache_key = ?",
+                                 [update for update in updates if update[0] is not None])
+                conn.executemany(_DELETE_ENTRY, [(key,) for data, key in updates if data is None])
+            converted += len(updates)
+
+        if converted:
+            logger.info(f"Migrated {converted} cache entries to the binary format")
+        return converted
+
     def _generate_cache_key(self, brand: str, model: str, condition: str) -> str:
         """Generate consistent cache key from brand, model, condition"""
         # Normalize to lowercase and remove extra whitespace
@@ -67,7 +267,8 @@ class CacheManager:
 
         return f"{brand}_{model}_{condition}"
 
-    def get_cached_market_data(self, brand: str, model: str, condition: str) -> Optional[MarketData]:
+    def get_cached_market_data(self, brand: str, model: str, condition: str,
+                               allow_stale: bool = False) -> Optional[MarketData]:
         """
         Retrieve cached market data if available and fresh.
 
@@ -75,51 +276,92 @@ class CacheManager:
             brand: Product brand
             model: Product model
             condition: Item condition
+            allow_stale: Also return entries past their soft TTL (flagged stale)
 
         Returns:
-            MarketData if found and fresh, None otherwise
+            MarketData if found and fresh (or stale and allowed), None otherwise
         """
         cache_key = self._generate_cache_key(brand, model, condition)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT data_json, created_at, expires_at
-            FROM market_cache
-            WHERE cache_key = ?
-        """, (cache_key,))
+        market_data = self._from_memory(cache_key)
+        if market_data is not None:
+            if market_data.stale and not allow_stale:
+                return None
+            logger.debug(f"Memory cache hit: {cache_key}")
+            self._record_hit(cache_key)
+            return market_data
 
-        row = cursor.fetchone()
-        conn.close()
+        row = self._get_connection().execute(_SELECT_ENTRY, (cache_key,)).fetchone()
 
         if not row:
             logger.debug(f"Cache miss: {cache_key}")
             return None
 
-        data_json, created_at, expires_at = row
-        expires_at = datetime.fromisoformat(expires_at)
-
-        # Check if cache entry is still valid
-        if datetime.now() > expires_at:
-            logger.debug(f"Cache expired: {cache_key}")
+        market_data = self._load_entry(cache_key, *row)
+        if market_data is None:
             self._delete_cache_entry(cache_key)
             return None
+        if market_data.stale and not allow_stale:
+            logger.debug(f"Cache expired: {cache_key}")
+            return None
 
-        # Deserialize MarketData from JSON
-        try:
-            market_data = self._deserialize_market_data(data_json)
-            created_at_dt = datetime.fromisoformat(created_at)
-            age_hours = (datetime.now() - created_at_dt).total_seconds() / 3600
-            market_data.data_age_hours = age_hours
+        logger.info(f"Cache hit: {cache_key} (age: {market_data.data_age_hours:.1f}h"
+                    f"{', stale' if market_data.stale else ''})")
+        self._record_hit(cache_key)
+        return market_data
 
-            logger.info(f"Cache hit: {cache_key} (age: {age_hours:.1f}h)")
-            return market_data
+    def get_many(self, keys: Iterable[Tuple[str, str, str]], allow_stale: bool = False
+                 ) -> Tuple[Dict[Tuple[str, str, str], MarketData], List[Tuple[str, str, str]]]:
+        """
+        Look up many (brand, model, condition) keys with one query per 500 keys.
 
-        except Exception as e:
-            logger.error(f"Failed to deserialize cache data: {e}")
-            self._delete_cache_entry(cache_key)
-            return None
+        Args:
+            keys: (brand, model, condition) tuples; duplicates are looked up once
+            allow_stale: Count entries past their soft TTL as hits (flagged stale)
+
+        Returns:
+            Tuple of (hits keyed by the input tuple, misses in input order)
+        """
+        keys = list(dict.fromkeys(keys))
+        cache_keys = {key: self._generate_cache_key(*key) for key in keys}
+
+        loaded = {}
+        for cache_key in set(cache_keys.values()):
+            market_data = self._from_memory(cache_key)
+            if market_data is not None:
+                loaded[cache_key] = market_data
+
+        rows = {}
+        conn = self._get_connection()
+        unique_cache_keys = list(set(cache_keys.values()) - set(loaded))
+        for i in range(0, len(unique_cache_keys), _IN_CHUNK):
+            chunk = unique_cache_keys[i:i + _IN_CHUNK]
+            rows.update((row[0], row[1:]) for row in conn.execute(
+                f"SELECT cache_key, data_json, created_at, expires_at FROM market_cache "
+                f"WHERE cache_key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+
+        hits, misses, invalid = {}, [], set()
+        for key, cache_key in cache_keys.items():
+            if cache_key not in loaded:
+                row = rows.get(cache_key)
+                loaded[cache_key] = self._load_entry(cache_key, *row) if row else None
+                if row and loaded[cache_key] is None:
+                    invalid.add(cache_key)
+
+            if loaded[cache_key] is None or (loaded[cache_key].stale and not allow_stale):
+                misses.append(key)
+            else:
+                hits[key] = loaded[cache_key]
+                self._record_hit(cache_key)
+
+        if invalid:
+            with conn:
+                conn.executemany(_DELETE_ENTRY, [(cache_key,) for cache_key in invalid])
+
+        logger.info(f"Cache lookup: {len(hits)} hits, {len(misses)} misses")
+        return hits, misses
 
     def cache_market_data(self, market_data: MarketData) -> None:
         """
@@ -128,78 +370,197 @@ class CacheManager:
         Args:
             market_data: MarketData object to cache
         """
-        cache_key = self._generate_cache_key(
-            market_data.brand,
-            market_data.model,
-            market_data.condition
-        )
+        row = self._entry_row(market_data)
+
+        # Use INSERT OR REPLACE to update existing entries
+        with self._get_connection() as conn:
+            conn.execute(_UPSERT_ENTRY, row)
+        self._remember(row[0], market_data, row[5], row[6])
+
+        expires_at = datetime.fromisoformat(row[6])
+        logger.info(f"Cached market data: {row[0]} (expires: {expires_at.strftime('%Y-%m-%d %H:%M')})")
+
+    def put_many(self, market_datas: Iterable[MarketData]) -> int:
+        """
+        Store many MarketData objects in a single transaction.
 
-        # Serialize MarketData to JSON
-        data_json = self._serialize_market_data(market_data)
+        Returns:
+            Number of entries written
+        """
+        market_datas = list(market_datas)
+        rows = [self._entry_row(market_data) for market_data in market_datas]
+
+        with self._get_connection() as conn:
+            conn.executemany(_UPSERT_ENTRY, rows)
+        for row, market_data in zip(rows, market_datas):
+            self._remember(row[0], market_data, row[5], row[6])
+
+        logger.info(f"Cached market data for {len(rows)} keys")
+        return len(rows)
 
+    def _entry_row(self, market_data: MarketData) -> tuple:
+        """Build the market_cache row for a MarketData object"""
         created_at = datetime.now()
         cache_duration = timedelta(hours=PRICING_CONFIG['cache_duration_hours'])
         expires_at = created_at + cache_duration
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Use INSERT OR REPLACE to update existing entries
-        cursor.execute("""
-            INSERT OR REPLACE INTO market_cache
-            (cache_key, brand, model, condition, data_json, created_at, expires_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            cache_key,
+        return (
+            self._generate_cache_key(market_data.brand, market_data.model, market_data.condition),
             market_data.brand,
             market_data.model,
             market_data.condition,
-            data_json,
+            self._serialize_market_data(market_data),
             created_at.isoformat(),
             expires_at.isoformat()
-        ))
+        )
 
-        conn.commit()
-        conn.close()
+    def _remember(self, cache_key: str, market_data: MarketData, created_at: str, expires_at: str) -> None:
+        """Put a copy of an entry in the memory tier along with its SQLite timestamps"""
+        self.memory.put(cache_key, (replace(market_data), datetime.fromisoformat(created_at),
+                                    datetime.fromisoformat(expires_at)))
 
-        logger.info(f"Cached market data: {cache_key} (expires: {expires_at.strftime('%Y-%m-%d %H:%M')})")
+    def _from_memory(self, cache_key: str) -> Optional[MarketData]:
+        """Memory-tier entry as a fresh MarketData copy, honoring the SQLite expiry"""
+        entry = self.memory.get(cache_key)
+        if entry is None:
+            return None
 
-    def _delete_cache_entry(self, cache_key: str) -> None:
-        """Delete a specific cache entry"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        market_data, created_at, expires_at = entry
+        now = datetime.now()
+        if now > self._hard_expiry(expires_at):
+            self.memory.invalidate(cache_key)
+            return None
 
-        cursor.execute("DELETE FROM market_cache WHERE cache_key = ?", (cache_key,))
+        # Shallow copy so callers can't change what other lookups get back
+        return replace(market_data, data_age_hours=(now - created_at).total_seconds() / 3600,
+                       stale=now > expires_at)
+
+    @staticmethod
+    def _hard_expiry(expires_at: datetime) -> datetime:
+        """Time after which a stale entry may no longer be served"""
+        return expires_at + timedelta(hours=PRICING_CONFIG.get('cache_stale_hours', 0))
+
+    def _load_entry(self, cache_key: str, data_json: str, created_at: str,
+                    expires_at: str) -> Optional[MarketData]:
+        """Deserialize a row (flagging it stale past the soft TTL); None if past the hard TTL or unreadable"""
+        # Check if cache entry may still be served
+        expires_at_dt = datetime.fromisoformat(expires_at)
+        if datetime.now() > self._hard_expiry(expires_at_dt):
+            logger.debug(f"Cache expired: {cache_key}")
+            return None
 
-        conn.commit()
-        conn.close()
+        # Deserialize MarketData from JSON
+        try:
+            market_data = self._deserialize_market_data(data_json)
+            created_at_dt = datetime.fromisoformat(created_at)
+            age_hours = (datetime.now() - created_at_dt).total_seconds() / 3600
+            market_data.data_age_hours = age_hours
+            market_data.stale = datetime.now() > expires_at_dt
+            self._remember(cache_key, market_data, created_at, expires_at)
+            return market_data
+
+        except Exception as e:
+            logger.error(f"Failed to deserialize cache data: {e}")
+            return None
+
+    def _record_hit(self, cache_key: str) -> None:
+        """Count a hit in memory; counts reach SQLite in batches"""
+        with self._hits_lock:
+            self._pending_hits[cache_key] = self._pending_hits.get(cache_key, 0) + 1
+            flush = sum(self._pending_hits.values()) >= _HIT_FLUSH_THRESHOLD
+        if flush:
+            self.flush_hits()
+
+    def flush_hits(self) -> None:
+        """Write buffered hit counts to SQLite"""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return
+
+        now = datetime.now().isoformat()
+        with self._get_connection() as conn:
+            conn.executemany(_RECORD_HITS, [(count, now, key) for key, count in pending.items()])
+
+    def hot_keys(self, limit: int = 50, expiring_within_hours: float = 6.0,
+                 decay: float = 0.5) -> List[Tuple[str, str, str]]:
+        """
+        Most-requested entries that expire soon (or already have).
+
+        Args:
+            limit: Maximum number of keys to return
+            expiring_within_hours: Only entries whose soft TTL ends within this window
+            decay: Multiply every hit count by this afterwards so rankings favor recent demand
+
+        Returns:
+            (brand, model, condition) tuples, most hits first
+        """
+        self.flush_hits()
+        cutoff = (datetime.now() + timedelta(hours=expiring_within_hours)).isoformat()
+
+        conn = self._get_connection()
+        rows = conn.execute("""
+            SELECT brand, model, condition FROM market_cache
+            WHERE hit_count > 0 AND expires_at <= ?
+            ORDER BY hit_count DESC
+            LIMIT ?
+        """, (cutoff, limit)).fetchall()
+
+        if decay < 1.0:
+            with conn:
+                conn.execute("UPDATE market_cache SET hit_count = CAST(hit_count * ? AS INTEGER)", (decay,))
+
+        return [tuple(row) for row in rows]
+
+    def acquire_lease(self, cache_key: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Claim the right to fetch a key, unless another owner holds an unexpired lease.
+
+        Returns:
+            True if owner now holds the lease
+        """
+        now = time.time()
+        with self._get_connection() as conn:
+            cursor = conn.execute("""
+                INSERT INTO fetch_leases (cache_key, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE fetch_leases.expires_at < ? OR fetch_leases.owner = excluded.owner
+            """, (cache_key, owner, now + lease_seconds, now))
+            return cursor.rowcount == 1
+
+    def release_lease(self, cache_key: str, owner: str) -> None:
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM fetch_leases WHERE cache_key = ? AND owner = ?", (cache_key, owner))
+
+    def _delete_cache_entry(self, cache_key: str) -> None:
+        """Delete a specific cache entry"""
+        self.memory.invalidate(cache_key)
+        with self._get_connection() as conn:
+            conn.execute(_DELETE_ENTRY, (cache_key,))
 
     def clear_stale_cache(self, max_age_hours: int = None) -> int:
         """
         Remove stale cache entries.
 
         Args:
-            max_age_hours: Override default cache duration (from config if None)
+            max_age_hours: Hours past expiry to keep entries (defaults to the
+                stale-while-revalidate window, cache_stale_hours)
 
         Returns:
             Number of entries deleted
         """
         if max_age_hours is None:
-            max_age_hours = PRICING_CONFIG['cache_duration_hours']
+            max_age_hours = PRICING_CONFIG.get('cache_stale_hours', 0)
 
         cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            DELETE FROM market_cache
-            WHERE expires_at < ?
-        """, (cutoff_time.isoformat(),))
-
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        self.memory.clear()
+        with self._get_connection() as conn:
+            cursor = conn.execute("""
+                DELETE FROM market_cache
+                WHERE expires_at < ?
+            """, (cutoff_time.isoformat(),))
+            deleted_count = cursor.rowcount
 
         logger.info(f"Cleared {deleted_count} stale cache entries")
         return deleted_count
@@ -211,14 +572,9 @@ class CacheManager:
         Returns:
             Number of entries deleted
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM market_cache")
-        deleted_count = cursor.rowcount
-
-        conn.commit()
-        conn.close()
+        self.memory.clear()
+        with self._get_connection() as conn:
+            deleted_count = conn.execute("DELETE FROM market_cache").rowcount
 
         logger.info(f"Cleared all cache ({deleted_count} entries)")
         return deleted_count
@@ -230,64 +586,37 @@ class CacheManager:
         Returns:
             Dictionary with cache stats
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._get_connection()
 
-        cursor.execute("SELECT COUNT(*) FROM market_cache")
-        total_count = cursor.fetchone()[0]
+        total_count = conn.execute("SELECT COUNT(*) FROM market_cache").fetchone()[0]
 
-        cursor.execute("""
+        valid_count = conn.execute("""
             SELECT COUNT(*)
             FROM market_cache
             WHERE expires_at >= ?
-        """, (datetime.now().isoformat(),))
-        valid_count = cursor.fetchone()[0]
-
-        conn.close()
+        """, (datetime.now().isoformat(),)).fetchone()[0]
 
         stale_count = total_count - valid_count
 
         return {
             'total_entries': total_count,
             'valid_entries': valid_count,
-            'stale_entries': stale_count
+            'stale_entries': stale_count,
+            'memory': self.memory.stats()
         }
 
-    def _serialize_market_data(self, market_data: MarketData) -> str:
-        """Convert MarketData to JSON string"""
-        # Convert sold_listings to dict format
-        sold_listings_data = []
-        for listing in market_data.sold_listings:
-            sold_listings_data.append({
-                'title': listing.title,
-                'price': listing.price,
-                'sold_date': listing.sold_date.isoformat(),
-                'condition': listing.condition,
-                'source': listing.source,
-                'url': listing.url
-            })
-
-        data_dict = {
-            'brand': market_data.brand,
-            'model': market_data.model,
-            'condition': market_data.condition,
-            'avg_sold_price': market_data.avg_sold_price,
-            'median_sold_price': market_data.median_sold_price,
-            'price_range_low': market_data.price_range_low,
-            'price_range_high': market_data.price_range_high,
-            'sold_count': market_data.sold_count,
-            'sold_listings': sold_listings_data,
-            'active_listing_count': market_data.active_listing_count,
-            'avg_active_price': market_data.avg_active_price,
-            'median_active_price': market_data.median_active_price,
-            'confidence': market_data.confidence,
-            'sources': market_data.sources
-        }
+    def _serialize_market_data(self, market_data: MarketData) -> bytes:
+        """Convert MarketData to the compact binary format (see ebay_pricing.codec)"""
+        return encode_market_data(market_data)
 
-        return json.dumps(data_dict)
+    def _deserialize_market_data(self, data) -> MarketData:
+        """Convert a stored entry to MarketData; legacy rows hold JSON text"""
+        if is_encoded(data):
+            return decode_market_data(data)
+        return self._deserialize_legacy_json(data)
 
-    def _deserialize_market_data(self, data_json: str) -> MarketData:
-        """Convert JSON string to MarketData object"""
+    def _deserialize_legacy_json(self, data_json: str) -> MarketData:
+        """Convert JSON string (pre-binary cache rows) to MarketData object"""
         data_dict = json.loads(data_json)
 
         # Convert sold_listings back to SoldListing objects
@@ -324,9 +653,16 @@ class CacheManager:
 _cache_instance = None
 
 
+_cache_lock = threading.Lock()
+
+
 def get_cache() -> CacheManager:
     """Get or create global cache instance"""
     global _cache_instance
     if _cache_instance is None:
-        _cache_instance = CacheManager()
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = CacheManager()
+                # Short runs never reach _HIT_FLUSH_THRESHOLD; keep their hits for hot_keys()
+                atexit.register(_cache_instance.flush_hits)
     return _cache_instance
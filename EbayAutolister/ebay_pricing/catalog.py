@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Offline Product Catalog
+
+Local SQLite index of products we have already identified: successful UPC
+lookups, enriched CSV outputs and MasterManifests/*.xlsx. Queryable by UPC,
+MPN or fuzzy brand+model (FTS5), so repeat SKUs resolve without a network call.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Column names accepted when importing CSV/xlsx files (matched case-insensitively)
+_COLUMN_ALIASES = {
+    'upc': ('upc', 'ean', 'barcode'),
+    'mpn': ('mpn', 'model number', 'part number'),
+    'brand': ('brand', 'manufacturer'),
+    'model': ('model',),
+    'title': ('title', 'product name', 'listing title', 'name'),
+    'category': ('category_name', 'category'),
+    'msrp': ('msrp', 'retail_price', 'orig. retail', 'retail price'),
+}
+
+
+def _normalize(text) -> str:
+    """Lowercase words of a brand/model/MPN, punctuation removed"""
+    if text is None or (isinstance(text, float) and text != text):
+        return ''
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', str(text).lower()).split())
+
+
+def _upc_key(upc) -> str:
+    """UPC/EAN digits without leading zeros, so a UPC-A and its EAN-13 match"""
+    if upc is None or (isinstance(upc, float) and upc != upc):
+        return ''
+    if isinstance(upc, float):
+        upc = int(upc)
+    return ''.join(filter(str.isdigit, str(upc))).lstrip('0')
+
+
+def _price(value) -> Optional[float]:
+    try:
+        price = float(str(value).replace('$', '').replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+class ProductCatalog:
+    """SQLite + FTS5 catalog of known products"""
+
+    def __init__(self, db_path: str = None):
+        """
+        Args:
+            db_path: SQLite file (defaults to product_catalog.db next to the pricing cache)
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent.parent / "product_catalog.db"
+
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_database()
+
+    def _init_database(self):
+        """Create catalog table, FTS index and sync triggers if they don't exist"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    id INTEGER PRIMARY KEY,
+                    product_key TEXT NOT NULL UNIQUE,
+                    upc TEXT,
+                    mpn TEXT,
+                    brand TEXT,
+                    model TEXT,
+                    title TEXT,
+                    category TEXT,
+                    msrp REAL,
+                    data_json TEXT,
+                    source TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_products_mpn ON products(mpn)")
+            self._conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                    brand, model, title, mpn, content='products', content_rowid='id'
+                )
+            """)
+            self._conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+                    INSERT INTO products_fts (rowid, brand, model, title, mpn)
+                    VALUES (new.id, new.brand, new.model, new.title, new.mpn);
+                END;
+                CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+                    INSERT INTO products_fts (products_fts, rowid, brand, model, title, mpn)
+                    VALUES ('delete', old.id, old.brand, old.model, old.title, old.mpn);
+                END;
+                CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE ON products BEGIN
+                    INSERT INTO products_fts (products_fts, rowid, brand, model, title, mpn)
+                    VALUES ('delete', old.id, old.brand, old.model, old.title, old.mpn);
+                    INSERT INTO products_fts (rowid, brand, model, title, mpn)
+                    VALUES (new.id, new.brand, new.model, new.title, new.mpn);
+                END;
+            """)
+
+    def close(self):
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, product: Dict, source: str = None) -> bool:
+        """
+        Insert or merge one product.
+
+        Known values are kept when the new record leaves a field empty.
+
+        Args:
+            product: Dict with any of upc, mpn, brand, model, title, category, msrp
+            source: Where the record came from (defaults to product['source'])
+
+        Returns:
+            False if the record has neither a UPC nor brand/model/title to key it by
+        """
+        return self.add_many([product], source) == 1
+
+    def add_many(self, products: Iterable[Dict], source: str = None) -> int:
+        """Insert or merge many products in one transaction; returns rows written"""
+        now = time.time()
+        rows = []
+        for product in products:
+            row = self._row(product, source, now)
+            if row is not None:
+                rows.append(row)
+
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO products (product_key, upc, mpn, brand, model, title, category, msrp,
+                                      data_json, source, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(product_key) DO UPDATE SET
+                    upc = COALESCE(excluded.upc, upc),
+                    mpn = COALESCE(excluded.mpn, mpn),
+                    brand = COALESCE(excluded.brand, brand),
+                    model = COALESCE(excluded.model, model),
+                    title = COALESCE(excluded.title, title),
+                    category = COALESCE(excluded.category, category),
+                    msrp = COALESCE(excluded.msrp, msrp),
+                    data_json = COALESCE(excluded.data_json, data_json),
+                    source = excluded.source,
+                    updated_at = excluded.updated_at
+            """, rows)
+        return len(rows)
+
+    @staticmethod
+    def _row(product: Dict, source: Optional[str], now: float) -> Optional[tuple]:
+        def text(name):
+            value = product.get(name)
+            if value is None or (isinstance(value, float) and value != value):
+                return None
+            value = str(value).strip()
+            return value or None
+
+        upc = _upc_key(product.get('upc')) or _upc_key(product.get('ean'))
+        brand, model, title, mpn = text('brand'), text('model'), text('title'), text('mpn')
+
+        if upc:
+            product_key = f"upc:{upc}"
+        elif _normalize(brand) and (_normalize(model) or _normalize(mpn)):
+            product_key = f"bm:{_normalize(brand)}|{_normalize(model or mpn)}"
+        elif _normalize(title):
+            product_key = f"title:{_normalize(title)}"
+        else:
+            return None
+
+        extra = {key: value for key, value in product.items()
+                 if key in ('images', 'description', 'lowest_price', 'highest_price') and value}
+        return (
+            product_key, text('upc') or text('ean'), mpn, brand, model, title, text('category'),
+            _price(product.get('msrp')), json.dumps(extra) if extra else None,
+            source or text('source') or 'unknown', now
+        )
+
+    def import_frame(self, df: pd.DataFrame, source: str) -> int:
+        """Import rows of a CSV/manifest DataFrame (columns matched by _COLUMN_ALIASES)"""
+        columns = {str(column).strip().lower(): column for column in df.columns}
+        mapping = {}
+        for field, aliases in _COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in columns:
+                    mapping[field] = columns[alias]
+                    break
+
+        if not mapping:
+            logger.warning(f"No catalog columns found in {source}")
+            return 0
+
+        # The model column of enriched CSVs often holds the MPN
+        if 'mpn' not in mapping and 'model' in mapping:
+            mapping['mpn'] = mapping['model']
+
+        subset = df[list(dict.fromkeys(mapping.values()))]
+        products = [
+            {field: record[column] for field, column in mapping.items()}
+            for record in subset.to_dict('records')
+        ]
+        return self.add_many(products, source)
+
+    def import_csv(self, csv_path: str) -> int:
+        """Import an enriched CSV; returns rows written"""
+        df = pd.read_csv(csv_path, dtype=str)
+        count = self.import_frame(df, f"csv:{Path(csv_path).name}")
+        logger.info(f"Catalog: imported {count} products from {csv_path}")
+        return count
+
+    def import_manifest(self, xlsx_path: str) -> int:
+        """Import every sheet of a manifest workbook (needs openpyxl); returns rows written"""
+        try:
+            sheets = pd.read_excel(xlsx_path, sheet_name=None, dtype=str)
+        except ImportError as e:
+            logger.warning(f"Cannot read {xlsx_path}: {e}")
+            return 0
+
+        count = sum(self.import_frame(df, f"manifest:{Path(xlsx_path).name}") for df in sheets.values())
+        logger.info(f"Catalog: imported {count} products from {xlsx_path}")
+        return count
+
+    def import_upc_cache(self, upc_cache=None) -> int:
+        """Backfill from products found by earlier UPC lookups; returns rows written"""
+        if upc_cache is None:
+            from ebay_pricing.upc_cache import UPCCache
+            upc_cache = UPCCache()
+        products = [product for _, product in upc_cache.items()]
+        count = self.add_many(products, 'upc_lookup')
+        logger.info(f"Catalog: imported {count} products from the UPC cache")
+        return count
+
+    def import_paths(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Import CSV/xlsx files, or every *.csv and *.xlsx in a directory"""
+        counts = {}
+        for path in map(Path, paths):
+            files = sorted(path.glob('*.xlsx')) + sorted(path.glob('*.csv')) if path.is_dir() else [path]
+            for file in files:
+                try:
+                    if file.suffix.lower() in ('.xlsx', '.xlsm'):
+                        counts[str(file)] = self.import_manifest(str(file))
+                    elif file.suffix.lower() == '.csv':
+                        counts[str(file)] = self.import_csv(str(file))
+                except Exception as e:
+                    logger.error(f"Catalog import of {file} failed: {e}")
+        return counts
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def by_upc(self, upc: str) -> Optional[Dict]:
+        """Product with this UPC/EAN"""
+        key = _upc_key(upc)
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM products WHERE product_key = ?", (f"upc:{key}",)).fetchone()
+        return self._product(row)
+
+    def by_mpn(self, mpn: str, brand: str = None) -> Optional[Dict]:
+        """Product with this manufacturer part number (and brand, if given)"""
+        if not _normalize(mpn):
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM products WHERE mpn = ? COLLATE NOCASE ORDER BY upc IS NULL, updated_at DESC",
+                (str(mpn).strip(),)
+            ).fetchall()
+        for row in rows:
+            if not brand or not row['brand'] or _normalize(row['brand']) == _normalize(brand):
+                return self._product(row)
+        return None
+
+    def search(self, brand: str = None, model: str = None, limit: int = 5) -> List[Dict]:
+        """
+        Fuzzy brand+model search: every word must appear in the product's
+        brand, model, title or MPN. Best matches first.
+        """
+        words = _normalize(f"{brand or ''} {model or ''}").split()
+        if not words:
+            return []
+        query = ' AND '.join(f'"{word}"' for word in words)
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT products.* FROM products_fts
+                JOIN products ON products.id = products_fts.rowid
+                WHERE products_fts MATCH ?
+                ORDER BY bm25(products_fts), products.upc IS NULL
+                LIMIT ?
+            """, (query, limit)).fetchall()
+        return [self._product(row) for row in rows]
+
+    def lookup(self, upc: str = None, brand: str = None, model: str = None) -> Optional[Dict]:
+        """Best known product: by UPC, then model as MPN, then fuzzy brand+model"""
+        product = self.by_upc(upc) if upc else None
+        if product is None and model:
+            product = self.by_mpn(model, brand)
+        if product is None and (brand or model):
+            matches = self.search(brand, model, limit=1)
+            product = matches[0] if matches else None
+        return product
+
+    @staticmethod
+    def _product(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        product = {key: row[key] for key in ('upc', 'mpn', 'brand', 'model', 'title', 'category', 'msrp', 'source')}
+        if row['data_json']:
+            product.update(json.loads(row['data_json']))
+        return product
+
+    def get_stats(self) -> Dict:
+        """Product counts overall, with a UPC, and per source"""
+        with self._lock:
+            total, with_upc = self._conn.execute(
+                "SELECT COUNT(*), COUNT(upc) FROM products"
+            ).fetchone()
+            sources = dict(self._conn.execute(
+                "SELECT source, COUNT(*) FROM products GROUP BY source"
+            ).fetchall())
+        return {'products': total, 'with_upc': with_upc, 'sources': sources}
+
+
+# Global catalog instance
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> ProductCatalog:
+    """Get or create global catalog instance"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ProductCatalog()
+    return _catalog
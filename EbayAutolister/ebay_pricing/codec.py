@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Compact binary codec for cached MarketData
+
+Layout (version 1):
+
+    b'MD' | version byte | zlib(
+        <II header: meta length, listing count>
+        meta JSON (scalar fields, per-condition sold stats, sources, source latency,
+                   interned string table)
+        float64[n] prices | float64[n] sold dates (epoch seconds)
+        int32[n] title | int32[n] condition | int32[n] source | int32[n] url
+    )
+
+String columns are indexes into the interned table (-1 means None). The
+sold listing columns are only decoded when sold_listings is first touched;
+pricing reads the aggregates in the meta JSON and never touches them.
+"""
+
+import json
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from datetime import datetime
+from typing import Callable, List
+
+from ebay_pricing import MarketData, SoldListing
+
+MAGIC = b'MD'
+VERSION = 1
+
+_HEADER = struct.Struct('<II')
+_materialize_lock = threading.Lock()
+_SCALAR_FIELDS = (
+    'brand', 'model', 'condition', 'avg_sold_price', 'median_sold_price', 'price_range_low',
+    'price_range_high', 'sold_count', 'sold_by_condition', 'active_listing_count', 'avg_active_price',
+    'median_active_price', 'confidence', 'sources', 'source_latency'
+)
+
+
+class LazySoldListings(list):
+    """List of SoldListing objects decoded from packed columns on first access"""
+
+    __slots__ = ('_decode', '_size')
+
+    def __init__(self, iterable=(), decode: Callable[[], List[SoldListing]] = None, size: int = 0):
+        super().__init__(iterable)
+        self._decode = decode
+        self._size = size
+
+    def _materialize(self):
+        if self._decode is not None:
+            with _materialize_lock:
+                if self._decode is not None:
+                    list.extend(self, self._decode())
+                    self._decode = None
+
+    @property
+    def materialized(self) -> bool:
+        return self._decode is None
+
+    def __len__(self) -> int:
+        if self._decode is not None:
+            return self._size
+        return list.__len__(self)
+
+    def __reduce__(self):
+        self._materialize()
+        return list, (list(self),)
+
+    def __reduce_ex__(self, protocol):
+        return self.__reduce__()
+
+
+def _materializing(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._materialize()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ('__iter__', '__reversed__', '__getitem__', '__setitem__', '__delitem__', '__contains__',
+              '__eq__', '__ne__', '__lt__', '__le__', '__gt__', '__ge__', '__add__', '__iadd__',
+              '__mul__', '__imul__', '__repr__', 'append', 'extend', 'insert', 'pop', 'remove',
+              'index', 'count', 'sort', 'reverse', 'copy', 'clear'):
+    setattr(LazySoldListings, _name, _materializing(_name))
+
+
+def _native(values: array) -> bytes:
+    """Array bytes in little-endian order"""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_native(typecode: str, data) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def is_encoded(data) -> bool:
+    """True if a stored value is in the binary format (as opposed to legacy JSON)"""
+    return isinstance(data, (bytes, memoryview)) and bytes(data[:2]) == MAGIC
+
+
+def encode_market_data(market_data: MarketData) -> bytes:
+    """Serialize MarketData to the compact binary format"""
+    listings = list(market_data.sold_listings)
+
+    strings = {}
+
+    def intern(value) -> int:
+        if value is None:
+            return -1
+        return strings.setdefault(value, len(strings))
+
+    titles = array('i', (intern(listing.title) for listing in listings))
+    conditions = array('i', (intern(listing.condition) for listing in listings))
+    sources = array('i', (intern(listing.source) for listing in listings))
+    urls = array('i', (intern(listing.url) for listing in listings))
+    prices = array('d', (float(listing.price) for listing in listings))
+    dates = array('d', (listing.sold_date.timestamp() for listing in listings))
+
+    meta = {name: getattr(market_data, name) for name in _SCALAR_FIELDS}
+    meta['strings'] = list(strings)
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+
+    body = b''.join((
+        _HEADER.pack(len(meta_bytes), len(listings)), meta_bytes,
+        _native(prices), _native(dates), _native(titles), _native(conditions), _native(sources), _native(urls)
+    ))
+    return MAGIC + bytes((VERSION,)) + zlib.compress(body)
+
+
+def decode_market_data(data: bytes) -> MarketData:
+    """Deserialize the binary format; sold_listings is decoded lazily"""
+    if not is_encoded(data):
+        raise ValueError("Not an encoded MarketData blob")
+    if data[2] != VERSION:
+        raise ValueError(f"Unsupported MarketData format version {data[2]}")
+
+    body = memoryview(zlib.decompress(data[3:]))
+    meta_length, count = _HEADER.unpack_from(body)
+    offset = _HEADER.size
+    meta = json.loads(bytes(body[offset:offset + meta_length]))
+    columns = body[offset + meta_length:]
+
+    def decode() -> List[SoldListing]:
+        strings = meta['strings']
+        position = 0
+        parsed = []
+        for typecode, size in (('d', 8), ('d', 8), ('i', 4), ('i', 4), ('i', 4), ('i', 4)):
+            parsed.append(_from_native(typecode, columns[position:position + size * count]))
+            position += size * count
+        prices, dates, titles, conditions, sources, urls = parsed
+
+        def lookup(index: int):
+            return strings[index] if index >= 0 else None
+
+        return [
+            SoldListing(
+                title=lookup(titles[i]),
+                price=prices[i],
+                sold_date=datetime.fromtimestamp(dates[i]),
+                condition=lookup(conditions[i]),
+                source=lookup(sources[i]),
+                url=lookup(urls[i])
+            )
+            for i in range(count)
+        ]
+
+    fields = {name: meta[name] for name in _SCALAR_FIELDS if name in meta}
+    return MarketData(sold_listings=LazySoldListings(decode=decode, size=count), **fields)
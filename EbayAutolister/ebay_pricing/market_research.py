@@ -18,6 +18,7 @@ from openai import OpenAI
 
 from ebay_pricing import SoldListing
 from config import PRICING_CONFIG
+from rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +54,7 @@ def research_sold_comps_ai(brand: str, model: str, condition: str) -> List[SoldL
         search_query = f"{brand} {model} sold ebay completed listings price"
 
         # Search with Tavily
+        get_rate_limiter('tavily').acquire()
         search_results = tavily.search(
             query=search_query,
             search_depth="advanced",  # More comprehensive search
@@ -123,6 +125,7 @@ RULES:
 """
 
     try:
+        get_rate_limiter('openai').acquire()
         response = client.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
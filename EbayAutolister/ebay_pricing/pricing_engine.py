@@ -7,9 +7,13 @@ using the formula: price = (avg_sold_last_30_days * 0.92) - condition_penalty
 """
 
 import logging
-from typing import Optional
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-from ebay_pricing import MarketData, PricingRecommendation
+from ebay_pricing import MarketData, PricingRecommendation, SoldListing
 from ebay_pricing.cache_manager import get_cache
 from ebay_pricing.market_research import research_sold_comps_ai, calculate_sold_stats
 from ebay_pricing.browse_api import analyze_active_competition
@@ -17,6 +21,10 @@ from config import PRICING_CONFIG, BEST_OFFER_CONFIG, CONDITION_MAPPINGS
 
 logger = logging.getLogger(__name__)
 
+# Condition under which a product's AI-researched sold comps (all grades) are cached
+ALL_CONDITIONS = 'ANY'
+_CONDITION_ENUMS = set(CONDITION_MAPPINGS.values())
+
 
 def get_pricing_recommendation(brand: str, model: str, condition: str,
                                retail_price: float = None, upc: str = None) -> PricingRecommendation:
@@ -33,45 +41,24 @@ def get_pricing_recommendation(brand: str, model: str, condition: str,
     Returns:
         PricingRecommendation with all price points
     """
-    # Try UPC lookup first for better product data
-    product_name = model
-    if upc:
-        from ebay_pricing.upc_lookup import lookup_product
-        upc_data = lookup_product(upc)
-
-        if upc_data:
-            logger.info(f"UPC lookup found: {upc_data['title']}")
-
-            # Use full product name for better searches
-            if upc_data.get('title'):
-                product_name = upc_data['title']
-
-            # Use MSRP from UPC if available and no retail_price provided
-            if not retail_price and upc_data.get('msrp'):
-                retail_price = upc_data['msrp']
-                logger.info(f"Using MSRP from UPC: ${retail_price:.2f}")
-
-            # Update brand if more accurate
-            if upc_data.get('brand'):
-                brand = upc_data['brand']
+    brand, product_name, retail_price = _resolve_product(brand, model, retail_price, upc)
 
     logger.info(f"Calculating pricing for: {brand} {product_name} ({condition})")
 
     # Normalize condition to eBay standard
     normalized_condition = CONDITION_MAPPINGS.get(condition.lower(), condition).upper()
 
-    # Step 1: Try to get from cache
+    # Step 1: Try to get from cache (stale entries are served while a refresh runs)
     cache = get_cache()
-    market_data = cache.get_cached_market_data(brand, product_name, normalized_condition)
+    market_data = cache.get_cached_market_data(brand, product_name, normalized_condition, allow_stale=True)
+    if market_data is not None and market_data.stale:
+        logger.info("Serving stale market data, refreshing in background")
+        schedule_refresh(brand, product_name, normalized_condition)
 
-    # Step 2: If not cached, fetch fresh market data
+    # Step 2: If not cached, fetch fresh market data (once per key across workers)
     if market_data is None:
         logger.info("Cache miss - fetching fresh market data")
-        market_data = fetch_market_data(brand, product_name, normalized_condition)
-
-        # Cache the results
-        if market_data.sold_count > 0 or market_data.active_listing_count > 0:
-            cache.cache_market_data(market_data)
+        market_data = fetch_market_data_once(brand, product_name, normalized_condition)
     else:
         logger.info(f"Using cached data (age: {market_data.data_age_hours:.1f}h)")
 
@@ -87,10 +74,301 @@ def get_pricing_recommendation(brand: str, model: str, condition: str,
     return pricing
 
 
+def _resolve_product(brand: str, model: str, retail_price: Optional[float] = None,
+                     upc: str = None, upc_data: Optional[Dict] = None) -> Tuple[str, str, Optional[float]]:
+    """
+    Improve brand, product name and retail price from a UPC lookup.
+
+    Args:
+        upc_data: Result of a lookup already made for upc (skips the lookup)
+
+    Returns:
+        Tuple of (brand, product_name, retail_price)
+    """
+    product_name = model
+    if upc and upc_data is None:
+        upc_data = identify_upcs([upc])[upc]
+
+    if upc_data:
+        logger.info(f"UPC lookup found: {upc_data['title']}")
+
+        # Use full product name for better searches
+        if upc_data.get('title'):
+            product_name = upc_data['title']
+
+        # Use MSRP from UPC if available and no retail_price provided
+        if not retail_price and upc_data.get('msrp'):
+            retail_price = upc_data['msrp']
+            logger.info(f"Using MSRP from UPC: ${retail_price:.2f}")
+
+        # Update brand if more accurate
+        if upc_data.get('brand'):
+            brand = upc_data['brand']
+
+    elif not retail_price:
+        # Known MSRP of the same product improves the fallback price
+        from ebay_pricing.catalog import get_catalog
+        known = get_catalog().lookup(brand=brand, model=model)
+        if known and known.get('msrp'):
+            retail_price = known['msrp']
+            logger.info(f"Using MSRP from catalog ({known.get('title') or model}): ${retail_price:.2f}")
+
+    return brand, product_name, retail_price
+
+
+def identify_upcs(upcs: Iterable[str]) -> Dict[str, Optional[Dict]]:
+    """
+    Product data for UPCs: offline catalog first, UPC providers (in batches)
+    for the rest.
+
+    Catalog entries without a brand (manifest rows carry only a truncated
+    product name) are looked up too; their MSRP is kept if the lookup has none.
+
+    Returns:
+        UPC as given -> product dict, or None if unknown
+    """
+    from ebay_pricing.catalog import get_catalog
+
+    catalog = get_catalog()
+    upcs = list(dict.fromkeys(upcs))
+    known = {upc: catalog.by_upc(upc) for upc in upcs}
+    results = {upc: product for upc, product in known.items() if product and product.get('brand')}
+
+    unresolved = [upc for upc in upcs if upc not in results]
+    if unresolved:
+        from ebay_pricing.upc_lookup import UPCLookup, lookup_products
+        found = lookup_products(unresolved)
+        for upc in unresolved:
+            product = found.get(UPCLookup.clean_upc(upc))
+            partial = known[upc]
+            if product is None:
+                product = partial
+            elif partial and partial.get('msrp') and not product.get('msrp'):
+                product = {**product, 'msrp': partial['msrp']}
+            results[upc] = product
+
+    return results
+
+
+def price_batch(items: Iterable[Dict], concurrency: int = 4,
+                progress_callback: Callable[[int, int], None] = None) -> List[PricingRecommendation]:
+    """
+    Price many items, fetching market data once per distinct product.
+
+    Rows with the same (brand, model, condition) share one cache lookup or
+    fetch. Cache hits are resolved with one bulk query and misses are fetched
+    with at most `concurrency` fetches in flight.
+
+    Args:
+        items: Dicts with brand, model and condition, and optionally
+            retail_price and upc (the arguments of get_pricing_recommendation)
+        concurrency: Maximum concurrent market data fetches
+        progress_callback: Called as progress_callback(rows_priced, total_rows)
+            whenever a product's market data is resolved
+
+    Returns:
+        PricingRecommendations in the same order as items
+    """
+    items = list(items)
+    total = len(items)
+    if not total:
+        return []
+
+    # Resolve UPCs once each
+    upc_data = identify_upcs(item['upc'] for item in items if item.get('upc'))
+
+    # Group rows by cache key (grades of one product still share its AI research)
+    cache = get_cache()
+    rows = []
+    groups: Dict[str, List[int]] = {}
+    keys: Dict[str, Tuple[str, str, str]] = {}
+    for index, item in enumerate(items):
+        upc = item.get('upc')
+        brand, product_name, retail_price = _resolve_product(
+            item['brand'], item['model'], item.get('retail_price'), upc, upc_data.get(upc)
+        )
+        condition = CONDITION_MAPPINGS.get(item['condition'].lower(), item['condition']).upper()
+        cache_key = cache._generate_cache_key(brand, product_name, condition)
+        rows.append((condition, retail_price))
+        keys.setdefault(cache_key, (brand, product_name, condition))
+        groups.setdefault(cache_key, []).append(index)
+
+    logger.info(f"Pricing {total} items ({len(groups)} distinct products)")
+
+    results: List[Optional[PricingRecommendation]] = [None] * total
+    priced = 0
+
+    def resolve(cache_key: str, market_data: MarketData):
+        nonlocal priced
+        for index in groups[cache_key]:
+            condition, retail_price = rows[index]
+            results[index] = calculate_pricing_from_market_data(market_data, condition, retail_price)
+        priced += len(groups[cache_key])
+        if progress_callback:
+            progress_callback(priced, total)
+
+    # Step 1: Bulk cache lookup (stale hits are served and refreshed in background)
+    hits, misses = cache.get_many(keys.values(), allow_stale=True)
+    for cache_key, key in keys.items():
+        market_data = hits.get(key)
+        if market_data is None:
+            continue
+        if market_data.stale:
+            schedule_refresh(*key)
+        resolve(cache_key, market_data)
+
+    # Step 2: Fetch the misses with bounded concurrency
+    missing = [cache_key for cache_key, key in keys.items() if key not in hits]
+    if missing:
+        logger.info(f"Cache hits: {len(keys) - len(missing)}, fetching {len(missing)} products")
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='price-batch') as executor:
+            futures = {executor.submit(fetch_market_data_once, *keys[cache_key]): cache_key
+                       for cache_key in missing}
+            for future in as_completed(futures):
+                cache_key = futures[future]
+                try:
+                    market_data = future.result()
+                except Exception as e:
+                    logger.error(f"Market data fetch failed for {keys[cache_key]}: {e}")
+                    brand, product_name, condition = keys[cache_key]
+                    market_data = MarketData(brand=brand, model=product_name, condition=condition)
+                resolve(cache_key, market_data)
+
+    return results
+
+
+def _listing_condition(condition: Optional[str]) -> Optional[str]:
+    """eBay condition of a sold comp's free-text condition, or None if unrecognized"""
+    if not condition:
+        return None
+    if condition in _CONDITION_ENUMS:
+        return condition
+    # "Used - Very Good" becomes "used very good"
+    return CONDITION_MAPPINGS.get(' '.join(re.sub(r'[^a-z]+', ' ', condition.lower()).split()))
+
+
+def sold_stats_by_condition(sold_listings: List[SoldListing]) -> Dict[str, Dict[str, float]]:
+    """calculate_sold_stats() of the comps of each recognized eBay condition"""
+    grouped: Dict[str, List[SoldListing]] = {}
+    for listing in sold_listings:
+        condition = _listing_condition(listing.condition)
+        if condition:
+            grouped.setdefault(condition, []).append(listing)
+    return {condition: calculate_sold_stats(listings) for condition, listings in grouped.items()}
+
+
+def condition_sold_stats(research: MarketData, condition: str) -> Optional[Dict[str, float]]:
+    """
+    Sold stats to price one condition of a researched product.
+
+    Stats of same-condition comps are used when there are at least
+    min_sold_samples of them; otherwise the all-grade stats are kept and the
+    condition penalty applied in calculate_pricing_from_market_data does the
+    adjusting. Only the aggregates are read, so cached comps are not decoded.
+
+    Args:
+        research: Product comps cached under ALL_CONDITIONS
+        condition: Normalized eBay condition
+
+    Returns:
+        Dictionary like calculate_sold_stats(), or None without sold comps
+    """
+    if not research.sold_count:
+        return None
+
+    by_condition = research.sold_by_condition
+    if not by_condition:
+        # Entries cached before per-condition stats were stored
+        by_condition = sold_stats_by_condition(research.sold_listings)
+
+    stats = by_condition.get(condition)
+    if stats and stats['sold_count'] >= PRICING_CONFIG['min_sold_samples']:
+        return stats
+    return {
+        'avg_sold_price': research.avg_sold_price,
+        'median_sold_price': research.median_sold_price,
+        'price_range_low': research.price_range_low,
+        'price_range_high': research.price_range_high,
+        'sold_count': research.sold_count
+    }
+
+
+def get_product_research(brand: str, model: str, allow_stale: bool = True) -> MarketData:
+    """
+    AI-researched sold comps for a product, shared by all of its conditions.
+
+    Tavily+GPT research does not depend on condition, so it is fetched once
+    per product and cached under ALL_CONDITIONS.
+
+    Args:
+        allow_stale: Serve a stale entry while a background refresh runs;
+            otherwise a stale entry is refetched before returning
+    """
+    research = get_cache().get_cached_market_data(brand, model, ALL_CONDITIONS, allow_stale=allow_stale)
+    if research is not None and research.stale:
+        schedule_refresh(brand, model, ALL_CONDITIONS)
+    if research is None:
+        research = fetch_market_data_once(brand, model, ALL_CONDITIONS)
+    return research
+
+
+def fetch_product_research(brand: str, model: str) -> MarketData:
+    """
+    Research a product's sold comps across all grades.
+
+    Returns:
+        MarketData under ALL_CONDITIONS with sold stats only
+    """
+    market_data = MarketData(brand=brand, model=model, condition=ALL_CONDITIONS, sources=[])
+
+    sold_listings, elapsed = _timed(research_sold_comps_ai, brand, model, ALL_CONDITIONS)
+    market_data.source_latency['ai_research'] = round(elapsed, 3)
+    if sold_listings:
+        sold_stats = calculate_sold_stats(sold_listings)
+        market_data.sold_listings = sold_listings
+        market_data.sold_by_condition = sold_stats_by_condition(sold_listings)
+        market_data.avg_sold_price = sold_stats['avg_sold_price']
+        market_data.median_sold_price = sold_stats['median_sold_price']
+        market_data.price_range_low = sold_stats['price_range_low']
+        market_data.price_range_high = sold_stats['price_range_high']
+        market_data.sold_count = sold_stats['sold_count']
+        market_data.sources.append('ai_research')
+    return market_data
+
+
+# Shared pool for the per-source research calls of fetch_market_data
+_source_executor = None
+_source_lock = threading.Lock()
+
+
+def _get_source_executor() -> ThreadPoolExecutor:
+    global _source_executor
+    with _source_lock:
+        if _source_executor is None:
+            _source_executor = ThreadPoolExecutor(
+                max_workers=PRICING_CONFIG.get('source_workers', 8),
+                thread_name_prefix='market-source'
+            )
+    return _source_executor
+
+
+def _timed(fn, *args):
+    """Run fn(*args) and return (result, seconds taken)"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
 def fetch_market_data(brand: str, model: str, condition: str) -> MarketData:
     """
     Fetch fresh market data from all sources.
 
+    AI research and the Browse API are queried concurrently. AI research is
+    shared by every condition of the product (see get_product_research); the
+    Browse API is queried for this condition only. A source that fails or
+    exceeds its timeout in PRICING_CONFIG['source_timeouts'] is left out and
+    the other one's data is still returned.
+
     Args:
         brand: Product brand
         model: Product model
@@ -106,15 +384,25 @@ def fetch_market_data(brand: str, model: str, condition: str) -> MarketData:
         sources=[]
     )
 
+    executor = _get_source_executor()
+    timeouts = PRICING_CONFIG.get('source_timeouts', {})
+    started = time.perf_counter()
+
+    logger.info("Fetching sold comps from AI research and active listings from Browse API...")
+    # Condition entries are cached with a full TTL, so never build one from stale research
+    sold_future = executor.submit(_timed, get_product_research, brand, model, False)
+    active_future = executor.submit(_timed, analyze_active_competition, brand, model, condition)
+
     # Fetch sold comps from AI research
     try:
-        logger.info("Fetching sold comps from AI research...")
-        sold_listings = research_sold_comps_ai(brand, model, condition)
-
-        if sold_listings:
-            market_data.sold_listings = sold_listings
-            sold_stats = calculate_sold_stats(sold_listings)
+        research, elapsed = sold_future.result(
+            timeout=_remaining(started, timeouts.get('ai_research'))
+        )
+        market_data.source_latency['ai_research'] = round(elapsed, 3)
 
+        # The comps themselves stay in the product's research entry
+        sold_stats = condition_sold_stats(research, condition)
+        if sold_stats:
             market_data.avg_sold_price = sold_stats['avg_sold_price']
             market_data.median_sold_price = sold_stats['median_sold_price']
             market_data.price_range_low = sold_stats['price_range_low']
@@ -124,13 +412,17 @@ def fetch_market_data(brand: str, model: str, condition: str) -> MarketData:
 
             logger.info(f"AI research: {market_data.sold_count} sold comps, avg ${market_data.avg_sold_price:.2f}")
 
+    except FutureTimeout:
+        logger.error(f"AI research timed out after {timeouts.get('ai_research')}s")
     except Exception as e:
         logger.error(f"AI research failed: {e}")
 
     # Fetch active listings from Browse API
     try:
-        logger.info("Fetching active listings from Browse API...")
-        active_stats = analyze_active_competition(brand, model, condition)
+        active_stats, elapsed = active_future.result(
+            timeout=_remaining(started, timeouts.get('browse_api'))
+        )
+        market_data.source_latency['browse_api'] = round(elapsed, 3)
 
         if active_stats['active_listing_count'] > 0:
             market_data.avg_active_price = active_stats['avg_active_price']
@@ -140,12 +432,145 @@ def fetch_market_data(brand: str, model: str, condition: str) -> MarketData:
 
             logger.info(f"Browse API: {market_data.active_listing_count} active listings, avg ${market_data.avg_active_price:.2f}")
 
+    except FutureTimeout:
+        logger.error(f"Browse API timed out after {timeouts.get('browse_api')}s")
     except Exception as e:
         logger.error(f"Browse API failed: {e}")
 
+    logger.debug(f"Market data fetched in {time.perf_counter() - started:.2f}s: {market_data.source_latency}")
+    return market_data
+
+
+def _remaining(started: float, timeout: Optional[float]) -> Optional[float]:
+    """Seconds left of a per-source timeout measured from the start of the fan-out"""
+    if timeout is None:
+        return None
+    return max(0.0, timeout - (time.perf_counter() - started))
+
+
+# Background refresh of stale cache entries
+_refresh_executor = None
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _refresh_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=PRICING_CONFIG.get('refresh_workers', 2),
+                thread_name_prefix='market-refresh'
+            )
+    return _refresh_executor
+
+
+def refresh_market_data(brand: str, model: str, condition: str) -> MarketData:
+    """
+    Fetch market data and store it in the cache.
+
+    Args:
+        brand: Product brand
+        model: Product model
+        condition: Item condition (normalized), or ALL_CONDITIONS for the
+            product's shared AI research
+
+    Returns:
+        The freshly fetched MarketData
+    """
+    if condition == ALL_CONDITIONS:
+        market_data = fetch_product_research(brand, model)
+    else:
+        market_data = fetch_market_data(brand, model, condition)
+    if market_data.sold_count > 0 or market_data.active_listing_count > 0:
+        get_cache().cache_market_data(market_data)
     return market_data
 
 
+def fetch_market_data_once(brand: str, model: str, condition: str, force: bool = False) -> MarketData:
+    """
+    Fetch and cache market data, sharing one fetch among concurrent callers.
+
+    Threads and processes asking for the same key while a fetch is in flight
+    receive its result instead of calling the research APIs again.
+
+    Args:
+        force: Fetch even if a fresh cache entry appears while waiting
+    """
+    from ebay_pricing.single_flight import get_single_flight
+
+    cache = get_cache()
+    check = None if force else (lambda: cache.get_cached_market_data(brand, model, condition))
+    return get_single_flight().do(
+        cache._generate_cache_key(brand, model, condition),
+        lambda: refresh_market_data(brand, model, condition),
+        check=check
+    )
+
+
+def schedule_refresh(brand: str, model: str, condition: str) -> bool:
+    """
+    Refresh a cache entry on a background thread.
+
+    Returns:
+        False if a refresh for this key is already queued or running
+    """
+    key = get_cache()._generate_cache_key(brand, model, condition)
+    with _refresh_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+
+    def run():
+        try:
+            fetch_market_data_once(brand, model, condition)
+        except Exception as e:
+            logger.error(f"Background refresh failed for {key}: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    _get_refresh_executor().submit(run)
+    return True
+
+
+def refresh_hot_keys(limit: int = 50, within_hours: float = 6.0, workers: int = None) -> Dict:
+    """
+    Pre-warm the most-requested cache entries before they expire.
+
+    Meant to run on a schedule (see `cli.py refresh-hot`).
+
+    Args:
+        limit: Maximum number of keys to refresh
+        within_hours: Refresh entries whose soft TTL ends within this many hours
+        workers: Concurrent fetches (defaults to PRICING_CONFIG['refresh_workers'])
+
+    Returns:
+        Dictionary with refreshed and failed (brand, model, condition) keys
+    """
+    keys = get_cache().hot_keys(limit=limit, expiring_within_hours=within_hours)
+    results = {"refreshed": [], "failed": []}
+    if not keys:
+        return results
+
+    logger.info(f"Refreshing {len(keys)} hot cache entries...")
+    with ThreadPoolExecutor(max_workers=workers or PRICING_CONFIG.get('refresh_workers', 2)) as executor:
+        futures = {executor.submit(fetch_market_data_once, *key, force=True): key for key in keys}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                market_data = future.result()
+                if market_data.sold_count > 0 or market_data.active_listing_count > 0:
+                    results["refreshed"].append(key)
+                else:
+                    results["failed"].append(key)
+            except Exception as e:
+                logger.error(f"Refresh failed for {key}: {e}")
+                results["failed"].append(key)
+
+    return results
+
+
 def calculate_pricing_from_market_data(market_data: MarketData, condition: str,
                                       retail_price: Optional[float] = None) -> PricingRecommendation:
     """
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Single-flight deduplication of market data fetches
+
+Concurrent callers asking for the same cache key share one fetch: threads in
+this process wait on the leader's Future, and other processes see the
+leader's lease row in the cache database and wait for the cached result.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, TypeVar
+
+from ebay_pricing.cache_manager import CacheManager, get_cache
+from config import PRICING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time, across threads and processes"""
+
+    def __init__(self, cache: Optional[CacheManager] = None, lease_seconds: float = 120,
+                 poll_interval: float = 0.5):
+        """
+        Args:
+            cache: CacheManager whose database holds the leases (None for in-process only)
+            lease_seconds: How long a lease is honored if its owner dies mid-fetch
+            poll_interval: Seconds between checks while another process holds the lease
+        """
+        self.cache = cache
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T], check: Callable[[], Optional[T]] = None) -> T:
+        """
+        Call fn once for all concurrent callers of key.
+
+        Args:
+            key: Deduplication key (a CacheManager cache key)
+            fn: The fetch; its result (or exception) is shared with every waiter
+            check: Returns the result if someone else already produced it (e.g. a
+                cache lookup); used while waiting on another process's lease
+
+        Returns:
+            fn's result, or check's result when another process produced it
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            logger.debug(f"Waiting for in-flight fetch: {key}")
+            return future.result()
+
+        try:
+            result = self._run_leased(key, fn, check)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _run_leased(self, key: str, fn: Callable[[], T], check: Callable[[], Optional[T]]) -> T:
+        if self.cache is None:
+            return fn()
+
+        waited = False
+        deadline = time.monotonic() + self.lease_seconds
+        while not self.cache.acquire_lease(key, self.owner, self.lease_seconds):
+            # Another process is fetching this key; take its result once cached
+            if not waited:
+                logger.info(f"Another process is fetching {key}, waiting")
+                waited = True
+            if check is not None:
+                result = check()
+                if result is not None:
+                    return result
+            if time.monotonic() > deadline:
+                logger.warning(f"Gave up waiting for lease on {key}, fetching anyway")
+                return fn()
+            time.sleep(self.poll_interval)
+
+        try:
+            # The previous holder (thread or process) may have just finished
+            if check is not None:
+                result = check()
+                if result is not None:
+                    return result
+            return fn()
+        finally:
+            self.cache.release_lease(key, self.owner)
+
+
+# Global single-flight instance
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get or create the process-wide SingleFlight backed by the pricing cache"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(get_cache(), PRICING_CONFIG.get('fetch_lease_seconds', 120))
+    return _single_flight
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Persistent UPC Lookup Cache
+
+Stores UPC lookup results in SQLite so they survive CLI runs: found products
+for UPC_CONFIG['cache_days'], not-found UPCs for the shorter
+UPC_CONFIG['negative_cache_hours']. Also keeps a per-provider count of calls
+made today so providers with a daily quota are skipped once it is spent.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from config import UPC_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class UPCCache:
+    """SQLite cache of UPC lookup results and provider quota counters"""
+
+    def __init__(self, db_path: str = None):
+        """
+        Args:
+            db_path: SQLite file (defaults to upc_cache.db next to the pricing cache)
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent.parent / "upc_cache.db"
+
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_database()
+
+    def _init_database(self):
+        """Create cache and quota tables if they don't exist"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS upc_products (
+                    upc TEXT PRIMARY KEY,
+                    data_json TEXT,
+                    source TEXT,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS upc_quota (
+                    provider TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    exhausted INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (provider, day)
+                )
+            """)
+
+    def close(self):
+        self._conn.close()
+
+    def get(self, upc: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Look up a cached result.
+
+        Returns:
+            Tuple of (cached, product); product is None for a cached not-found
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data_json FROM upc_products WHERE upc = ? AND expires_at > ?",
+                (upc, time.time())
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    def put(self, upc: str, product: Optional[Dict]):
+        """Cache a found product, or a not-found result when product is None"""
+        now = time.time()
+        if product is not None:
+            ttl = UPC_CONFIG['cache_days'] * 86400
+            data_json, source = json.dumps(product), product.get('source')
+        else:
+            ttl = UPC_CONFIG['negative_cache_hours'] * 3600
+            data_json, source = None, None
+
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO upc_products (upc, data_json, source, fetched_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(upc) DO UPDATE SET
+                    data_json = excluded.data_json, source = excluded.source,
+                    fetched_at = excluded.fetched_at, expires_at = excluded.expires_at
+            """, (upc, data_json, source, now, now + ttl))
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """(UPC, product) for every unexpired found product"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT upc, data_json FROM upc_products WHERE data_json IS NOT NULL AND expires_at > ?",
+                (time.time(),)
+            ).fetchall()
+        for upc, data_json in rows:
+            yield upc, json.loads(data_json)
+
+    def consume_quota(self, provider: str, calls: int = 1) -> bool:
+        """
+        Count calls against a provider's daily quota.
+
+        Returns:
+            False (and counts nothing) if the calls would exceed today's quota
+        """
+        limit = UPC_CONFIG['daily_quotas'].get(provider)
+        today = date.today().isoformat()
+
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT calls, exhausted FROM upc_quota WHERE provider = ? AND day = ?",
+                (provider, today)
+            ).fetchone()
+            used, exhausted = row if row else (0, 0)
+            if exhausted or (limit is not None and used + calls > limit):
+                return False
+
+            self._conn.execute("""
+                INSERT INTO upc_quota (provider, day, calls) VALUES (?, ?, ?)
+                ON CONFLICT(provider, day) DO UPDATE SET calls = calls + excluded.calls
+            """, (provider, today, calls))
+        return True
+
+    def remaining_quota(self, provider: str) -> Optional[int]:
+        """Calls left today for a provider (None when it has no daily limit)"""
+        limit = UPC_CONFIG['daily_quotas'].get(provider)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT calls, exhausted FROM upc_quota WHERE provider = ? AND day = ?",
+                (provider, date.today().isoformat())
+            ).fetchone()
+        used, exhausted = row if row else (0, 0)
+        if exhausted:
+            return 0
+        return None if limit is None else max(0, limit - used)
+
+    def mark_exhausted(self, provider: str):
+        """Skip a provider for the rest of the day (e.g. after it answered 429)"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO upc_quota (provider, day, exhausted) VALUES (?, ?, 1)
+                ON CONFLICT(provider, day) DO UPDATE SET exhausted = 1
+            """, (provider, date.today().isoformat()))
+
+    def quota_usage(self) -> Dict[str, Dict]:
+        """Today's calls, limit and exhausted flag per configured provider"""
+        with self._lock:
+            rows = dict(
+                (provider, (calls, exhausted)) for provider, calls, exhausted in self._conn.execute(
+                    "SELECT provider, calls, exhausted FROM upc_quota WHERE day = ?",
+                    (date.today().isoformat(),)
+                )
+            )
+
+        usage = {}
+        for provider, limit in UPC_CONFIG['daily_quotas'].items():
+            calls, exhausted = rows.get(provider, (0, 0))
+            usage[provider] = {'calls': calls, 'limit': limit,
+                               'exhausted': bool(exhausted) or (limit is not None and calls >= limit)}
+        return usage
+
+    def clear_expired(self) -> int:
+        """Delete expired results and past days' quota rows; returns results removed"""
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM upc_products WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            self._conn.execute("DELETE FROM upc_quota WHERE day < ?", (date.today().isoformat(),))
+        return removed
+
+    def get_stats(self) -> Dict:
+        """Counts of cached found and not-found UPCs"""
+        with self._lock:
+            found, missing = self._conn.execute("""
+                SELECT COALESCE(SUM(data_json IS NOT NULL), 0), COALESCE(SUM(data_json IS NULL), 0)
+                FROM upc_products WHERE expires_at > ?
+            """, (time.time(),)).fetchone()
+        return {'found': found, 'not_found': missing, 'quota': self.quota_usage()}
@@ -3,77 +3,296 @@
 UPC Product Lookup
 
 Uses UPC codes to get accurate product information and retail prices.
-Supports multiple free/paid APIs with fallbacks.
+Supports multiple free/paid APIs with fallbacks. Results (including
+not-found UPCs) are cached across runs in UPCCache, which also tracks each
+provider's daily quota.
 """
 
 import os
+import time
 import logging
+import threading
 import requests
-from typing import Optional, Dict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from ebay_pricing.upc_cache import UPCCache
+from config import UPC_CONFIG
+
 logger = logging.getLogger(__name__)
 
 
+class ProviderUnavailable(Exception):
+    """A provider could not answer (quota spent, rate limited or request failed)"""
+
+
 class UPCLookup:
     """Lookup product information using UPC/EAN codes"""
 
-    def __init__(self):
+    def __init__(self, cache: UPCCache = None):
         """Initialize with API keys from environment"""
         self.upcitemdb_key = os.getenv("UPCITEMDB_API_KEY")
         self.barcodelookup_key = os.getenv("BARCODELOOKUP_API_KEY")
-        self.cache = {}  # In-memory cache for session
+        self.cache = cache or UPCCache()
 
-    def lookup(self, upc: str) -> Optional[Dict]:
+    @staticmethod
+    def clean_upc(upc) -> str:
+        """Digits of a UPC/EAN (dashes, spaces etc. removed)"""
+        return ''.join(filter(str.isdigit, str(upc or '')))
+
+    def lookup(self, upc: str, hedged: bool = None) -> Optional[Dict]:
         """
         Lookup product by UPC code.
 
         Tries multiple services in order:
-        1. Cache
+        1. Cache (found and not-found results)
         2. UPCitemdb (free tier: 100/day)
         3. Barcode Lookup (paid: 500/day)
         4. OpenFoodFacts (free, groceries only)
 
+        Providers without an API key are not asked and providers whose daily
+        quota is spent are skipped. A UPC is cached as not found only if every
+        provider that was asked answered.
+
+        In hedged mode the next provider starts after UPC_CONFIG's
+        hedge_delay_seconds (or as soon as the ones before it miss) instead
+        of after the previous one's timeout. A provider with a daily quota is
+        only started early while at least hedge_min_quota_fraction of that
+        quota is left. The first result wins (ties go to the higher-priority
+        provider) and providers not yet started are cancelled.
+
         Args:
             upc: UPC/EAN barcode (digits only)
+            hedged: Override UPC_CONFIG['hedged']
 
         Returns:
             Dictionary with product info or None if not found
         """
-        if not upc or not upc.strip():
-            return None
-
         # Clean UPC (remove dashes, spaces)
-        upc = ''.join(filter(str.isdigit, str(upc)))
+        upc = self.clean_upc(upc)
 
         if not upc:
             return None
 
         # Check cache first
-        if upc in self.cache:
-            logger.debug(f"UPC cache hit: {upc}")
-            return self.cache[upc]
-
-        # Try UPCitemdb first (free)
-        result = self._try_upcitemdb(upc)
-        if result:
-            self.cache[upc] = result
+        cached, result = self.cache.get(upc)
+        if cached:
+            logger.debug(f"UPC cache hit: {upc}" if result else f"UPC cached as not found: {upc}")
             return result
 
-        # Try Barcode Lookup (paid)
-        result = self._try_barcodelookup(upc)
-        if result:
-            self.cache[upc] = result
-            return result
+        return self._lookup_providers(upc, self._providers(), hedged)
+
+    def lookup_many(self, upcs: Iterable[str], hedged: bool = None) -> Dict[str, Optional[Dict]]:
+        """
+        Lookup many UPCs, batching UPCitemdb requests.
+
+        Cached UPCs are answered from the cache. The rest go to UPCitemdb's
+        multi-UPC POST endpoint (UPC_CONFIG['upcitemdb_batch_size'] per
+        request, fewer once its daily quota runs low); UPCs it doesn't know
+        or had no quota left for fall through to the other providers
+        concurrently.
+
+        Args:
+            upcs: UPC/EAN barcodes (cleaned like lookup does; blanks ignored)
+            hedged: Override UPC_CONFIG['hedged'] for the per-UPC fallbacks
+
+        Returns:
+            Cleaned UPC -> product info or None if not found
+        """
+        upcs = [upc for upc in dict.fromkeys(self.clean_upc(upc) for upc in upcs) if upc]
+        results = {}
+        missing = []
+        for upc in upcs:
+            cached, result = self.cache.get(upc)
+            if cached:
+                results[upc] = result
+            else:
+                missing.append(upc)
+
+        if not missing:
+            return results
+        logger.info(f"UPC batch: {len(results)} cached, looking up {len(missing)}")
+
+        # UPCs UPCitemdb answered for (found or not) skip it in the fallback
+        answered = set()
+        if self.upcitemdb_key:
+            batch_size = UPC_CONFIG.get('upcitemdb_batch_size', 10)
+            i = 0
+            while i < len(missing):
+                # Shrink the last chunks to what is left of today's quota
+                quota = self.cache.remaining_quota('upcitemdb')
+                size = batch_size if quota is None else min(batch_size, quota)
+                if size <= 0:
+                    logger.info("UPCitemdb daily quota exhausted, skipping")
+                    break
+                chunk = missing[i:i + size]
+                i += size
+                try:
+                    found = self._try_upcitemdb_many(chunk)
+                except ProviderUnavailable:
+                    continue
+                except Exception as e:
+                    logger.error(f"UPCitemdb batch lookup failed: {e}")
+                    continue
+                answered.update(chunk)
+                for upc, result in found.items():
+                    self._remember(upc, result)
+                    results[upc] = result
+
+        remaining = [upc for upc in missing if upc not in results]
+        if remaining:
+            # A separate pool: these tasks wait on hedged calls running in the shared one
+            with ThreadPoolExecutor(max_workers=UPC_CONFIG.get('lookup_workers', 8),
+                                    thread_name_prefix='upc-batch') as executor:
+                futures = {
+                    upc: executor.submit(
+                        self._lookup_providers, upc,
+                        self._providers(skip_upcitemdb=upc in answered), hedged
+                    )
+                    for upc in remaining
+                }
+                for upc, future in futures.items():
+                    results[upc] = future.result()
+
+        return results
+
+    def _providers(self, skip_upcitemdb: bool = False) -> List[Callable[[str], Optional[Dict]]]:
+        """
+        Configured providers in priority order: UPCitemdb (free), Barcode Lookup
+        (paid), then OpenFoodFacts (free, but limited to food/consumer goods).
+        Providers without an API key are left out, so they don't stop a miss
+        from being cached as not found.
+        """
+        providers = [self._try_openfoodfacts]
+        if self.barcodelookup_key:
+            providers.insert(0, self._try_barcodelookup)
+        if self.upcitemdb_key and not skip_upcitemdb:
+            providers.insert(0, self._try_upcitemdb)
+        return providers
+
+    def _can_hedge(self, provider: Callable[[str], Optional[Dict]]) -> bool:
+        """Whether a provider has enough quota left to be started speculatively"""
+        name = provider.__name__[len('_try_'):]
+        quota = self.cache.remaining_quota(name)
+        if quota is None:
+            return True
+        limit = UPC_CONFIG['daily_quotas'].get(name)
+        return bool(limit) and quota >= limit * UPC_CONFIG.get('hedge_min_quota_fraction', 0.5)
+
+    def _lookup_providers(self, upc: str, providers: List[Callable[[str], Optional[Dict]]],
+                          hedged: bool = None) -> Optional[Dict]:
+        """Ask the providers for an uncached UPC and cache the outcome"""
+        if hedged is None:
+            hedged = UPC_CONFIG.get('hedged', True)
+
+        if hedged:
+            result, conclusive = self._lookup_hedged(upc, providers)
+        else:
+            result, conclusive = None, True
+            for provider in providers:
+                result, answered = self._attempt(provider, upc)
+                conclusive = conclusive and answered
+                if result:
+                    break
 
-        # Try OpenFoodFacts (free, but limited to food/consumer goods)
-        result = self._try_openfoodfacts(upc)
         if result:
-            self.cache[upc] = result
-            return result
+            self._remember(upc, result)
+        elif conclusive:
+            logger.warning(f"UPC not found in any database: {upc}")
+            self.cache.put(upc, None)
+        else:
+            logger.warning(f"UPC not found; some providers were unavailable, not caching: {upc}")
+        return result
+
+    def _remember(self, upc: str, result: Dict):
+        """Cache a found product and add it to the offline catalog"""
+        self.cache.put(upc, result)
+        try:
+            from ebay_pricing.catalog import get_catalog
+            get_catalog().add(result, 'upc_lookup')
+        except Exception as e:
+            logger.warning(f"Could not add UPC {upc} to catalog: {e}")
 
-        logger.warning(f"UPC not found in any database: {upc}")
-        return None
+    def _lookup_hedged(self, upc: str, providers: List[Callable[[str], Optional[Dict]]]
+                       ) -> Tuple[Optional[Dict], bool]:
+        """
+        Staggered concurrent lookup.
+
+        Returns:
+            Tuple of (first result found, whether every provider answered)
+        """
+        delay = UPC_CONFIG.get('hedge_delay_seconds', 1.0)
+        executor = _get_lookup_executor()
+        hedgeable = [self._can_hedge(provider) for provider in providers]
+        started = time.monotonic()
+        futures: List[Future] = []
+
+        while True:
+            # Start the next provider once its delay passed (if its quota allows
+            # hedging) or everything before it missed
+            while len(futures) < len(providers) and (
+                    (hedgeable[len(futures)] and time.monotonic() >= started + delay * len(futures))
+                    or all(future.done() for future in futures)):
+                futures.append(executor.submit(self._attempt, providers[len(futures)], upc))
+
+            # First result wins; among providers already finished, the higher priority one
+            for future in futures:
+                if future.done() and future.result()[0]:
+                    for pending in futures:
+                        pending.cancel()
+                    return future.result()[0], True
+
+            if all(future.done() for future in futures):
+                if len(futures) == len(providers):
+                    return None, all(future.result()[1] for future in futures)
+                continue
+
+            pending = [future for future in futures if not future.done()]
+            timeout = None
+            if len(futures) < len(providers) and hedgeable[len(futures)]:
+                timeout = max(0.0, started + delay * len(futures) - time.monotonic())
+            wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+    def _attempt(self, provider: Callable[[str], Optional[Dict]], upc: str) -> Tuple[Optional[Dict], bool]:
+        """Run one provider; returns (result, whether the provider answered)"""
+        try:
+            return provider(upc), True
+        except ProviderUnavailable:
+            return None, False
+        except Exception as e:
+            logger.error(f"UPC lookup via {provider.__name__} failed: {e}")
+            return None, False
+
+    def _call(self, provider: str, label: str, method: str, url: str, calls: int = 1,
+              **kwargs) -> requests.Response:
+        """
+        Send a provider request, counting it against the provider's daily quota.
+
+        Args:
+            calls: Lookups the request counts as (UPCs in a batch request)
+
+        Raises:
+            ProviderUnavailable: Quota spent, rate limited (429) or request failed
+        """
+        if not self.cache.consume_quota(provider, calls):
+            logger.info(f"{label} daily quota exhausted, skipping")
+            raise ProviderUnavailable(provider)
+
+        try:
+            response = requests.request(method, url, timeout=5, **kwargs)
+        except Exception as e:
+            logger.error(f"{label} lookup failed: {e}")
+            raise ProviderUnavailable(provider) from e
+
+        if response.status_code == 429:
+            logger.warning(f"{label} rate limited, skipping it for the rest of the day")
+            self.cache.mark_exhausted(provider)
+            raise ProviderUnavailable(provider)
+        if response.status_code not in (200, 404):
+            logger.warning(f"{label} API error {response.status_code}: {response.text[:200]}")
+            raise ProviderUnavailable(provider)
+        return response
 
     def _try_upcitemdb(self, upc: str) -> Optional[Dict]:
         """
@@ -85,49 +304,73 @@ class UPCLookup:
             logger.debug("UPCitemdb API key not configured")
             return None
 
-        try:
-            url = f"https://api.upcitemdb.com/prod/trial/lookup"
-            params = {'upc': upc}
-            headers = {
-                'Accept': 'application/json',
-                'user_key': self.upcitemdb_key
-            }
-
-            response = requests.get(url, params=params, headers=headers, timeout=5)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                if data.get('items') and len(data['items']) > 0:
-                    item = data['items'][0]
-
-                    result = {
-                        'title': item.get('title', ''),
-                        'brand': item.get('brand', ''),
-                        'model': item.get('model', ''),
-                        'category': item.get('category', ''),
-                        'upc': upc,
-                        'msrp': self._parse_price(item.get('msrp')),
-                        'lowest_price': self._parse_price(item.get('lowest_recorded_price')),
-                        'highest_price': self._parse_price(item.get('highest_recorded_price')),
-                        'description': item.get('description', ''),
-                        'images': item.get('images', []),
-                        'source': 'upcitemdb'
-                    }
-
-                    logger.info(f"UPCitemdb found: {result['title']}")
-                    return result
-
-            elif response.status_code == 404:
-                logger.debug(f"UPC not found in UPCitemdb: {upc}")
-            else:
-                logger.warning(f"UPCitemdb API error {response.status_code}: {response.text}")
+        url = f"https://api.upcitemdb.com/prod/trial/lookup"
+        params = {'upc': upc}
+        headers = {
+            'Accept': 'application/json',
+            'user_key': self.upcitemdb_key
+        }
 
-        except Exception as e:
-            logger.error(f"UPCitemdb lookup failed: {e}")
+        response = self._call('upcitemdb', 'UPCitemdb', 'GET', url, params=params, headers=headers)
 
+        if response.status_code == 200:
+            data = response.json()
+
+            if data.get('items') and len(data['items']) > 0:
+                result = self._upcitemdb_result(data['items'][0], upc)
+                logger.info(f"UPCitemdb found: {result['title']}")
+                return result
+
+        logger.debug(f"UPC not found in UPCitemdb: {upc}")
         return None
 
+    def _try_upcitemdb_many(self, upcs: List[str]) -> Dict[str, Dict]:
+        """
+        Lookup several UPCs with one UPCitemdb POST request.
+
+        Returns:
+            UPC -> product for the UPCs UPCitemdb found (the others are unknown to it)
+        """
+        url = f"https://api.upcitemdb.com/prod/trial/lookup"
+        headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'user_key': self.upcitemdb_key
+        }
+
+        response = self._call('upcitemdb', 'UPCitemdb', 'POST', url, calls=len(upcs),
+                              json={'upc': ','.join(upcs)}, headers=headers)
+
+        found = {}
+        if response.status_code == 200:
+            # Items carry the UPC and/or EAN; EAN-13 is the UPC-A with a leading zero
+            wanted = {upc.lstrip('0'): upc for upc in upcs}
+            for item in response.json().get('items', []):
+                for code in (item.get('upc'), item.get('ean')):
+                    upc = wanted.get(str(code or '').lstrip('0'))
+                    if upc and upc not in found:
+                        found[upc] = self._upcitemdb_result(item, upc)
+                        break
+
+        logger.info(f"UPCitemdb batch found {len(found)}/{len(upcs)} UPCs")
+        return found
+
+    def _upcitemdb_result(self, item: Dict, upc: str) -> Dict:
+        """Product dict from a UPCitemdb item"""
+        return {
+            'title': item.get('title', ''),
+            'brand': item.get('brand', ''),
+            'model': item.get('model', ''),
+            'category': item.get('category', ''),
+            'upc': upc,
+            'msrp': self._parse_price(item.get('msrp')),
+            'lowest_price': self._parse_price(item.get('lowest_recorded_price')),
+            'highest_price': self._parse_price(item.get('highest_recorded_price')),
+            'description': item.get('description', ''),
+            'images': item.get('images', []),
+            'source': 'upcitemdb'
+        }
+
     def _try_barcodelookup(self, upc: str) -> Optional[Dict]:
         """
         Try Barcode Lookup API
@@ -138,38 +381,34 @@ class UPCLookup:
             logger.debug("Barcode Lookup API key not configured")
             return None
 
-        try:
-            url = f"https://api.barcodelookup.com/v3/products"
-            params = {
-                'barcode': upc,
-                'key': self.barcodelookup_key
-            }
-
-            response = requests.get(url, params=params, timeout=5)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                if data.get('products') and len(data['products']) > 0:
-                    product = data['products'][0]
-
-                    result = {
-                        'title': product.get('title', ''),
-                        'brand': product.get('brand', ''),
-                        'model': product.get('model', ''),
-                        'category': product.get('category', ''),
-                        'upc': upc,
-                        'msrp': self._parse_price(product.get('msrp')),
-                        'description': product.get('description', ''),
-                        'images': product.get('images', []),
-                        'source': 'barcodelookup'
-                    }
-
-                    logger.info(f"Barcode Lookup found: {result['title']}")
-                    return result
+        url = f"https://api.barcodelookup.com/v3/products"
+        params = {
+            'barcode': upc,
+            'key': self.barcodelookup_key
+        }
 
-        except Exception as e:
-            logger.error(f"Barcode Lookup failed: {e}")
+        response = self._call('barcodelookup', 'Barcode Lookup', 'GET', url, params=params)
+
+        if response.status_code == 200:
+            data = response.json()
+
+            if data.get('products') and len(data['products']) > 0:
+                product = data['products'][0]
+
+                result = {
+                    'title': product.get('title', ''),
+                    'brand': product.get('brand', ''),
+                    'model': product.get('model', ''),
+                    'category': product.get('category', ''),
+                    'upc': upc,
+                    'msrp': self._parse_price(product.get('msrp')),
+                    'description': product.get('description', ''),
+                    'images': product.get('images', []),
+                    'source': 'barcodelookup'
+                }
+
+                logger.info(f"Barcode Lookup found: {result['title']}")
+                return result
 
         return None
 
@@ -179,34 +418,30 @@ class UPCLookup:
         Free, but mainly for food/consumer goods
         https://world.openfoodfacts.org/api/v0/product/{barcode}.json
         """
-        try:
-            url = f"https://world.openfoodfacts.org/api/v0/product/{upc}.json"
-
-            response = requests.get(url, timeout=5)
+        url = f"https://world.openfoodfacts.org/api/v0/product/{upc}.json"
 
-            if response.status_code == 200:
-                data = response.json()
+        response = self._call('openfoodfacts', 'OpenFoodFacts', 'GET', url)
 
-                if data.get('status') == 1 and data.get('product'):
-                    product = data['product']
+        if response.status_code == 200:
+            data = response.json()
 
-                    result = {
-                        'title': product.get('product_name', ''),
-                        'brand': product.get('brands', ''),
-                        'model': '',
-                        'category': product.get('categories', ''),
-                        'upc': upc,
-                        'msrp': None,  # OpenFoodFacts doesn't have prices
-                        'description': product.get('generic_name', ''),
-                        'images': [product.get('image_url', '')] if product.get('image_url') else [],
-                        'source': 'openfoodfacts'
-                    }
+            if data.get('status') == 1 and data.get('product'):
+                product = data['product']
 
-                    logger.info(f"OpenFoodFacts found: {result['title']}")
-                    return result
+                result = {
+                    'title': product.get('product_name', ''),
+                    'brand': product.get('brands', ''),
+                    'model': '',
+                    'category': product.get('categories', ''),
+                    'upc': upc,
+                    'msrp': None,  # OpenFoodFacts doesn't have prices
+                    'description': product.get('generic_name', ''),
+                    'images': [product.get('image_url', '')] if product.get('image_url') else [],
+                    'source': 'openfoodfacts'
+                }
 
-        except Exception as e:
-            logger.error(f"OpenFoodFacts lookup failed: {e}")
+                logger.info(f"OpenFoodFacts found: {result['title']}")
+                return result
 
         return None
 
@@ -223,15 +458,34 @@ class UPCLookup:
             return None
 
 
+# Shared pool for hedged provider calls and lookup_many fallbacks
+_lookup_executor = None
+_lookup_executor_lock = threading.Lock()
+
+
+def _get_lookup_executor() -> ThreadPoolExecutor:
+    global _lookup_executor
+    with _lookup_executor_lock:
+        if _lookup_executor is None:
+            _lookup_executor = ThreadPoolExecutor(
+                max_workers=UPC_CONFIG.get('lookup_workers', 8),
+                thread_name_prefix='upc-lookup'
+            )
+    return _lookup_executor
+
+
 # Global instance
 _upc_lookup = None
+_upc_lookup_lock = threading.Lock()
 
 
 def get_upc_lookup() -> UPCLookup:
     """Get or create global UPC lookup instance"""
     global _upc_lookup
     if _upc_lookup is None:
-        _upc_lookup = UPCLookup()
+        with _upc_lookup_lock:
+            if _upc_lookup is None:
+                _upc_lookup = UPCLookup()
     return _upc_lookup
 
 
@@ -252,3 +506,8 @@ def lookup_product(upc: str) -> Optional[Dict]:
     """
     lookup_service = get_upc_lookup()
     return lookup_service.lookup(upc)
+
+
+def lookup_products(upcs: Iterable[str]) -> Dict[str, Optional[Dict]]:
+    """Convenience function to lookup many UPCs (keyed by cleaned UPC)"""
+    return get_upc_lookup().lookup_many(upcs)
@@ -4,33 +4,34 @@ eBay Trading API Uploader - XML-based listing creation
 Uses the Trading API which is more stable than the Inventory API
 """
 
-import requests
 import logging
-import time
 import pandas as pd
 from typing import Dict, List
 from xml.etree import ElementTree as ET
 import os
 from dotenv import load_dotenv
+from http_session import HTTPTransport, get_transport
+from rate_limiter import get_rate_limiter
 
 load_dotenv()
 
 class EbayTradingAPI:
     """eBay Trading API client using XML requests"""
 
-    def __init__(self, dev_id: str, app_id: str, cert_id: str, auth_token: str, sandbox: bool = False):
+    def __init__(self, dev_id: str, app_id: str, cert_id: str, auth_token: str, sandbox: bool = False,
+                 transport: HTTPTransport = None):
         self.dev_id = dev_id
         self.app_id = app_id
         self.cert_id = cert_id
         self.auth_token = auth_token
         self.sandbox = sandbox
+        self.transport = transport or get_transport()
 
         # API endpoint
         self.api_url = "https://api.sandbox.ebay.com/ws/api.dll" if sandbox else "https://api.ebay.com/ws/api.dll"
 
-        # Rate limiting
-        self.last_request = 0
-        self.min_interval = 0.5  # 500ms between requests for Trading API
+        # Rate limiting (shared Trading API token bucket)
+        self.rate_limiter = get_rate_limiter('trading')
 
         # Setup logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,10 +39,7 @@ class EbayTradingAPI:
 
     def _rate_limit(self):
         """Enforce rate limiting between API calls"""
-        elapsed = time.time() - self.last_request
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self.last_request = time.time()
+        self.rate_limiter.acquire()
 
     def _make_xml_request(self, call_name: str, xml_body: str) -> Dict:
         """Make Trading API XML request"""
@@ -58,7 +56,7 @@ class EbayTradingAPI:
         }
 
         try:
-            response = requests.post(self.api_url, headers=headers, data=xml_body)
+            response = self.transport.post(self.api_url, headers=headers, data=xml_body)
             response.raise_for_status()
             return self._parse_xml_response(response.text)
         except Exception as e:
@@ -7,7 +7,6 @@ Adds title, retail/used prices, source URL, confidence, and downloads a stock im
 import json
 import logging
 import os
-import time
 from typing import Any, Dict, Optional, Union
 
 import pandas as pd
@@ -15,8 +14,9 @@ import requests
 from openai import OpenAI
 from urllib.parse import urlparse
 
+from rate_limiter import get_rate_limiter
+
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1")
-RATE_LIMIT_SECONDS = float(os.getenv("OPENAI_RATE_LIMIT_SECONDS", "1.2"))
 
 
 class EnrichmentError(Exception):
@@ -96,6 +96,7 @@ Return ONLY valid JSON with fields:
 If you cannot find data, leave fields blank.
 """
 
+    get_rate_limiter("openai").acquire()
     try:
         completion = client.responses.create(
             model=DEFAULT_MODEL,
@@ -120,14 +121,37 @@ def enrich_csv(
     id_col: Union[int, str],
     brand_col: Union[int, str],
     model_col: Union[int, str],
+    chunksize: Optional[int] = None,
 ) -> None:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise EnrichmentError("OPENAI_API_KEY is not set")
 
     client = OpenAI(api_key=api_key)
-    df = pd.read_csv(input_csv, dtype=str, keep_default_na=False)
 
+    # Stream the file when chunksize is set; each chunk is written before the next is read
+    if chunksize:
+        chunks = pd.read_csv(input_csv, dtype=str, keep_default_na=False, chunksize=chunksize)
+    else:
+        chunks = [pd.read_csv(input_csv, dtype=str, keep_default_na=False)]
+
+    for chunk_num, df in enumerate(chunks):
+        _enrich_frame(client, df, images_dir, id_col, brand_col, model_col)
+        df.to_csv(output_csv, mode="w" if chunk_num == 0 else "a", header=chunk_num == 0, index=False)
+
+    logging.info("Saved enriched CSV → %s", output_csv)
+    logging.info("Images directory → %s", images_dir)
+
+
+def _enrich_frame(
+    client: OpenAI,
+    df: pd.DataFrame,
+    images_dir: str,
+    id_col: Union[int, str],
+    brand_col: Union[int, str],
+    model_col: Union[int, str],
+) -> None:
+    """Enrich the rows of one DataFrame (whole file or a chunk) in place."""
     # Ensure columns exist
     for col in [
         "title",
@@ -173,12 +197,6 @@ def enrich_csv(
         if filename:
             df.at[idx, "image_filename"] = filename
 
-        time.sleep(RATE_LIMIT_SECONDS)
-
-    df.to_csv(output_csv, index=False)
-    logging.info("Saved enriched CSV → %s", output_csv)
-    logging.info("Images directory → %s", images_dir)
-
 
 if __name__ == "__main__":
     enrich_csv(
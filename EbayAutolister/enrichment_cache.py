@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Enrichment Result Cache
+
+Keeps the product-level part of each AI agent enrichment (title, category,
+identifiers, item specifics, shipping dimensions) in SQLite, keyed by
+normalized UPC and brand+model. The same model shows up across many pallets,
+so repeats skip the coordinator agent run and only re-describe and re-price
+for their condition.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import ENRICHMENT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text) -> str:
+    """Lowercase words of a brand/model, punctuation removed"""
+    if text is None or (isinstance(text, float) and text != text):
+        return ''
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', str(text).lower()).split())
+
+
+def product_keys(brand: str = None, model: str = None, upc: str = None) -> List[str]:
+    """
+    Cache keys for a product, most specific first.
+
+    Returns:
+        'upc:<digits without leading zeros>' when a UPC is given, then
+        'bm:<brand>|<model>' when a model is given
+    """
+    keys = []
+    upc_digits = ''.join(filter(str.isdigit, str(upc or ''))).lstrip('0')
+    if upc_digits:
+        keys.append(f"upc:{upc_digits}")
+    if _normalize(model):
+        keys.append(f"bm:{_normalize(brand)}|{_normalize(model)}")
+    return keys
+
+
+class EnrichmentCache:
+    """SQLite cache of product-level enrichment results"""
+
+    def __init__(self, db_path: str = None):
+        """
+        Args:
+            db_path: SQLite file (defaults to enrichment_cache.db next to this module)
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent / "enrichment_cache.db"
+
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_database()
+
+    def _init_database(self):
+        """Create cache table if it doesn't exist"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS enrichments (
+                    product_key TEXT PRIMARY KEY,
+                    data_json TEXT NOT NULL,
+                    enriched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def close(self):
+        self._conn.close()
+
+    def get(self, brand: str = None, model: str = None, upc: str = None) -> Optional[Dict[str, Any]]:
+        """Cached product fields for the first matching key, or None"""
+        now = time.time()
+        with self._lock, self._conn:
+            for key in product_keys(brand, model, upc):
+                row = self._conn.execute(
+                    "SELECT data_json FROM enrichments WHERE product_key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE enrichments SET hit_count = hit_count + 1 WHERE product_key = ?", (key,)
+                    )
+                    return json.loads(row[0])
+        return None
+
+    def put(self, fields: Dict[str, Any], brand: str = None, model: str = None, upc: str = None):
+        """Store product fields under every key the product has"""
+        keys = product_keys(brand, model, upc)
+        if not keys:
+            return
+
+        now = time.time()
+        expires_at = now + ENRICHMENT_CONFIG['cache_days'] * 86400
+        data_json = json.dumps(fields)
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO enrichments (product_key, data_json, enriched_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(product_key) DO UPDATE SET
+                    data_json = excluded.data_json, enriched_at = excluded.enriched_at,
+                    expires_at = excluded.expires_at
+            """, [(key, data_json, now, expires_at) for key in keys])
+
+    def clear_expired(self) -> int:
+        """Delete expired entries; returns the number removed"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM enrichments WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def get_stats(self) -> Dict:
+        """Counts of cached products and hits served"""
+        with self._lock:
+            entries, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM enrichments WHERE expires_at > ?",
+                (time.time(),)
+            ).fetchone()
+        return {'entries': entries, 'hits': hits}
+
+
+# Global cache instance
+_enrichment_cache = None
+_enrichment_cache_lock = threading.Lock()
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """Get or create global enrichment cache instance"""
+    global _enrichment_cache
+    if _enrichment_cache is None:
+        with _enrichment_cache_lock:
+            if _enrichment_cache is None:
+                _enrichment_cache = EnrichmentCache()
+    return _enrichment_cache
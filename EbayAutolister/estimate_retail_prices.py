@@ -10,7 +10,7 @@ import pandas as pd
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ebay_pricing.pricing_engine import get_pricing_recommendation
+from ebay_pricing.pricing_engine import price_batch
 from config import CONDITION_MAPPINGS
 
 def normalize_condition(grade):
@@ -164,18 +164,20 @@ print("="*100 + "\n")
 
 results = []
 
+# Estimate retail prices, then price the whole batch at once
 for item in b2_items:
+    item['condition'] = normalize_condition(item['grade'])
+    item['retail_price'] = estimate_retail_price(item['brand'], item['model'])
+
+pricings = price_batch(b2_items)
+
+for item, pricing in zip(b2_items, pricings):
     sku = item['sku']
     brand = item['brand']
     model = item['model']
     grade = item['grade']
-    condition = normalize_condition(grade)
-
-    # Estimate retail price
-    retail_price = estimate_retail_price(brand, model)
-
-    # Get automated pricing
-    pricing = get_pricing_recommendation(brand, model, condition, retail_price)
+    condition = item['condition']
+    retail_price = item['retail_price']
 
     print(f"{sku:<30} {brand:<20} {model:<30} {grade:>2} → ${pricing.buy_it_now_price:>7.2f} BIN  (retail: ${retail_price:>7.2f}, conf: {pricing.confidence:.0%})")
 
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for eBay API clients
+
+Provides a pooled keep-alive requests.Session with timeouts and retry on
+429/5xx using jittered exponential backoff that honors Retry-After.
+Non-idempotent requests (POST unless the caller says otherwise) are only
+retried when the server cannot have acted on them: 429 responses and
+connection failures before the request was sent.
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Status codes that are safe to retry after a delay
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that can be replayed without side effects
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class HTTPTransport:
+    """Pooled HTTP session with timeouts and retry/backoff"""
+
+    def __init__(self, pool_size: int = 10, timeout: float = 30.0, max_retries: int = 3,
+                 backoff_factor: float = 0.5, max_backoff: float = 30.0):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size: Keep-alive connections kept per host
+            timeout: Default request timeout in seconds
+            max_retries: Retries after the first attempt on 429/5xx and connection errors
+            backoff_factor: Base delay in seconds, doubled on every attempt
+            max_backoff: Upper bound for a single delay in seconds
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        # urllib3 keeps one connection pool per host; pool_maxsize bounds each of them
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, idempotent: bool = None, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying transient failures.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            idempotent: Whether replaying the request is harmless (defaults to
+                True for every method except POST). Non-idempotent requests are
+                only retried on 429 and on connection failures before sending.
+
+        Returns the final response; callers still decide how to treat non-2xx codes.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries or not (idempotent or failed_before_send(e)):
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"{method} {url} failed ({e}), retrying in {delay:.2f}s "
+                               f"({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                continue
+
+            if not should_retry_status(response.status_code, idempotent) or attempt >= self.max_retries:
+                return response
+
+            delay = self._retry_after_delay(response)
+            if delay is None:
+                delay = self._backoff_delay(attempt)
+            logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s "
+                           f"({attempt + 1}/{self.max_retries})")
+            response.close()
+            time.sleep(delay)
+
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+
+    def _retry_after_delay(self, response: requests.Response) -> Optional[float]:
+        return retry_after_delay(response.headers.get('Retry-After'), self.max_backoff)
+
+
+def should_retry_status(status_code: int, idempotent: bool) -> bool:
+    """True if a response status is worth retrying; non-idempotent requests only retry 429"""
+    if idempotent:
+        return status_code in RETRY_STATUS_CODES
+    return status_code == 429
+
+
+def failed_before_send(error: requests.exceptions.RequestException) -> bool:
+    """True if a connection error happened before the request reached the server"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    # NewConnectionError (refused, DNS failure) subclasses ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def backoff_delay(attempt: int, backoff_factor: float, max_backoff: float) -> float:
+    """Full-jitter exponential backoff"""
+    ceiling = min(max_backoff, backoff_factor * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def retry_after_delay(retry_after: Optional[str], max_backoff: float) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into a delay"""
+    if not retry_after:
+        return None
+
+    try:
+        delay = float(retry_after)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    return min(max(delay, 0.0), max_backoff)
+
+
+# Global transport instance
+_transport_instance = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """Get or create the process-wide transport configured from .env"""
+    global _transport_instance
+    if _transport_instance is None:
+        with _transport_lock:
+            if _transport_instance is None:
+                config = Config()
+                _transport_instance = HTTPTransport(
+                    pool_size=config.http_pool_size,
+                    timeout=config.http_timeout,
+                    max_retries=config.max_retries,
+                    backoff_factor=config.retry_backoff_factor
+                )
+    return _transport_instance
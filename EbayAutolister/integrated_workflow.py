@@ -18,7 +18,7 @@ from datetime import datetime
 import pandas as pd
 from pathlib import Path
 
-from agent_enricher import AgentBasedEnricher, EnrichedProduct
+from agent_enricher import AgentBasedEnricher, EnrichedProduct, OrderedCsvWriter
 from ebay_autolister import (
     EbayAutolister,
     InventoryItem,
@@ -80,7 +80,11 @@ class IntegratedEbayWorkflow:
         input_csv: str,
         enriched_csv: Optional[str] = None,
         create_listings: bool = False,
-        batch_size: int = 25
+        batch_size: int = 25,
+        chunksize: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        refresh: bool = False
     ) -> Dict:
         """
         Complete workflow: enrich products and create eBay listings.
@@ -90,6 +94,12 @@ class IntegratedEbayWorkflow:
             enriched_csv: Path to save enriched data (optional)
             create_listings: Whether to publish listings (vs inventory only)
             batch_size: Number of items to process in each batch
+            chunksize: Stream the input in chunks of this many rows; each chunk is
+                enriched, appended to the enriched CSV and uploaded before the next
+                one is read
+            concurrency: Products enriched at once (default ENRICHMENT_CONFIG['concurrency'])
+            item_timeout: Seconds per product before falling back to minimal data
+            refresh: Re-run the agents for models already in the enrichment cache
 
         Returns:
             Dictionary with results summary
@@ -101,26 +111,88 @@ class IntegratedEbayWorkflow:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             enriched_csv = f"enriched_{timestamp}.csv"
 
-        # Step 1: Load input CSV
+        # Step 1: Load input CSV (whole file, or a chunk at a time when streaming)
         logger.info("Step 1: Loading input CSV")
-        df = pd.read_csv(input_csv)
-        logger.info(f"Loaded {len(df)} rows from {input_csv}")
+        # UPCs stay text so leading zeros survive
+        if chunksize:
+            chunks = pd.read_csv(input_csv, dtype={'upc': str}, chunksize=chunksize)
+        else:
+            df = pd.read_csv(input_csv, dtype={'upc': str})
+            logger.info(f"Loaded {len(df)} rows from {input_csv}")
+            chunks = [df]
 
-        # Step 2: Enrich products using AI agents
-        logger.info("Step 2: Enriching products with AI agents")
-        enriched_products = self._enrich_products(df)
+        results = {
+            "success": True,
+            "products_enriched": 0,
+            "enriched_csv": enriched_csv,
+            "inventory_created": 0,
+            "inventory_failed": 0,
+            "failed_items": []
+        }
+        if create_listings:
+            results.update({
+                "listings_created": 0,
+                "listings_failed": 0,
+                "successful_listings": [],
+                "failed_listings": []
+            })
 
-        if not enriched_products:
+        writer = OrderedCsvWriter(enriched_csv)
+        for chunk_num, chunk in enumerate(chunks, 1):
+            if chunksize:
+                logger.info(f"Processing chunk {chunk_num} ({len(chunk)} rows)")
+
+            chunk_results = self._process_chunk(
+                chunk, writer, create_listings, batch_size, concurrency, item_timeout, refresh
+            )
+
+            for key, value in chunk_results.items():
+                if isinstance(value, list):
+                    results[key].extend(value)
+                else:
+                    results[key] += value
+
+        if not results["products_enriched"]:
             logger.error("No products were successfully enriched")
             return {
                 "success": False,
                 "message": "Enrichment failed for all products"
             }
 
-        # Save enriched data
-        enriched_df = pd.DataFrame([vars(p) for p in enriched_products])
-        enriched_df.to_csv(enriched_csv, index=False)
-        logger.info(f"Enriched data saved to {enriched_csv}")
+        logger.info("Integrated workflow completed")
+        return results
+
+    def _process_chunk(
+        self,
+        df: pd.DataFrame,
+        writer: OrderedCsvWriter,
+        create_listings: bool,
+        batch_size: int,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        refresh: bool = False
+    ) -> Dict:
+        """
+        Enrich, save and upload one chunk of input rows.
+
+        Returns:
+            Per-chunk counts and failure lists, merged by enrich_and_list()
+        """
+        # Step 2: Enrich products using AI agents
+        logger.info("Step 2: Enriching products with AI agents")
+        enriched_products = self._enrich_products(df, writer, concurrency, item_timeout, refresh)
+
+        results = {
+            "products_enriched": len(enriched_products),
+            "inventory_created": 0,
+            "inventory_failed": 0,
+            "failed_items": []
+        }
+
+        if not enriched_products:
+            return results
+
+        logger.info(f"Enriched data saved to {writer.path}")
 
         # Step 3: Convert to eBay inventory items
         logger.info("Step 3: Converting to eBay inventory items")
@@ -133,14 +205,11 @@ class IntegratedEbayWorkflow:
             batch_size=batch_size
         )
 
-        results = {
-            "success": True,
-            "products_enriched": len(enriched_products),
-            "enriched_csv": enriched_csv,
+        results.update({
             "inventory_created": len(inventory_results["successful"]),
             "inventory_failed": len(inventory_results["failed"]),
             "failed_items": inventory_results["failed"]
-        }
+        })
 
         # Step 5: Create and publish listings (if requested)
         if create_listings:
@@ -157,47 +226,63 @@ class IntegratedEbayWorkflow:
                 "failed_listings": listing_results.get("failed_listings", [])
             })
 
-        logger.info("Integrated workflow completed")
         return results
 
-    def _enrich_products(self, df: pd.DataFrame) -> List[EnrichedProduct]:
+    def _enrich_products(
+        self,
+        df: pd.DataFrame,
+        writer: Optional[OrderedCsvWriter] = None,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        refresh: bool = False
+    ) -> List[EnrichedProduct]:
         """
-        Enrich all products in the DataFrame using AI agents.
+        Enrich all products in the DataFrame using AI agents, several at a time.
 
         Args:
             df: DataFrame with product data
+            writer: Appends each product to the enriched CSV, in input order,
+                as soon as it is done
+            concurrency: Products enriched at once
+            item_timeout: Seconds per product before falling back to minimal data
+            refresh: Re-run the agents for models already in the enrichment cache
 
         Returns:
             List of EnrichedProduct objects
         """
-        enriched_products = []
+        rows = []
 
         for idx, row in df.iterrows():
-            try:
-                # Extract required fields
-                sku = str(row.get('sku', f'ROW_{idx}'))
-                brand = str(row.get('brand', ''))
-                model = str(row.get('model', ''))
-                condition = str(row.get('condition', 'good'))
-
-                if not brand and not model:
-                    logger.warning(f"Row {idx}: Missing brand and model, skipping")
-                    continue
-
-                # Enrich using AI agents
-                logger.info(f"Enriching {idx + 1}/{len(df)}: {brand} {model}")
-                enriched = self.enricher.enrich_product(
-                    sku=sku,
-                    brand=brand,
-                    model=model,
-                    condition=condition
-                )
+            # Extract required fields
+            sku = str(row.get('sku', f'ROW_{idx}'))
+            brand = str(row.get('brand', ''))
+            model = str(row.get('model', ''))
+            condition = str(row.get('condition', 'good'))
+
+            if not brand and not model:
+                logger.warning(f"Row {idx}: Missing brand and model, skipping")
+                continue
 
-                enriched_products.append(enriched)
+            upc = row.get('upc')
+            upc = None if pd.isna(upc) else str(upc).strip() or None
 
-            except Exception as e:
-                logger.error(f"Failed to enrich row {idx}: {e}")
-                continue
+            rows.append({'sku': sku, 'brand': brand, 'model': model, 'condition': condition, 'upc': upc})
+
+        # Enrich using AI agents
+        logger.info(f"Enriching {len(rows)} products")
+        offset = writer.next_position if writer else 0
+
+        def save(position: int, product: EnrichedProduct):
+            if writer:
+                writer.add(offset + position, vars(product))
+
+        try:
+            enriched_products = self.enricher.enrich_many(
+                rows, concurrency, item_timeout, on_result=save, refresh=refresh
+            )
+        except Exception as e:
+            logger.error(f"Failed to enrich products: {e}")
+            return []
 
         logger.info(f"Successfully enriched {len(enriched_products)}/{len(df)} products")
         return enriched_products
@@ -261,60 +346,55 @@ class IntegratedEbayWorkflow:
         Returns:
             Dictionary with detailed results including successful and failed SKUs
         """
-        created = 0
-        failed = 0
         successful_listings = []
         failed_listings = []
 
         logger.info(f"Creating listings for {len(successful_skus)} inventory items...")
 
-        for product in enriched_products:
-            if product.sku not in successful_skus:
-                continue
+        successful_set = set(successful_skus)
+        products = {p.sku: p for p in enriched_products if p.sku in successful_set}
 
-            try:
-                # Create offer
-                logger.info(f"Creating offer for {product.sku} - {product.title[:50]}...")
-                offer_id = self.autolister.listings.create_offer(
-                    sku=product.sku,
-                    category_id=product.category_id or "58058",
-                    price=product.suggested_price or product.market_price or 0.0
-                )
+        # Create offers in bulk (25 per call)
+        offer_results = self.autolister.listings.bulk_create_offers([
+            {
+                "sku": product.sku,
+                "category_id": product.category_id or "58058",
+                "price": product.suggested_price or product.market_price or 0.0
+            }
+            for product in products.values()
+        ])
 
-                if offer_id:
-                    # Publish offer
-                    logger.info(f"Publishing offer {offer_id} for {product.sku}...")
-                    if self.autolister.listings.publish_offer(offer_id):
-                        created += 1
-                        successful_listings.append({
-                            "sku": product.sku,
-                            "title": product.title,
-                            "price": product.suggested_price,
-                            "offer_id": offer_id
-                        })
-                        logger.info(f"✓ Successfully published {product.sku} at ${product.suggested_price:.2f}")
-                    else:
-                        failed += 1
-                        failed_listings.append({
-                            "sku": product.sku,
-                            "error": "Failed to publish offer"
-                        })
-                        logger.error(f"✗ Failed to publish listing for {product.sku}")
-                else:
-                    failed += 1
-                    failed_listings.append({
-                        "sku": product.sku,
-                        "error": "Failed to create offer"
-                    })
-                    logger.error(f"✗ Failed to create offer for {product.sku}")
+        for failure in offer_results["failed"]:
+            failed_listings.append({
+                "sku": failure["sku"],
+                "error": f"Failed to create offer: {failure['error']}"
+            })
+            logger.error(f"✗ Failed to create offer for {failure['sku']}")
+
+        # Publish created offers in bulk
+        sku_by_offer = {offer_id: sku for sku, offer_id in offer_results["successful"].items()}
+        publish_results = self.autolister.listings.bulk_publish_offers(list(sku_by_offer))
+
+        for offer_id in publish_results["successful"]:
+            product = products[sku_by_offer[offer_id]]
+            successful_listings.append({
+                "sku": product.sku,
+                "title": product.title,
+                "price": product.suggested_price,
+                "offer_id": offer_id
+            })
+            logger.info(f"✓ Successfully published {product.sku} at ${product.suggested_price:.2f}")
 
-            except Exception as e:
-                failed += 1
-                failed_listings.append({
-                    "sku": product.sku,
-                    "error": str(e)
-                })
-                logger.error(f"✗ Listing creation failed for {product.sku}: {e}")
+        for failure in publish_results["failed"]:
+            sku = sku_by_offer[failure["offer_id"]]
+            failed_listings.append({
+                "sku": sku,
+                "error": f"Failed to publish offer: {failure['error']}"
+            })
+            logger.error(f"✗ Failed to publish listing for {sku}")
+
+        created = len(successful_listings)
+        failed = len(failed_listings)
 
         return {
             "created": created,
@@ -407,15 +487,17 @@ def main():
         print("\n" + "=" * 80 + "\n")
         sys.exit(1)
 
-    # Get input file
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    # Get input file (--refresh re-runs the agents for models already in the enrichment cache)
+    args = [arg for arg in sys.argv[1:] if arg != '--refresh']
+    refresh = '--refresh' in sys.argv[1:]
+    if args:
+        input_file = args[0]
     else:
         input_file = "B1.csv"  # Default file
 
     if not os.path.exists(input_file):
         print(f"\n✗ Error: Input file '{input_file}' not found")
-        print(f"Usage: python integrated_workflow.py [input_file.csv]\n")
+        print(f"Usage: python integrated_workflow.py [input_file.csv] [--refresh]\n")
         sys.exit(1)
 
     # Initialize workflow
@@ -474,7 +556,8 @@ def main():
     results = workflow.enrich_and_list(
         input_csv=input_file,
         create_listings=create_listings,
-        batch_size=25
+        batch_size=25,
+        refresh=refresh
     )
 
     # Display detailed summary report
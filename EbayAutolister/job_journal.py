@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Job Journal for bulk listing runs
+
+Records per-SKU progress of a process_csv_file run in SQLite (payload hash,
+inventory created, offer id, listing id) so an interrupted run can be resumed
+without repeating calls that already succeeded.
+"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters per statement is 999
+_IN_CHUNK = 500
+
+
+@dataclass
+class SkuState:
+    """Journaled progress of one SKU"""
+    sku: str
+    payload_hash: str = ""
+    inventory_created: bool = False
+    offer_id: Optional[str] = None
+    listing_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ResumePlan:
+    """What is left to do for one batch of SKUs"""
+    pending: Set[str]               # inventory still to create (new, failed or payload changed)
+    created: Set[str]               # inventory already created with the same payload
+    open_offers: Dict[str, str]     # SKU -> offer id created but not yet published
+    published: Set[str]             # SKUs that already have a live listing
+
+
+class JobJournal:
+    """SQLite-backed per-SKU journal for one processing run"""
+
+    def __init__(self, run_id: str, db_path: str = None):
+        """
+        Args:
+            run_id: Identifier of the run; reuse it to resume
+            db_path: SQLite file (defaults to job_journal.db next to this module)
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent / "job_journal.db"
+
+        self.run_id = run_id
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._init_database()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """Timestamped run id"""
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    @staticmethod
+    def latest_run(csv_path: str, db_path: str = None) -> Optional[str]:
+        """Most recent run id recorded for a CSV file, if any"""
+        journal = JobJournal("", db_path)
+        try:
+            row = journal._conn.execute(
+                "SELECT run_id FROM job_runs WHERE csv_path = ? ORDER BY started_at DESC LIMIT 1",
+                (str(Path(csv_path).resolve()),)
+            ).fetchone()
+        finally:
+            journal.close()
+        return row[0] if row else None
+
+    def _init_database(self):
+        """Create journal tables if they don't exist"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_runs (
+                    run_id TEXT PRIMARY KEY,
+                    csv_path TEXT,
+                    create_listings INTEGER NOT NULL DEFAULT 0,
+                    started_at TIMESTAMP NOT NULL,
+                    updated_at TIMESTAMP NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_items (
+                    run_id TEXT NOT NULL,
+                    sku TEXT NOT NULL,
+                    payload_hash TEXT NOT NULL DEFAULT '',
+                    inventory_created INTEGER NOT NULL DEFAULT 0,
+                    offer_id TEXT,
+                    listing_id TEXT,
+                    error TEXT,
+                    updated_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (run_id, sku)
+                )
+            """)
+
+    def close(self):
+        self._conn.close()
+
+    def start(self, csv_path: str, create_listings: bool = False):
+        """Register the run (kept as-is when resuming)"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO job_runs (run_id, csv_path, create_listings, started_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(run_id) DO UPDATE SET updated_at = excluded.updated_at
+            """, (self.run_id, str(Path(csv_path).resolve()), int(create_listings), now, now))
+
+    def states(self, skus: Iterable[str]) -> Dict[str, SkuState]:
+        """Journaled state for the given SKUs (unknown SKUs are omitted)"""
+        skus = list(skus)
+        states = {}
+        with self._lock:
+            for i in range(0, len(skus), _IN_CHUNK):
+                chunk = skus[i:i + _IN_CHUNK]
+                rows = self._conn.execute(f"""
+                    SELECT sku, payload_hash, inventory_created, offer_id, listing_id, error
+                    FROM job_items
+                    WHERE run_id = ? AND sku IN ({','.join('?' * len(chunk))})
+                """, [self.run_id, *chunk])
+                for sku, payload_hash, created, offer_id, listing_id, error in rows:
+                    states[sku] = SkuState(sku, payload_hash, bool(created), offer_id, listing_id, error)
+        return states
+
+    def plan(self, hashes: Dict[str, str]) -> ResumePlan:
+        """
+        Work out what still has to happen for a batch
+
+        Args:
+            hashes: SKU -> payload hash of the rows about to be processed
+        """
+        states = self.states(hashes)
+        plan = ResumePlan(pending=set(), created=set(), open_offers={}, published=set())
+
+        for sku, payload_hash in hashes.items():
+            state = states.get(sku)
+            if state is None or not state.inventory_created or state.payload_hash != payload_hash:
+                plan.pending.add(sku)
+            else:
+                plan.created.add(sku)
+
+            # An offer survives a payload change; the inventory update flows into it
+            if state is not None and state.listing_id:
+                plan.published.add(sku)
+            elif state is not None and state.offer_id:
+                plan.open_offers[sku] = state.offer_id
+
+        return plan
+
+    def record_inventory(self, successful: Iterable[str], failed: List[Dict], hashes: Dict[str, str]):
+        """Record bulk inventory results ({"sku", "error"} dicts for failures)"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO job_items (run_id, sku, payload_hash, inventory_created, error, updated_at)
+                VALUES (?, ?, ?, 1, NULL, ?)
+                ON CONFLICT(run_id, sku) DO UPDATE SET
+                    payload_hash = excluded.payload_hash, inventory_created = 1,
+                    error = NULL, updated_at = excluded.updated_at
+            """, [(self.run_id, sku, hashes.get(sku, ''), now) for sku in successful])
+            self._conn.executemany("""
+                INSERT INTO job_items (run_id, sku, payload_hash, inventory_created, error, updated_at)
+                VALUES (?, ?, ?, 0, ?, ?)
+                ON CONFLICT(run_id, sku) DO UPDATE SET
+                    inventory_created = 0, error = excluded.error, updated_at = excluded.updated_at
+            """, [(self.run_id, f["sku"], hashes.get(f["sku"], ''), str(f["error"]), now) for f in failed])
+            self._touch(now)
+
+    def record_offers(self, successful: Dict[str, str], failed: List[Dict]):
+        """Record created offers (SKU -> offer id) and offer failures"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE job_items SET offer_id = ?, error = NULL, updated_at = ? WHERE run_id = ? AND sku = ?",
+                [(offer_id, now, self.run_id, sku) for sku, offer_id in successful.items()]
+            )
+            self._record_errors(failed, now)
+            self._touch(now)
+
+    def record_listings(self, successful: Dict[str, str], failed: List[Dict]):
+        """Record published listings (SKU -> listing id) and publish failures"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE job_items SET listing_id = ?, error = NULL, updated_at = ? WHERE run_id = ? AND sku = ?",
+                [(listing_id or '', now, self.run_id, sku) for sku, listing_id in successful.items()]
+            )
+            self._record_errors(failed, now)
+            self._touch(now)
+
+    def summary(self) -> Dict[str, int]:
+        """Counts of SKUs per stage for this run"""
+        with self._lock:
+            total, created, offers, listed, errors = self._conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(inventory_created), 0), COUNT(offer_id),
+                       COUNT(listing_id), COUNT(error)
+                FROM job_items WHERE run_id = ?
+            """, (self.run_id,)).fetchone()
+        return {"skus": total, "inventory_created": created, "offers_created": offers,
+                "listings_published": listed, "errors": errors}
+
+    def _record_errors(self, failed: List[Dict], now: str):
+        self._conn.executemany(
+            "UPDATE job_items SET error = ?, updated_at = ? WHERE run_id = ? AND sku = ?",
+            [(str(f["error"]), now, self.run_id, f["sku"]) for f in failed]
+        )
+
+    def _touch(self, now: str):
+        self._conn.execute("UPDATE job_runs SET updated_at = ? WHERE run_id = ?", (now, self.run_id))
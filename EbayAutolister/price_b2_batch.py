@@ -10,7 +10,7 @@ import logging
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ebay_pricing.pricing_engine import get_pricing_recommendation
+from ebay_pricing.pricing_engine import price_batch
 from config import CONDITION_MAPPINGS
 
 # Set up detailed logging
@@ -48,12 +48,18 @@ print("="*100 + "\n")
 
 results = []
 
+# Price the whole batch up front; duplicate models share one market data fetch
 for item in b2_items:
+    item['condition'] = normalize_condition(item['grade'])
+
+pricings = price_batch(b2_items)
+
+for item, pricing in zip(b2_items, pricings):
     sku = item['sku']
     brand = item['brand']
     model = item['model']
     grade = item['grade']
-    condition = normalize_condition(grade)
+    condition = item['condition']
 
     print(f"\n{'='*100}")
     print(f"  SKU: {sku}")
@@ -63,14 +69,6 @@ for item in b2_items:
     print("-"*100)
 
     try:
-        # Get pricing with Tavily search
-        pricing = get_pricing_recommendation(
-            brand=brand,
-            model=model,
-            condition=condition,
-            retail_price=None  # Let it find market data
-        )
-
         # Display results
         print(f"\n  💰 PRICING RESULTS:")
         print(f"     Buy-It-Now:      ${pricing.buy_it_now_price:.2f}")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiting shared across API clients
+
+Each API family (Inventory, Browse, Trading, Tavily, OpenAI) gets one bucket per
+process. The SQLite backend stores bucket state in a shared database file so
+several worker processes draw from the same per-second and daily budget.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import RATE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when an API family has used up its daily call budget."""
+
+
+class TokenBucket:
+    """Thread-safe in-process token bucket with optional daily quota"""
+
+    def __init__(self, name: str, rate: float, capacity: float, daily_limit: Optional[int] = None):
+        """
+        Args:
+            name: API family name (used in logs and as the storage key)
+            rate: Tokens added per second
+            capacity: Maximum burst size
+            daily_limit: Maximum calls per calendar day (None for unlimited)
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.daily_limit = daily_limit
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._day = date.today().isoformat()
+        self._day_count = 0
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until tokens are available.
+
+        Args:
+            tokens: Number of tokens (calls) to take
+            timeout: Give up after this many seconds (None waits forever)
+
+        Returns:
+            True if acquired, False if the timeout elapsed first
+
+        Raises:
+            RateLimitExceeded: If the daily quota is exhausted
+            ValueError: If more tokens are asked for than the bucket can hold
+        """
+        self._check_capacity(tokens)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return True
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Wait for tokens without blocking the event loop"""
+        self._check_capacity(tokens)
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def calls_today(self) -> int:
+        """Number of calls made against this bucket today"""
+        with self._lock:
+            if self._day != date.today().isoformat():
+                return 0
+            return self._day_count
+
+    def _try_acquire(self, tokens: float) -> float:
+        """Take tokens if available; otherwise return seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            today = date.today().isoformat()
+            if self._day != today:
+                self._day = today
+                self._day_count = 0
+
+            self._check_daily_limit(self._day_count, tokens)
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self._day_count += int(tokens)
+                return 0.0
+
+            return (tokens - self._tokens) / self.rate
+
+    def _check_capacity(self, tokens: float):
+        # The bucket never holds more than capacity, so a larger request would wait forever
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from {self.name} bucket of capacity {self.capacity}")
+
+    def _check_daily_limit(self, day_count: int, tokens: float):
+        if self.daily_limit is not None and day_count + tokens > self.daily_limit:
+            raise RateLimitExceeded(
+                f"Daily {self.name} quota exhausted ({day_count}/{self.daily_limit} calls)"
+            )
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """Token bucket whose state lives in SQLite so processes share one budget"""
+
+    def __init__(self, name: str, rate: float, capacity: float, daily_limit: Optional[int] = None,
+                 db_path: str = None):
+        super().__init__(name, rate, capacity, daily_limit)
+        if db_path is None:
+            db_path = Path(__file__).parent / "rate_limits.db"
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._init_database()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode so we can issue BEGIN IMMEDIATE ourselves
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _init_database(self):
+        conn = self._get_connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS token_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                day TEXT NOT NULL,
+                day_count INTEGER NOT NULL
+            )
+        """)
+        conn.execute(
+            "INSERT OR IGNORE INTO token_buckets (name, tokens, updated_at, day, day_count) VALUES (?, ?, ?, ?, 0)",
+            (self.name, self.capacity, time.time(), date.today().isoformat())
+        )
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Wait for tokens; the SQLite transactions run in a worker thread, off the event loop"""
+        self._check_capacity(tokens)
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire, tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def calls_today(self) -> int:
+        row = self._get_connection().execute(
+            "SELECT day, day_count FROM token_buckets WHERE name = ?", (self.name,)
+        ).fetchone()
+        if not row or row[0] != date.today().isoformat():
+            return 0
+        return row[1]
+
+    def _try_acquire(self, tokens: float) -> float:
+        conn = self._get_connection()
+
+        # Wall-clock time because the timestamp is shared between processes
+        now = time.time()
+        today = date.today().isoformat()
+
+        # BEGIN IMMEDIATE takes the write lock so refill-and-take is atomic across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current, updated_at, day, day_count = conn.execute(
+                "SELECT tokens, updated_at, day, day_count FROM token_buckets WHERE name = ?",
+                (self.name,)
+            ).fetchone()
+
+            current = min(self.capacity, current + max(0.0, now - updated_at) * self.rate)
+            if day != today:
+                day, day_count = today, 0
+
+            self._check_daily_limit(day_count, tokens)
+
+            if current >= tokens:
+                current -= tokens
+                day_count += int(tokens)
+                wait = 0.0
+            else:
+                wait = (tokens - current) / self.rate
+
+            conn.execute(
+                "UPDATE token_buckets SET tokens = ?, updated_at = ?, day = ?, day_count = ? WHERE name = ?",
+                (current, now, day, day_count, self.name)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return wait
+
+
+# Global limiter registry
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(family: str) -> TokenBucket:
+    """
+    Get or create the shared limiter for an API family.
+
+    The backend is chosen by RATE_LIMIT_BACKEND ('memory' or 'sqlite'); the
+    SQLite file location can be overridden with RATE_LIMIT_DB.
+    """
+    limiter = _limiters.get(family)
+    if limiter is not None:
+        return limiter
+
+    with _limiters_lock:
+        if family not in _limiters:
+            if family not in RATE_LIMITS:
+                raise ValueError(f"Unknown API family: {family}")
+
+            quota = RATE_LIMITS[family]
+            backend = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+
+            if backend == 'sqlite':
+                _limiters[family] = SQLiteTokenBucket(
+                    family, quota['rate'], quota['burst'], quota.get('daily_limit'),
+                    db_path=os.getenv('RATE_LIMIT_DB') or None
+                )
+            else:
+                _limiters[family] = TokenBucket(
+                    family, quota['rate'], quota['burst'], quota.get('daily_limit')
+                )
+
+            logger.debug(f"Rate limiter for {family}: {quota['rate']}/s, burst {quota['burst']}, "
+                         f"daily {quota.get('daily_limit') or 'unlimited'} ({backend})")
+
+        return _limiters[family]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Sync Index for inventory pushes
+
+Keeps the payload hash of the last successful push per SKU in SQLite so
+unchanged items can be skipped instead of re-sent to
+bulk_create_or_replace_inventory_item. Hashes are scoped to the eBay
+environment, marketplace and application they were pushed to, so a sandbox
+run never marks items as already pushed to production.
+"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters per statement is 999
+_IN_CHUNK = 500
+
+
+@dataclass
+class SyncDiff:
+    """SKUs of a batch classified against the index"""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def to_push(self) -> List[str]:
+        return self.added + self.changed
+
+
+class SyncIndex:
+    """SQLite index of the last pushed payload hash per SKU and eBay target"""
+
+    def __init__(self, scope: str, db_path: str = None, skip_unchanged: bool = True):
+        """
+        Args:
+            scope: Target the hashes belong to (see make_scope / for_config)
+            db_path: SQLite file (defaults to sync_index.db next to this module)
+            skip_unchanged: Leave unchanged SKUs out of pushes; when False every SKU
+                is pushed but the index is still updated
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent / "sync_index.db"
+
+        self.scope = scope
+        self.db_path = str(db_path)
+        self.skip_unchanged = skip_unchanged
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._init_database()
+
+    @staticmethod
+    def make_scope(sandbox: bool, marketplace: str, client_id: str) -> str:
+        """Scope key of an eBay environment, marketplace and application"""
+        return f"{'sandbox' if sandbox else 'production'}:{marketplace}:{client_id}"
+
+    @classmethod
+    def for_config(cls, config, **kwargs) -> 'SyncIndex':
+        """SyncIndex scoped to the environment, marketplace and client id of a Config"""
+        scope = cls.make_scope(config.ebay_sandbox, config.default_marketplace, config.ebay_client_id)
+        return cls(scope, **kwargs)
+
+    def _init_database(self):
+        """Create index table if it doesn't exist"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS inventory_index (
+                    scope TEXT NOT NULL,
+                    sku TEXT NOT NULL,
+                    payload_hash TEXT NOT NULL,
+                    pushed_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (scope, sku)
+                )
+            """)
+
+    def close(self):
+        self._conn.close()
+
+    def hashes(self, skus: Iterable[str]) -> Dict[str, str]:
+        """Last pushed payload hash for the given SKUs (unknown SKUs are omitted)"""
+        skus = list(skus)
+        known = {}
+        with self._lock:
+            for i in range(0, len(skus), _IN_CHUNK):
+                chunk = skus[i:i + _IN_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT sku, payload_hash FROM inventory_index "
+                    f"WHERE scope = ? AND sku IN ({','.join('?' * len(chunk))})",
+                    [self.scope, *chunk]
+                )
+                known.update(rows)
+        return known
+
+    def diff(self, hashes: Dict[str, str]) -> SyncDiff:
+        """
+        Classify SKUs as added, changed or unchanged
+
+        Args:
+            hashes: SKU -> payload hash of the rows about to be pushed
+        """
+        known = self.hashes(hashes)
+        diff = SyncDiff()
+        for sku, payload_hash in hashes.items():
+            if sku not in known:
+                diff.added.append(sku)
+            elif known[sku] != payload_hash:
+                diff.changed.append(sku)
+            else:
+                diff.unchanged.append(sku)
+        return diff
+
+    def record(self, skus: Iterable[str], hashes: Dict[str, str]):
+        """Store the pushed payload hash of successfully created SKUs"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO inventory_index (scope, sku, payload_hash, pushed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(scope, sku) DO UPDATE SET
+                    payload_hash = excluded.payload_hash, pushed_at = excluded.pushed_at
+            """, [(self.scope, sku, hashes[sku], now) for sku in skus if sku in hashes])
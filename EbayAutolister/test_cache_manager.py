@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Pricing Cache Tests
+Offline checks of stale-while-revalidate expiry and single-flight fetch leases
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+from ebay_pricing import MarketData
+from ebay_pricing.cache_manager import CacheManager
+from ebay_pricing import pricing_engine
+from ebay_pricing.single_flight import SingleFlight
+from config import PRICING_CONFIG
+from test_helpers import run_tests, temp_db_path
+
+
+def make_cache() -> CacheManager:
+    """Cache in a throwaway SQLite file"""
+    return CacheManager(temp_db_path())
+
+
+def make_market_data(condition: str = "USED_GOOD") -> MarketData:
+    return MarketData(brand="Apple", model="iPad Air", condition=condition,
+                      avg_sold_price=200.0, sold_count=5, confidence=0.7)
+
+
+def age_entry(cache: CacheManager, hours_past_expiry: float):
+    """Move every entry's soft expiry into the past and drop the memory tier"""
+    expires_at = (datetime.now() - timedelta(hours=hours_past_expiry)).isoformat()
+    with cache._get_connection() as conn:
+        conn.execute("UPDATE market_cache SET expires_at = ?", (expires_at,))
+    cache.memory.clear()
+
+
+def test_fresh_entry_is_served():
+    cache = make_cache()
+    cache.cache_market_data(make_market_data())
+    market_data = cache.get_cached_market_data(" apple ", "IPAD  AIR", "used_good")
+    assert market_data is not None and not market_data.stale
+    assert market_data.avg_sold_price == 200.0
+
+
+def test_stale_entry_only_when_allowed():
+    cache = make_cache()
+    cache.cache_market_data(make_market_data())
+    age_entry(cache, 1)
+    assert cache.get_cached_market_data("Apple", "iPad Air", "USED_GOOD") is None
+
+    stale = cache.get_cached_market_data("Apple", "iPad Air", "USED_GOOD", allow_stale=True)
+    assert stale is not None and stale.stale
+
+    # The memory tier keeps the SQLite expiry
+    assert cache.get_cached_market_data("Apple", "iPad Air", "USED_GOOD") is None
+
+
+def test_entry_past_hard_expiry_is_dropped():
+    cache = make_cache()
+    cache.cache_market_data(make_market_data())
+    age_entry(cache, PRICING_CONFIG['cache_stale_hours'] + 1)
+    assert cache.get_cached_market_data("Apple", "iPad Air", "USED_GOOD", allow_stale=True) is None
+
+
+def test_get_many_splits_hits_and_misses():
+    cache = make_cache()
+    cache.put_many([make_market_data("USED_GOOD"), make_market_data("NEW")])
+    keys = [("Apple", "iPad Air", "NEW"), ("Apple", "iPad Air", "USED_ACCEPTABLE"),
+            ("Apple", "iPad Air", "USED_GOOD")]
+    hits, misses = cache.get_many(keys)
+    assert set(hits) == {keys[0], keys[2]}
+    assert misses == [keys[1]]
+
+    age_entry(cache, 1)
+    hits, misses = cache.get_many(keys)
+    assert not hits and misses == keys
+    hits, _ = cache.get_many(keys, allow_stale=True)
+    assert all(market_data.stale for market_data in hits.values())
+
+
+def test_condition_fetch_refreshes_stale_research():
+    cache = make_cache()
+    cache.cache_market_data(MarketData(brand="Apple", model="iPad Air", condition=pricing_engine.ALL_CONDITIONS,
+                                       avg_sold_price=150.0, sold_count=5))
+    age_entry(cache, 1)
+    fresh = MarketData(brand="Apple", model="iPad Air", condition=pricing_engine.ALL_CONDITIONS,
+                       avg_sold_price=250.0, sold_count=5)
+
+    with mock.patch.object(pricing_engine, 'get_cache', return_value=cache), \
+            mock.patch('ebay_pricing.single_flight.get_single_flight', return_value=SingleFlight(cache)), \
+            mock.patch.object(pricing_engine, 'fetch_product_research', return_value=fresh) as research, \
+            mock.patch.object(pricing_engine, 'analyze_active_competition',
+                              return_value={'active_listing_count': 0}):
+        market_data = pricing_engine.fetch_market_data("Apple", "iPad Air", "USED_GOOD")
+    research.assert_called_once_with("Apple", "iPad Air")
+    assert market_data.avg_sold_price == 250.0
+
+
+def test_hits_survive_a_short_run():
+    path = temp_db_path()
+    script = textwrap.dedent(f"""
+        from unittest import mock
+        import ebay_pricing.cache_manager as cache_manager
+        from ebay_pricing import MarketData
+
+        open_cache = cache_manager.CacheManager
+        with mock.patch.object(cache_manager, 'CacheManager', lambda: open_cache({path!r})):
+            cache = cache_manager.get_cache()
+        cache.cache_market_data(MarketData(brand="Apple", model="iPad Air", condition="USED_GOOD"))
+        for _ in range(3):
+            cache.get_cached_market_data("Apple", "iPad Air", "USED_GOOD")
+    """)
+    # Exits without close(), well under the flush threshold
+    subprocess.run([sys.executable, "-c", script], check=True, capture_output=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    reopened = CacheManager(path)
+    assert reopened.hot_keys(expiring_within_hours=PRICING_CONFIG['cache_duration_hours'] + 1) == [
+        ("Apple", "iPad Air", "USED_GOOD")
+    ]
+
+
+def test_close_flushes_hits():
+    cache = make_cache()
+    cache.cache_market_data(make_market_data())
+    cache.get_cached_market_data("Apple", "iPad Air", "USED_GOOD")
+    cache.close()
+    hit_count, = CacheManager(cache.db_path)._get_connection().execute(
+        "SELECT hit_count FROM market_cache"
+    ).fetchone()
+    assert hit_count == 1
+
+
+def test_lease_is_exclusive_until_released_or_expired():
+    cache = make_cache()
+    assert cache.acquire_lease("key", "owner-a", 60)
+    assert not cache.acquire_lease("key", "owner-b", 60)
+    assert cache.acquire_lease("key", "owner-a", 60)
+    cache.release_lease("key", "owner-b")
+    assert not cache.acquire_lease("key", "owner-b", 60)
+    cache.release_lease("key", "owner-a")
+    assert cache.acquire_lease("key", "owner-b", 60)
+
+    # An owner that died mid-fetch stops blocking once its lease runs out
+    assert cache.acquire_lease("other", "owner-a", -1)
+    assert cache.acquire_lease("other", "owner-b", 60)
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight = SingleFlight(make_cache())
+    calls = []
+    started = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", fetch)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+    assert calls == [1]
+    assert results == ["result"] * 4
+
+
+def test_other_process_waits_for_cached_result():
+    cache = make_cache()
+    cache.acquire_lease("key", "another-process", 60)
+    flight = SingleFlight(cache, poll_interval=0.01)
+    answers = iter([None, None, "cached"])
+    result = flight.do("key", lambda: "fetched", check=lambda: next(answers))
+    assert result == "cached"
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Product Catalog Tests
+Offline checks of catalog imports and UPC / MPN / fuzzy brand+model lookups
+"""
+
+import pandas as pd
+from ebay_pricing.catalog import ProductCatalog
+from test_helpers import run_tests, temp_db_path
+
+
+def make_catalog() -> ProductCatalog:
+    """Catalog in a throwaway SQLite file, seeded with a few products"""
+    catalog = ProductCatalog(temp_db_path())
+    catalog.add_many([
+        {'upc': '012345678905', 'brand': 'Apple', 'model': 'MGN63LL/A',
+         'title': 'Apple MacBook Air M1 13.3" 2020', 'msrp': '$999.00'},
+        {'brand': 'Sony', 'mpn': 'WH-1000XM4', 'title': 'Sony WH-1000XM4 Wireless Headphones'},
+        {'brand': 'Bose', 'model': 'QC45', 'title': 'Bose QuietComfort 45 Headphones'},
+    ], source='test')
+    return catalog
+
+
+def test_lookup_by_upc_ignores_leading_zeros():
+    catalog = make_catalog()
+    for upc in ('012345678905', '12345678905', '0012345678905', '0-12345-67890-5'):
+        product = catalog.lookup(upc=upc)
+        assert product is not None and product['model'] == 'MGN63LL/A', upc
+    assert catalog.lookup(upc='012345678905')['msrp'] == 999.0
+
+
+def test_lookup_by_model_as_mpn():
+    catalog = make_catalog()
+    assert catalog.lookup(brand='sony', model='wh-1000xm4')['title'].startswith('Sony')
+    assert catalog.by_mpn('WH-1000XM4', brand='Bose') is None
+
+
+def test_fuzzy_brand_model_search():
+    catalog = make_catalog()
+    assert catalog.lookup(brand='Bose', model='QuietComfort 45')['model'] == 'QC45'
+    assert catalog.lookup(brand='Apple', model='MacBook Air M1')['upc'] == '012345678905'
+    assert catalog.lookup(brand='Dell', model='XPS 13') is None
+
+
+def test_unknown_upc_falls_back_to_model():
+    catalog = make_catalog()
+    assert catalog.lookup(upc='999999999999', brand='Bose', model='QC45')['model'] == 'QC45'
+
+
+def test_merge_keeps_known_fields():
+    catalog = make_catalog()
+    catalog.add({'upc': '12345678905', 'category': 'Laptops'}, source='upc_lookup')
+    product = catalog.by_upc('012345678905')
+    assert product['category'] == 'Laptops'
+    assert product['title'] == 'Apple MacBook Air M1 13.3" 2020'
+    assert product['source'] == 'upc_lookup'
+    assert catalog.get_stats()['products'] == 3
+
+
+def test_import_frame_matches_column_aliases():
+    catalog = make_catalog()
+    frame = pd.DataFrame({
+        'Manufacturer': ['Garmin'], 'Model': ['Forerunner 255'], 'Product Name': ['Garmin Forerunner 255'],
+        'Orig. Retail': ['349.99'], 'UPC': ['753759281977']
+    })
+    assert catalog.import_frame(frame, 'manifest:test.xlsx') == 1
+    product = catalog.lookup(upc='753759281977')
+    assert (product['brand'], product['mpn'], product['msrp']) == ('Garmin', 'Forerunner 255', 349.99)
+    assert not catalog.add({'msrp': 10})
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Market Data Codec Tests
+Offline round-trip checks of the compact binary MarketData format
+"""
+
+from datetime import datetime
+from ebay_pricing import MarketData, SoldListing
+from ebay_pricing.codec import decode_market_data, encode_market_data, is_encoded
+from ebay_pricing.pricing_engine import condition_sold_stats, sold_stats_by_condition
+from config import PRICING_CONFIG
+from test_helpers import run_tests
+
+
+def make_market_data() -> MarketData:
+    listings = [
+        SoldListing(title="iPad Air", price=200.0 + i, sold_date=datetime(2024, 5, 1 + i, 12, 30),
+                    condition="Used - Very Good", source="ai_research",
+                    url=None if i % 2 else f"https://example.com/{i}")
+        for i in range(PRICING_CONFIG['min_sold_samples'])
+    ]
+    listings.append(SoldListing(title="iPad Air", price=150.0, sold_date=datetime(2024, 5, 20),
+                                condition="Used - Good", source="ai_research"))
+    return MarketData(
+        brand="Apple", model="iPad Air", condition="ANY",
+        avg_sold_price=205.0, median_sold_price=202.0, price_range_low=150.0, price_range_high=210.0,
+        sold_count=len(listings), sold_listings=listings,
+        sold_by_condition=sold_stats_by_condition(listings),
+        active_listing_count=7, avg_active_price=230.0, median_active_price=225.0,
+        confidence=0.8, sources=["ai_research", "browse_api"], source_latency={"ai_research": 1.5}
+    )
+
+
+def test_round_trip():
+    original = make_market_data()
+    data = encode_market_data(original)
+    assert is_encoded(data) and not is_encoded(b'{"brand": "Apple"}')
+
+    decoded = decode_market_data(data)
+    for name in ('brand', 'model', 'condition', 'avg_sold_price', 'median_sold_price', 'price_range_low',
+                 'price_range_high', 'sold_count', 'sold_by_condition', 'active_listing_count',
+                 'avg_active_price', 'median_active_price', 'confidence', 'sources', 'source_latency'):
+        assert getattr(decoded, name) == getattr(original, name), name
+    assert list(decoded.sold_listings) == original.sold_listings
+
+
+def test_sold_listings_decode_lazily():
+    decoded = decode_market_data(encode_market_data(make_market_data()))
+    assert not decoded.sold_listings.materialized
+    assert len(decoded.sold_listings) == decoded.sold_count
+
+    # Pricing a condition reads only the header aggregates
+    stats = condition_sold_stats(decoded, "USED_VERY_GOOD")
+    assert stats['sold_count'] == PRICING_CONFIG['min_sold_samples']
+    assert not decoded.sold_listings.materialized
+
+    assert decoded.sold_listings[0].price == 200.0
+    assert decoded.sold_listings.materialized
+
+
+def test_thin_condition_falls_back_to_all_grades():
+    decoded = decode_market_data(encode_market_data(make_market_data()))
+    stats = condition_sold_stats(decoded, "USED_GOOD")
+    assert stats['sold_count'] == decoded.sold_count
+    assert stats['avg_sold_price'] == decoded.avg_sold_price
+
+
+def test_empty_listings():
+    decoded = decode_market_data(encode_market_data(MarketData(brand="Acme", model="X1", condition="NEW")))
+    assert list(decoded.sold_listings) == []
+    assert condition_sold_stats(decoded, "NEW") is None
+
+
+def test_rejects_unknown_data():
+    data = encode_market_data(make_market_data())
+    for bad in (b'{"brand": "Apple"}', data[:2] + b'\x09' + data[3:]):
+        try:
+            decode_market_data(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"decoded invalid blob {bad[:8]!r}")
+
+
+if __name__ == "__main__":
+    run_tests(globals())
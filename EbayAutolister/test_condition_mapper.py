@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Condition Mapper Tests
+Offline checks of condition/grade mapping to eBay condition enums
+"""
+
+import pandas as pd
+from ebay_autolister import ConditionMapper
+from test_helpers import run_tests
+
+
+def test_direct_mappings():
+    assert ConditionMapper.map_condition('Like New') == 'LIKE_NEW'
+    assert ConditionMapper.map_condition('very good') == 'USED_VERY_GOOD'
+    assert ConditionMapper.map_condition('  GOOD ') == 'USED_GOOD'
+    assert ConditionMapper.map_condition('salvage') == 'FOR_PARTS_OR_NOT_WORKING'
+
+
+def test_underscores_and_case_are_normalized():
+    assert ConditionMapper.map_condition('VERY_GOOD') == 'USED_VERY_GOOD'
+    assert ConditionMapper.map_condition('Like-New') == 'LIKE_NEW'
+
+
+def test_longest_key_wins():
+    # "good" is contained in "very good"; the longer key must win
+    assert ConditionMapper.map_condition('used - very good, light wear') == 'USED_VERY_GOOD'
+    assert ConditionMapper.map_condition('item is like new in box') == 'LIKE_NEW'
+
+
+def test_grade_takes_priority():
+    assert ConditionMapper.map_condition('acceptable', '10') == 'LIKE_NEW'
+    assert ConditionMapper.map_condition('acceptable', 'unknown grade') == 'USED_ACCEPTABLE'
+
+
+def test_unknown_condition_defaults_to_used_good():
+    assert ConditionMapper.map_condition('zzz') == 'USED_GOOD'
+    assert ConditionMapper.map_condition('') == 'USED_GOOD'
+
+
+def test_map_conditions_matches_scalar_mapping():
+    conditions = pd.Series(['good', 'like new', None, 'good'], index=[5, 6, 7, 8])
+    grades = pd.Series(['', '', '', '9'], index=[5, 6, 7, 8])
+    mapped = ConditionMapper.map_conditions(conditions, grades)
+    assert list(mapped.index) == [5, 6, 7, 8]
+    assert list(mapped) == [
+        ConditionMapper.map_condition(condition or '', grade)
+        for condition, grade in zip(conditions, grades)
+    ]
+
+
+def test_description_includes_grade():
+    assert ConditionMapper.get_condition_description('good') == 'Used item in good condition'
+    assert ConditionMapper.get_condition_description('good', '9').endswith('(Grade: 9)')
+
+
+if __name__ == "__main__":
+    run_tests(globals())
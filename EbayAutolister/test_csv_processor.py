@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+CSV Parser Tests
+Offline checks of CSVProcessor.parse_frame's row validation and error report
+"""
+
+import json
+import pandas as pd
+from ebay_autolister import CSVProcessor, get_payload_builder
+from test_helpers import run_tests
+
+
+def make_frame(**overrides) -> pd.DataFrame:
+    """Two-row text frame with every required column filled in"""
+    columns = {
+        'sku': ['SKU-1', 'SKU-2'],
+        'title': ['Item one', 'Item two'],
+        'description': ['First', 'Second'],
+        'category_id': ['58058', '58058'],
+        'price': ['19.99', '5'],
+    }
+    columns.update(overrides)
+    return pd.DataFrame(columns)
+
+
+def test_valid_rows_use_defaults():
+    batch = CSVProcessor.parse_frame(make_frame())
+    assert batch.errors == []
+    assert list(batch.frame['sku']) == ['SKU-1', 'SKU-2']
+    assert list(batch.frame['quantity']) == [1, 1]
+    assert list(batch.frame['condition']) == ['NEW', 'NEW']
+    assert batch.frame['length'].tolist() == [10.0, 10.0]
+
+
+def test_error_report_lines_and_messages():
+    batch = CSVProcessor.parse_frame(make_frame(price=['abc', '5'], title=['Item one', '']), first_line=10)
+    assert batch.errors == [
+        {"row": 10, "sku": "SKU-1", "error": "Invalid price"},
+        {"row": 11, "sku": "SKU-2", "error": "Missing title"},
+    ]
+    assert len(batch) == 0
+
+
+def test_missing_required_column():
+    frame = make_frame().drop(columns=['category_id'])
+    batch = CSVProcessor.parse_frame(frame)
+    assert len(batch) == 0
+    assert {error["error"] for error in batch.errors} == {"Missing required column(s): category_id"}
+
+
+def test_fractional_quantity_is_rejected():
+    batch = CSVProcessor.parse_frame(make_frame(quantity=['3.7', '3.0']))
+    assert batch.errors == [
+        {"row": 2, "sku": "SKU-1", "error": "Invalid quantity (must be a whole number)"}
+    ]
+    assert batch.frame['quantity'].tolist() == [3]
+
+
+def test_non_finite_values_are_rejected():
+    batch = CSVProcessor.parse_frame(make_frame(weight=['inf', '2'], quantity=['1', 'nan']))
+    assert [error["error"] for error in batch.errors] == ["Invalid weight", "Invalid quantity"]
+    assert len(batch) == 0
+
+
+def test_price_must_be_finite_and_positive():
+    batch = CSVProcessor.parse_frame(pd.concat([make_frame(price=['inf', '-inf']),
+                                                make_frame(price=['0', '-5']),
+                                                make_frame(price=['nan', '0.01'])], ignore_index=True))
+    assert [error["error"] for error in batch.errors] == ["Invalid price"] * 2 + [
+        "Invalid price (must be greater than 0)"
+    ] * 2 + ["Invalid price"]
+    assert batch.frame['price'].tolist() == [0.01]
+
+
+def test_quantity_must_be_at_least_one():
+    batch = CSVProcessor.parse_frame(make_frame(quantity=['0', '-2']))
+    assert [error["error"] for error in batch.errors] == ["Invalid quantity (must be at least 1)"] * 2
+    assert len(batch) == 0
+
+
+def test_dimensions_parsed_or_flagged():
+    batch = CSVProcessor.parse_frame(make_frame(dimensions=['12 x 8.5 x 3', '12x8']))
+    assert batch.errors == [
+        {"row": 3, "sku": "SKU-2", "error": "Invalid dimensions (expected LxWxH)"}
+    ]
+    row = batch.frame.iloc[0]
+    assert (row['length'], row['width'], row['height']) == (12.0, 8.5, 3.0)
+
+
+def test_payload_is_valid_json():
+    batch = CSVProcessor.parse_frame(make_frame(weight=['1.5', '2'], images=['a.jpg, b.jpg', '']))
+    skus, body = get_payload_builder().build_bulk(batch)
+    requests = json.loads(body)['requests']
+    assert skus == ['SKU-1', 'SKU-2']
+    assert requests[0]['packageWeightAndSize']['weight']['value'] == 1.5
+    assert requests[0]['product']['imageUrls'] == ['a.jpg', 'b.jpg']
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Enrichment Cache Tests
+Offline checks of product keys and what the agent enricher caches
+"""
+
+from unittest import mock
+from enrichment_cache import EnrichmentCache, product_keys
+from test_helpers import run_tests, temp_db_path
+
+
+def make_cache() -> EnrichmentCache:
+    """Cache in a throwaway SQLite file"""
+    return EnrichmentCache(temp_db_path())
+
+
+def test_product_keys_are_normalized():
+    assert product_keys('Apple', 'iPad Air (5th Gen)', '0-12345-67890-5') == [
+        'upc:12345678905', 'bm:apple|ipad air 5th gen'
+    ]
+    assert product_keys(' APPLE ', 'ipad-air 5th gen') == ['bm:apple|ipad air 5th gen']
+    assert product_keys('Apple', None, None) == []
+    assert product_keys(None, 'X1', float('nan')) == ['bm:|x1']
+
+
+def test_lookup_by_either_key():
+    cache = make_cache()
+    cache.put({'title': 'Apple iPad Air'}, brand='Apple', model='iPad Air', upc='012345678905')
+    assert cache.get(brand='apple', model='IPAD AIR') == {'title': 'Apple iPad Air'}
+    assert cache.get(upc='12345678905') == {'title': 'Apple iPad Air'}
+    assert cache.get(brand='Apple', model='iPad Pro', upc='999') is None
+    assert cache.get_stats() == {'entries': 2, 'hits': 2}
+
+
+def test_expired_entries_are_ignored():
+    cache = make_cache()
+    cache.put({'title': 'Old'}, brand='Acme', model='X1')
+    with cache._conn:
+        cache._conn.execute("UPDATE enrichments SET expires_at = enriched_at - 1")
+    assert cache.get(brand='Acme', model='X1') is None
+    assert cache.clear_expired() == 1
+
+
+def make_enricher():
+    """Enricher without agents or pricing, for the cache paths only"""
+    from agent_enricher import AgentBasedEnricher
+
+    enricher = AgentBasedEnricher.__new__(AgentBasedEnricher)
+    enricher._apply_pricing = lambda product: product
+    return enricher
+
+
+def test_enricher_caches_product_fields_under_input_upc():
+    import agent_enricher
+
+    cache = make_cache()
+    with mock.patch('agent_enricher.get_enrichment_cache', return_value=cache):
+        enricher = make_enricher()
+        known = {'upc': '999999999999', 'title': 'Catalog match', 'msrp': 499.0}
+        product = enricher._finish_product('SKU-1', 'Apple', 'iPad Air', 'good',
+                                           'Great condition, priced to sell', known, upc='012345678905')
+    assert product.upc == '012345678905'
+
+    cached = cache.get(upc='012345678905')
+    assert cached is not None and cache.get(upc='999999999999') is None
+    assert set(cached) == set(agent_enricher._PRODUCT_FIELDS) | {'description_template'}
+    assert 'description' not in cached and 'confidence_score' not in cached
+    assert (cached['title'], cached['retail_price']) == ('Catalog match', 499.0)
+    assert cached['description_template'] == 'Great condition, priced to sell'
+
+
+def test_cache_hit_fills_condition_into_description():
+    cache = make_cache()
+    with mock.patch('agent_enricher.get_enrichment_cache', return_value=cache):
+        enricher = make_enricher()
+        enricher._finish_product('SKU-1', 'Apple', 'iPad Air', 'Good',
+                                 'Apple iPad Air in good shape, fully tested', None)
+        assert cache.get(brand='Apple', model='iPad Air')['description_template'] == (
+            'Apple iPad Air in {condition} shape, fully tested'
+        )
+        product = enricher._from_cache('SKU-2', 'Apple', 'iPad Air', 'Fair')
+    assert product.description == 'Apple iPad Air in Fair shape, fully tested'
+    assert product.sku == 'SKU-2' and 'enrichment_cache' in product.sources
+
+
+def test_placeholder_output_is_not_cached():
+    cache = make_cache()
+    with mock.patch('agent_enricher.get_enrichment_cache', return_value=cache):
+        product = make_enricher()._finish_product('SKU-1', 'Apple', 'iPad Air', 'good', '', None)
+    assert product.title == 'Apple iPad Air'
+    assert cache.get(brand='Apple', model='iPad Air') is None
+
+
+def test_rows_of_one_model_wait_only_for_the_first_run():
+    import asyncio
+
+    enricher = make_enricher()
+    calls, in_flight, most_in_flight = [], [0], [0]
+
+    async def enrich_product_async(sku, brand, model, condition, upc=None, timeout=None, refresh=False):
+        calls.append((sku, refresh))
+        in_flight[0] += 1
+        most_in_flight[0] = max(most_in_flight[0], in_flight[0])
+        await asyncio.sleep(0.05)
+        in_flight[0] -= 1
+        return sku
+
+    enricher.enrich_product_async = enrich_product_async
+    rows = [{'sku': f'SKU-{i}', 'brand': 'Apple', 'model': 'iPad Air', 'condition': 'good'} for i in range(4)]
+    assert enricher.enrich_many(rows, concurrency=4, refresh=True) == [row['sku'] for row in rows]
+    # The first run is alone and the only refresh; the cache hits after it overlap
+    assert calls[0] == ('SKU-0', True)
+    assert all(not refresh for _, refresh in calls[1:])
+    assert most_in_flight[0] == 3
+
+
+def test_pricing_is_opt_in():
+    from agent_enricher import AgentBasedEnricher, ENRICHMENT_CONFIG, EnrichedProduct
+    from ebay_pricing import MarketData
+
+    pricing = mock.Mock(buy_it_now_price=180.0, min_offer_price=150.0, auto_accept_offer=170.0,
+                        auto_decline_offer=130.0, confidence=0.7, reasoning="5 sold comps",
+                        market_data=MarketData(brand='Apple', model='iPad Air', condition='USED_GOOD',
+                                               avg_sold_price=190.0, sold_count=5))
+    with mock.patch('ebay_pricing.pricing_engine.get_pricing_recommendation',
+                    return_value=pricing) as get_pricing_recommendation:
+        with mock.patch.dict(ENRICHMENT_CONFIG, price_products=False):
+            product = AgentBasedEnricher._apply_pricing(
+                EnrichedProduct(sku='SKU-1', brand='Apple', model='iPad Air', condition='good')
+            )
+        assert product.buy_it_now_price == 0.0
+        get_pricing_recommendation.assert_not_called()
+
+        with mock.patch.dict(ENRICHMENT_CONFIG, price_products=True):
+            product = AgentBasedEnricher._apply_pricing(
+                EnrichedProduct(sku='SKU-1', brand='Apple', model='iPad Air', condition='good', retail_price=499.0)
+            )
+        get_pricing_recommendation.assert_called_once_with('Apple', 'iPad Air', 'good', 499.0)
+    assert (product.buy_it_now_price, product.min_offer_price, product.sold_count_30d) == (180.0, 150.0, 5)
+
+
+def test_csv_writer_replaces_output_and_keeps_row_order():
+    from agent_enricher import OrderedCsvWriter
+
+    path = temp_db_path() + '.csv'
+    with open(path, 'w') as f:
+        f.write('left,over\n1,2\n')
+    writer = OrderedCsvWriter(path, columns=['sku', 'title'])
+    with open(path) as f:
+        assert f.read() == 'sku,title\n'
+
+    writer.add(1, {'sku': 'B', 'title': 'Second'})
+    writer.add(0, {'sku': 'A', 'title': 'First'})
+    with open(path) as f:
+        assert f.read() == 'sku,title\nA,First\nB,Second\n'
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the offline test scripts
+
+SQLite files from temp_db_path() live in a scratch directory that is removed,
+WAL and SHM files included, after each test run by run_tests().
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+
+_scratch = None
+_counter = itertools.count()
+
+
+def temp_db_path(name: str = "test") -> str:
+    """Path of a new SQLite file in the current scratch directory"""
+    global _scratch
+    if _scratch is None:
+        _scratch = tempfile.TemporaryDirectory(prefix="ebay-autolister-test-")
+    return os.path.join(_scratch.name, f"{name}-{next(_counter)}.db")
+
+
+def run_tests(namespace: dict):
+    """Run every test_* function in namespace, print PASS/FAIL and exit non-zero on failure"""
+    global _scratch
+    failures = 0
+    for name, test in list(namespace.items()):
+        if not (name.startswith("test_") and callable(test)):
+            continue
+        try:
+            test()
+            print(f"✅ PASS: {name}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ FAIL: {name}\n    {e!r}")
+        finally:
+            if _scratch is not None:
+                _scratch.cleanup()
+                _scratch = None
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Job Journal Tests
+Offline checks that an interrupted run resumes from its journaled progress
+"""
+
+import asyncio
+from unittest import mock
+from job_journal import JobJournal
+from test_helpers import run_tests, temp_db_path
+
+
+def make_journal(run_id: str = "run-1") -> JobJournal:
+    """Journal in a throwaway SQLite file"""
+    return JobJournal(run_id, temp_db_path())
+
+
+def test_new_skus_are_pending():
+    journal = make_journal()
+    plan = journal.plan({"A": "h1", "B": "h2"})
+    assert plan.pending == {"A", "B"}
+    assert not plan.created and not plan.open_offers and not plan.published
+
+
+def test_resume_skips_finished_stages():
+    journal = make_journal()
+    hashes = {"A": "h1", "B": "h2", "C": "h3", "D": "h4"}
+    journal.record_inventory(["A", "B", "C"], [{"sku": "D", "error": "bad request"}], hashes)
+    journal.record_offers({"B": "offer-b", "C": "offer-c"}, [])
+    journal.record_listings({"C": "listing-c"}, [])
+
+    # Same run id, fresh connection: what a resumed process sees
+    resumed = JobJournal(journal.run_id, journal.db_path)
+    plan = resumed.plan(hashes)
+    assert plan.pending == {"D"}
+    assert plan.created == {"A", "B", "C"}
+    assert plan.open_offers == {"B": "offer-b"}
+    assert plan.published == {"C"}
+    assert resumed.summary() == {"skus": 4, "inventory_created": 3, "offers_created": 2,
+                                 "listings_published": 1, "errors": 1}
+
+
+def test_changed_payload_is_pushed_again_but_keeps_offer():
+    journal = make_journal()
+    journal.record_inventory(["A"], [], {"A": "h1"})
+    journal.record_offers({"A": "offer-a"}, [])
+    plan = journal.plan({"A": "h1-edited"})
+    assert plan.pending == {"A"}
+    assert plan.open_offers == {"A": "offer-a"}
+
+
+def test_runs_are_isolated():
+    journal = make_journal("run-1")
+    journal.record_inventory(["A"], [], {"A": "h1"})
+    other = JobJournal("run-2", journal.db_path)
+    assert other.plan({"A": "h1"}).pending == {"A"}
+
+
+def test_latest_run_for_csv():
+    journal = make_journal("20240101_000000")
+    journal.start("inventory.csv")
+    later = JobJournal("20240102_000000", journal.db_path)
+    later.start("inventory.csv")
+    assert JobJournal.latest_run("inventory.csv", journal.db_path) == "20240102_000000"
+    assert JobJournal.latest_run("other.csv", journal.db_path) is None
+
+
+def test_async_listing_journals_offer_failures():
+    from async_ebay_api import AsyncEbayAPI, process_items_async
+    from ebay_autolister import InventoryItem
+
+    journal = make_journal()
+    api = mock.Mock(spec=AsyncEbayAPI, sync_index=None, max_concurrency=4)
+    api.create_and_publish_listings = AsyncEbayAPI.create_and_publish_listings.__get__(api)
+    api.bulk_create_inventory_items = mock.AsyncMock(return_value={"successful": ["A", "B"], "failed": []})
+    api.bulk_create_offers = mock.AsyncMock(return_value={
+        "successful": {"A": "offer-a"}, "failed": [{"sku": "B", "error": "invalid category"}]
+    })
+    errors_before_publish = []
+
+    async def bulk_publish_offers(offer_ids):
+        # What a run that crashes mid-publish leaves in the journal
+        errors_before_publish.extend(journal._conn.execute(
+            "SELECT sku, error FROM job_items WHERE error IS NOT NULL"
+        ).fetchall())
+        return {"successful": {}, "failed": []}
+
+    api.bulk_publish_offers = bulk_publish_offers
+    items = [InventoryItem(sku=sku, title="Widget", description="d", condition="good",
+                           category_id="58058", price=10.0, quantity=1) for sku in ("A", "B")]
+
+    asyncio.run(process_items_async(api, items, create_listings=True, journal=journal))
+    assert errors_before_publish == [("B", "invalid category")]
+    assert journal.summary()["offers_created"] == 1
+
+
+if __name__ == "__main__":
+    run_tests(globals())
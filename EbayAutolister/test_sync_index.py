@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Sync Index Tests
+Offline checks that unchanged inventory pushes are skipped per eBay target
+"""
+
+from unittest import mock
+from ebay_autolister import EbayAutolister, InventoryItem, InventoryManager, get_payload_builder
+from sync_index import SyncIndex
+from test_helpers import run_tests, temp_db_path
+
+SANDBOX = SyncIndex.make_scope(True, "EBAY_US", "client-a")
+PRODUCTION = SyncIndex.make_scope(False, "EBAY_US", "client-a")
+
+
+def make_index(scope: str = SANDBOX, **kwargs) -> SyncIndex:
+    """Index in a throwaway SQLite file"""
+    return SyncIndex(scope, temp_db_path(), **kwargs)
+
+
+def make_items(title: str = "Widget"):
+    return [
+        InventoryItem(sku=sku, title=title, description="d", condition="good",
+                      category_id="58058", price=10.0, quantity=1)
+        for sku in ("A", "B")
+    ]
+
+
+def test_diff_classifies_skus():
+    index = make_index()
+    index.record(["A", "B"], {"A": "h1", "B": "h2"})
+    diff = index.diff({"A": "h1", "B": "h2-edited", "C": "h3"})
+    assert diff.unchanged == ["A"]
+    assert diff.changed == ["B"]
+    assert diff.added == ["C"]
+    assert diff.to_push == ["C", "B"]
+
+
+def test_only_recorded_skus_are_remembered():
+    index = make_index()
+    index.record(["A"], {"A": "h1", "B": "h2"})
+    assert index.hashes(["A", "B"]) == {"A": "h1"}
+
+
+def test_scopes_are_isolated():
+    sandbox = make_index(SANDBOX)
+    sandbox.record(["A"], {"A": "h1"})
+    production = SyncIndex(PRODUCTION, sandbox.db_path)
+    assert production.diff({"A": "h1"}).added == ["A"]
+    assert SyncIndex.make_scope(True, "EBAY_GB", "client-a") != SANDBOX
+
+
+def test_plan_push_skips_unchanged_items():
+    index = make_index()
+    items = make_items()
+    hashes = get_payload_builder().payload_hashes(items)
+    index.record(["A"], hashes)
+
+    to_send, _, results = InventoryManager.plan_push(items, index)
+    assert [item.sku for item in to_send] == ["B"]
+    assert results["unchanged"] == ["A"]
+
+    # An edited payload is pushed again
+    to_send, _, _ = InventoryManager.plan_push(make_items("Widget v2"), index)
+    assert [item.sku for item in to_send] == ["A", "B"]
+
+
+def test_force_pushes_everything():
+    index = make_index(skip_unchanged=False)
+    items = make_items()
+    index.record(["A", "B"], get_payload_builder().payload_hashes(items))
+    to_send, _, _ = InventoryManager.plan_push(items, index)
+    assert [item.sku for item in to_send] == ["A", "B"]
+
+
+def test_unchanged_skus_are_not_offered_again():
+    autolister = EbayAutolister.__new__(EbayAutolister)
+    autolister.logger = mock.Mock()
+    autolister.inventory = mock.Mock(sync_index=make_index(), payload_builder=get_payload_builder())
+    autolister.inventory.bulk_create_inventory_items.return_value = {
+        "successful": ["B"], "failed": [], "unchanged": ["A"]
+    }
+    autolister.listings = mock.Mock()
+    autolister.listings.bulk_create_offers.return_value = {"successful": {"B": "offer-b"}, "failed": []}
+    autolister.listings.bulk_publish_offers.return_value = {"successful": {"offer-b": "listing-b"}, "failed": []}
+
+    results = autolister._process_items(make_items(), create_listings=True)
+    offers, = autolister.listings.bulk_create_offers.call_args.args
+    assert [offer["sku"] for offer in offers] == ["B"]
+    assert (results["listings_created"], results["listings_failed"], results["listings_unchanged"]) == (1, 0, 1)
+
+
+if __name__ == "__main__":
+    run_tests(globals())
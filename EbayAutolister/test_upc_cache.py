@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+UPC Cache Tests
+Offline checks of UPC result caching, negative TTL and provider quotas
+"""
+
+from ebay_pricing.upc_cache import UPCCache
+from ebay_pricing.upc_lookup import ProviderUnavailable, UPCLookup
+from config import UPC_CONFIG
+from test_helpers import run_tests, temp_db_path
+
+
+def make_cache() -> UPCCache:
+    """Cache in a throwaway SQLite file"""
+    return UPCCache(temp_db_path())
+
+
+def ttl_hours(cache: UPCCache, upc: str) -> float:
+    fetched_at, expires_at = cache._conn.execute(
+        "SELECT fetched_at, expires_at FROM upc_products WHERE upc = ?", (upc,)
+    ).fetchone()
+    return round((expires_at - fetched_at) / 3600, 3)
+
+
+def test_found_and_not_found_ttls():
+    cache = make_cache()
+    cache.put("012345678905", {"title": "Widget", "source": "upcitemdb"})
+    cache.put("999999999999", None)
+
+    assert cache.get("012345678905") == (True, {"title": "Widget", "source": "upcitemdb"})
+    assert cache.get("999999999999") == (True, None)
+    assert cache.get("111111111111") == (False, None)
+    assert ttl_hours(cache, "012345678905") == UPC_CONFIG['cache_days'] * 24
+    assert ttl_hours(cache, "999999999999") == UPC_CONFIG['negative_cache_hours']
+
+
+def test_expired_not_found_is_looked_up_again():
+    cache = make_cache()
+    cache.put("999999999999", None)
+    with cache._conn:
+        cache._conn.execute("UPDATE upc_products SET expires_at = fetched_at - 1")
+    assert cache.get("999999999999") == (False, None)
+    assert cache.clear_expired() == 1
+
+
+def test_quota_is_counted_per_provider():
+    cache = make_cache()
+    limit = UPC_CONFIG['daily_quotas']['upcitemdb']
+    assert cache.remaining_quota('upcitemdb') == limit
+    assert cache.consume_quota('upcitemdb', limit - 2)
+    assert not cache.consume_quota('upcitemdb', 3)
+    assert cache.remaining_quota('upcitemdb') == 2
+    assert cache.consume_quota('upcitemdb', 2)
+    assert not cache.consume_quota('upcitemdb')
+    assert cache.quota_usage()['upcitemdb'] == {'calls': limit, 'limit': limit, 'exhausted': True}
+
+    # Unlimited providers stop only once marked exhausted (e.g. after a 429)
+    assert cache.remaining_quota('openfoodfacts') is None
+    cache.mark_exhausted('openfoodfacts')
+    assert cache.remaining_quota('openfoodfacts') == 0
+    assert not cache.consume_quota('openfoodfacts')
+
+
+def make_lookup(cache: UPCCache, **providers) -> UPCLookup:
+    """UPCLookup whose providers are replaced by the given fakes; only their API keys are set"""
+    lookup = UPCLookup(cache)
+    lookup.upcitemdb_key = "key" if "upcitemdb" in providers else None
+    lookup.barcodelookup_key = "key" if "barcodelookup" in providers else None
+    for name, provider in providers.items():
+        provider.__name__ = f"_try_{name}"
+        setattr(lookup, f"_try_{name}", provider)
+    return lookup
+
+
+def test_not_found_cached_only_when_every_provider_answered():
+    cache = make_cache()
+    answered = make_lookup(cache, upcitemdb=lambda upc: None, barcodelookup=lambda upc: None,
+                           openfoodfacts=lambda upc: None)
+    assert answered.lookup("111", hedged=False) is None
+    assert cache.get("111") == (True, None)
+
+    def unavailable(upc):
+        raise ProviderUnavailable('barcodelookup')
+
+    partial = make_lookup(cache, upcitemdb=lambda upc: None, barcodelookup=unavailable,
+                          openfoodfacts=lambda upc: None)
+    assert partial.lookup("222", hedged=False) is None
+    assert cache.get("222") == (False, None)
+
+
+def test_unconfigured_provider_does_not_block_not_found():
+    cache = make_cache()
+    asked = []
+
+    def not_found(upc):
+        asked.append(upc)
+        return None
+
+    # The usual setup: a UPCitemdb key but no paid Barcode Lookup key
+    lookup = make_lookup(cache, upcitemdb=not_found, openfoodfacts=not_found)
+    for upc, hedged in (("333", False), ("444", True)):
+        assert lookup.lookup(upc, hedged=hedged) is None
+        assert asked.count(upc) == 2
+        assert cache.get(upc) == (True, None)
+
+
+def test_batch_shrinks_to_remaining_quota():
+    cache = make_cache()
+    cache.consume_quota('upcitemdb', UPC_CONFIG['daily_quotas']['upcitemdb'] - 3)
+    lookup = UPCLookup(cache)
+    lookup.upcitemdb_key = "key"
+    batches = []
+
+    def lookup_many(upcs):
+        assert cache.consume_quota('upcitemdb', len(upcs))
+        batches.append(len(upcs))
+        return {}
+
+    lookup._try_upcitemdb_many = lookup_many
+    lookup._lookup_providers = lambda upc, providers, hedged=None: None
+    lookup.lookup_many([str(100000 + i) for i in range(25)])
+    assert batches == [3]
+
+
+if __name__ == "__main__":
+    run_tests(globals())